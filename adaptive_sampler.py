@@ -0,0 +1,106 @@
+import time
+import threading
+from collections import deque
+from hp_predictor import fit_line
+
+class AdaptiveSampler:
+    """Can eğimine göre kontrol aralığını ayarlayan örnekleyici
+    
+    Can hızla düşüyorsa veya eşiğe yakınsa en kısa aralık, can dolu ve sabitse aralık
+    kademeli olarak en uzun aralığa çıkar, diğer durumlarda temel aralık kullanılır.
+    """
+    
+    def __init__(self, base_interval, min_interval, max_interval, enabled=True,
+                 history_size=8, fast_drop_per_s=15.0, near_threshold_margin=10.0,
+                 stable_slope_per_s=1.0, backoff_factor=1.5, slope_window_s=0.5):
+        self.lock = threading.Lock()
+        self.enabled = enabled
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        
+        # Eğim ve karar parametreleri (can yüzdesi / saniye)
+        self.fast_drop_per_s = fast_drop_per_s
+        self.near_threshold_margin = near_threshold_margin
+        self.stable_slope_per_s = stable_slope_per_s
+        self.backoff_factor = backoff_factor
+        self.slope_window = slope_window_s
+        
+        # Son okumalar: (zaman, can yüzdesi)
+        self.history = deque(maxlen=history_size)
+        self.current_interval = base_interval
+        self.slope = 0.0
+        
+        # İstatistikler: aralık (ms) -> toplam süre (s)
+        self.time_at_interval = {}
+        self.sample_times = deque(maxlen=32)
+    
+    def configure(self, base_interval=None, min_interval=None, max_interval=None, enabled=None):
+        with self.lock:
+            if base_interval is not None:
+                self.base_interval = base_interval
+            if min_interval is not None:
+                self.min_interval = min_interval
+            if max_interval is not None:
+                self.max_interval = max_interval
+            if enabled is not None:
+                self.enabled = enabled
+            self.current_interval = self.base_interval
+    
+    def _calculate_slope(self):
+        """Son okumalara (slope_window içindekiler, en az 2) doğrusal uydurma ile eğim (%/s)"""
+        if len(self.history) < 2:
+            return 0.0
+        latest = self.history[-1][0]
+        samples = [(t, hp) for t, hp in self.history if latest - t <= self.slope_window]
+        if len(samples) < 2:
+            samples = list(self.history)[-2:]
+        return fit_line(samples)[0]
+    
+    def record(self, hp_percentage, now=None):
+        """Yeni can okumasını kaydet"""
+        if now is None:
+            now = time.perf_counter()
+        with self.lock:
+            self.history.append((now, hp_percentage))
+            self.sample_times.append(now)
+            self.slope = self._calculate_slope()
+    
+    def next_interval(self, hp_threshold):
+        """Sonraki kontrole kadar beklenecek süre (saniye)"""
+        with self.lock:
+            if not self.enabled or not self.history:
+                interval = self.base_interval
+            else:
+                hp = self.history[-1][1]
+                if self.slope <= -self.fast_drop_per_s or hp - hp_threshold <= self.near_threshold_margin:
+                    # Hızlı düşüş veya eşiğe yakın: en sık kontrol
+                    interval = self.min_interval
+                elif hp >= 99 and abs(self.slope) <= self.stable_slope_per_s:
+                    # Dolu ve sabit: aralığı kademeli uzat
+                    interval = min(max(self.current_interval, self.base_interval) * self.backoff_factor,
+                                   self.max_interval)
+                else:
+                    interval = self.base_interval
+                interval = max(self.min_interval, min(self.max_interval, interval))
+            
+            self.current_interval = interval
+            
+            key = int(round(interval * 1000))
+            self.time_at_interval[key] = self.time_at_interval.get(key, 0.0) + interval
+            return interval
+    
+    def get_stats(self):
+        with self.lock:
+            if len(self.sample_times) >= 2:
+                span = self.sample_times[-1] - self.sample_times[0]
+                effective_rate = (len(self.sample_times) - 1) / span if span > 0 else 0.0
+            else:
+                effective_rate = 0.0
+            return {
+                'enabled': self.enabled,
+                'effective_rate_hz': effective_rate,
+                'current_interval_ms': self.current_interval * 1000,
+                'hp_slope_per_s': self.slope,
+                'time_at_interval_s': dict(sorted(self.time_at_interval.items()))
+            }
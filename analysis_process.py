@@ -0,0 +1,231 @@
+import time
+import queue
+import threading
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+
+class SharedFrameRing:
+    """Sabit boyutlu yuvalardan oluşan paylaşımlı bellek halka tamponu
+    
+    Kareler yuvalara kopyalanır; süreçler arasında sadece (yuva, şekil, dtype) kaydı gider.
+    """
+    
+    def __init__(self, slots=4, slot_bytes=1 << 20, name=None):
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=slots * slot_bytes)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.next_slot = 0
+    
+    @property
+    def name(self):
+        return self.shm.name
+    
+    def view(self, slot, shape, dtype):
+        """Yuvadaki kareye kopyasız görünüm"""
+        return np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=slot * self.slot_bytes)
+    
+    def write(self, frame):
+        """Kareyi sıradaki yuvaya kopyala -> yuva numarası"""
+        if frame.nbytes > self.slot_bytes:
+            raise ValueError(f"Kare yuvaya sığmıyor: {frame.nbytes} > {self.slot_bytes} bayt")
+        slot = self.next_slot
+        self.next_slot = (slot + 1) % self.slots
+        np.copyto(self.view(slot, frame.shape, frame.dtype), frame)
+        return slot
+    
+    def close(self):
+        try:
+            self.shm.close()
+            if self.owner:
+                self.shm.unlink()
+        except Exception:
+            pass
+
+def create_headless_engine(kind, config_path="config.json"):
+    """Ekran yakalamayan ve tuşa basmayan motor (analiz süreci ve kayıttan oynatma için)
+    kind: 'hp' (DiabloImmortalBotEngine) veya 'minimap' (FarmingEngine)
+    """
+    from frame_source import FrameSource
+    from input_worker import InputWorker
+    from config_store import ConfigStore
+    
+    class _NoInput(InputWorker):
+        # Tuşa basılmaz: pynput hiç içe aktarılmaz (ekran/klavye arka ucu gerekmez)
+        def __init__(self):
+            super().__init__(controller=object())
+    
+    if kind == 'hp':
+        from bot_engine import DiabloImmortalBotEngine
+        # Dosya izlenmez (analiz sürecinde değişiklikler ana süreçten 'reload' mesajıyla gelir)
+        return DiabloImmortalBotEngine(config_path, frame_source=FrameSource(), input_worker=_NoInput(),
+                                       config_store=ConfigStore(config_path, watch=False))
+    if kind == 'minimap':
+        from farming_engine import FarmingEngine
+        return FarmingEngine(frame_source=FrameSource(), input_worker=_NoInput())
+    raise ValueError(f"Bilinmeyen analiz türü: {kind}")
+
+def _create_analyzer(kind, config_path):
+    """Çalışan süreçte analiz fonksiyonunu ve motor istatistiği fonksiyonunu oluştur"""
+    engine = create_headless_engine(kind, config_path)
+    if kind == 'hp':
+        return engine, engine.calculate_hp_percentage, None
+    return engine, engine._locate_marker, engine.get_detection_stats
+
+# Çalışan süreç motor istatistiklerini (takip, arka plan modeli) her N karede sonuca ekler
+STATS_EVERY_FRAMES = 16
+
+def _worker_main(kind, config_path, ring_name, slots, slot_bytes, requests, results):
+    """Çalışan süreç: paylaşımlı yuvadaki kareyi analiz et, küçük sonuç kaydını geri gönder"""
+    ring = SharedFrameRing(slots, slot_bytes, name=ring_name)
+    engine, analyze, engine_stats = _create_analyzer(kind, config_path)
+    frames = 0
+    
+    while True:
+        message = requests.get()
+        if message is None:
+            break
+        command = message[0]
+        if command == 'frame':
+            _, request_id, slot, shape, dtype = message
+            start = time.perf_counter_ns()
+            frames += 1
+            stats = engine_stats() if engine_stats is not None and frames % STATS_EVERY_FRAMES == 1 else None
+            try:
+                result = analyze(ring.view(slot, shape, dtype))
+                results.put((request_id, True, result, time.perf_counter_ns() - start, stats))
+            except Exception as e:
+                results.put((request_id, False, str(e), time.perf_counter_ns() - start, stats))
+        elif command == 'reload':
+            # Ana süreçte yapılandırma değişti (dosya arka planda yazılır, içerik mesajla gelir)
+            engine._apply_config(message[1])
+        elif command == 'reset':
+            # Mini harita bölgesi veya takip ayarları değişti: kilit, arka plan modeli ve önbellek sıfırlanır
+            engine.reset_detection(message[1])
+        elif command == 'attach':
+            # Daha büyük yuvalı yeni halka tampon (ana süreç vazgeçip kaldırdıysa eskisinde kalınır)
+            _, request_id, ring_name, slots, slot_bytes = message
+            try:
+                new_ring = SharedFrameRing(slots, slot_bytes, name=ring_name)
+            except Exception as e:
+                results.put((request_id, False, str(e), 0, None))
+                continue
+            ring.close()
+            ring = new_ring
+            results.put((request_id, True, None, 0, None))
+    
+    ring.close()
+
+class AnalysisProcess:
+    """HP veya mini harita analizini ayrı bir süreçte yürüten istemci
+    
+    Analiz GIL'i paylaşmadığı için GUI ve diğer motor döngüsü beklemez. Kareler
+    SharedFrameRing üzerinden gider, geriye sadece analiz sonucu (can yüzdesi veya
+    pozisyon sözlüğü) döner. analyze() sonucu beklerken GIL serbesttir.
+    kind: 'hp' (calculate_hp_percentage) veya 'minimap' (stabilize edilmiş marker pozisyonu)
+    """
+    
+    def __init__(self, kind, config_path="config.json", slots=4, slot_bytes=1 << 20, timeout=2.0):
+        self.kind = kind
+        self.config_path = config_path
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.ring = SharedFrameRing(slots, slot_bytes)
+        
+        context = mp.get_context("spawn")
+        self.requests = context.Queue()
+        self.results = context.Queue()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(kind, config_path, self.ring.name, slots, slot_bytes, self.requests, self.results),
+            daemon=True
+        )
+        self.process.start()
+        self.request_id = 0
+        
+        # İstatistikler (engine_stats: çalışan süreçteki motorun son bildirdiği istatistikler)
+        self.engine_stats = None
+        self.frames = 0
+        self.worker_ns = 0
+        self.round_trip_ns = 0
+    
+    def _wait_result(self, request_id):
+        while True:
+            try:
+                result_id, ok, value, elapsed_ns, engine_stats = self.results.get(timeout=self.timeout)
+            except queue.Empty:
+                raise RuntimeError("Analiz süreci yanıt vermedi") from None
+            if engine_stats is not None:
+                self.engine_stats = engine_stats
+            # Zaman aşımına uğramış eski isteklerin sonuçlarını atla
+            if result_id == request_id:
+                return ok, value, elapsed_ns
+    
+    def _grow(self, nbytes):
+        """Kare yuvaya sığmıyorsa daha büyük yuvalı halka tampona geç"""
+        slot_bytes = max(nbytes, self.ring.slot_bytes * 2)
+        ring = SharedFrameRing(self.ring.slots, slot_bytes)
+        try:
+            self.request_id += 1
+            self.requests.put(('attach', self.request_id, ring.name, ring.slots, slot_bytes))
+            ok, value, _ = self._wait_result(self.request_id)
+            if not ok:
+                raise RuntimeError(f"Analiz süreci yeni halka tampona bağlanamadı: {value}")
+        except Exception:
+            # Paylaşımlı bellek sızmasın; geç işlenen 'attach' çalışanı yeni tampona geçirmiş
+            # olabileceğinden mevcut tampona yeniden bağlanması istenir (kuyruk sırasıyla)
+            ring.close()
+            self.request_id += 1
+            self.requests.put(('attach', self.request_id, self.ring.name, self.ring.slots, self.ring.slot_bytes))
+            raise
+        self.ring.close()
+        self.ring = ring
+    
+    def analyze(self, frame):
+        """Kareyi çalışan süreçte analiz et ve sonucu döndür"""
+        start = time.perf_counter_ns()
+        with self.lock:
+            if frame.nbytes > self.ring.slot_bytes:
+                self._grow(frame.nbytes)
+            slot = self.ring.write(frame)
+            self.request_id += 1
+            self.requests.put(('frame', self.request_id, slot, frame.shape, frame.dtype.str))
+            ok, value, elapsed_ns = self._wait_result(self.request_id)
+            
+            self.frames += 1
+            self.worker_ns += elapsed_ns
+            self.round_trip_ns += time.perf_counter_ns() - start
+        if not ok:
+            raise RuntimeError(f"Analiz süreci hatası: {value}")
+        return value
+    
+    def reload_config(self, config):
+        """Ana süreçteki yapılandırma değişikliğini çalışan sürecin motoruna uygula"""
+        self.requests.put(('reload', config))
+    
+    def reset(self, settings):
+        """Mini harita motorunun bölge/takip ayarlarını uygula ve tespit durumunu sıfırla (kuyruk sırasıyla)"""
+        self.requests.put(('reset', settings))
+    
+    def close(self):
+        try:
+            self.requests.put(None)
+            self.process.join(timeout=2.0)
+            if self.process.is_alive():
+                self.process.terminate()
+        finally:
+            self.ring.close()
+    
+    def get_stats(self):
+        return {
+            'kind': self.kind,
+            'alive': self.process.is_alive(),
+            'frames': self.frames,
+            'avg_worker_ms': self.worker_ns / self.frames / 1e6 if self.frames else 0.0,
+            'avg_round_trip_ms': self.round_trip_ns / self.frames / 1e6 if self.frames else 0.0
+        }
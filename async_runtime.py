@@ -0,0 +1,163 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from input_worker import InputWorker, PRIORITY_MOVEMENT
+
+class AsyncInputWorker(InputWorker):
+    """InputWorker'ın olay döngüsü üzerinde çalışan sürümü
+    
+    Basma istekleri döngü thread'ine aktarılır, bırakma zamanlayıcısı tek bir coroutine'dir.
+    Tuş durumu (held, suspended, releases) sadece döngü thread'inden değiştirilir.
+    """
+    
+    def __init__(self, runtime, controller=None):
+        super().__init__(controller)
+        self.runtime = runtime
+        self.release_task = None
+        self.wakeup = None
+    
+    def start(self):
+        # Zamanlayıcı runtime başlatılırken kurulur (_attach)
+        self.running = True
+    
+    def stop(self):
+        self.running = False
+        if self.wakeup is not None:
+            self.runtime.call_soon(self.wakeup.set)
+    
+    def submit(self, keys, duration, group=None, on_error=None, priority=PRIORITY_MOVEMENT):
+        """keys tuşlarını duration saniye basılı tut (bloklamaz)"""
+        if isinstance(keys, str):
+            keys = [keys]
+        self.runtime.call_soon(self._handle_submit, (list(keys), duration, group, on_error, time.perf_counter(), priority))
+    
+    def _attach(self):
+        """Döngü thread'inde çağrılır: bırakma zamanlayıcısını başlat"""
+        self.running = True
+        self.wakeup = asyncio.Event()
+        self.release_task = asyncio.ensure_future(self._release_timer())
+    
+    def _handle_submit(self, request):
+        self._process_requests([request], time.perf_counter())
+        self.wakeup.set()
+    
+    async def _release_timer(self):
+        try:
+            while self.running:
+                self.wakeup.clear()
+                self._release_due(time.perf_counter())
+                timeout = self.releases[0][0] - time.perf_counter() if self.releases else None
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            # Durdurulurken (iptal veya beklenmeyen hatada da) basılı kalan tuşları bırak
+            self.release_all()
+
+class AsyncRuntime:
+    """HP takibi, farming ve tuş zamanlayıcılarını tek olay döngüsünde çalıştıran runtime
+    
+    Döngü ayrı bir thread'de çalışır; motor döngüleri coroutine'dir ve ortak saati
+    (loop.time) paylaşır. Bloklayan işler (ekran yakalama, NumPy analizleri, callback'ler)
+    run_blocking() ile executor'da yapılır. Varsayılan tek executor thread'i motor
+    adımlarını sıralı ve belirlenimci (deterministik) yürütür.
+    """
+    
+    def __init__(self, max_workers=1):
+        self.max_workers = max_workers
+        self.loop = None
+        self.executor = None
+        self.thread = None
+        self.ready = threading.Event()
+        self.input_worker = AsyncInputWorker(self)
+        
+        # İstatistikler
+        self.blocking_calls = 0
+        self.blocking_time = 0.0
+    
+    def start(self):
+        if self.thread is not None:
+            return
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="runtime")
+        # stop() sonrası yeniden başlatmada eski (kapanmış) döngü görünmesin
+        self.ready.clear()
+        self.loop = None
+        self.thread = threading.Thread(target=self._run_loop, daemon=True)
+        self.thread.start()
+        self.ready.wait()
+    
+    def _run_loop(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(self.input_worker._attach)
+        self.loop.call_soon(self.ready.set)
+        self.loop.run_forever()
+        
+        # Döngü durdu: kalan görevleri (tuş zamanlayıcısı dahil) bitir
+        pending = asyncio.all_tasks(self.loop)
+        if pending:
+            self.loop.run_until_complete(asyncio.wait(pending, timeout=2.0))
+        self.loop.close()
+    
+    def stop(self):
+        if self.thread is None:
+            return
+        self.input_worker.stop()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=3.0)
+        self.executor.shutdown(wait=False)
+        self.thread = None
+    
+    def call_soon(self, callback, *args):
+        """Döngü thread'inde callback çalıştır (herhangi bir thread'den)"""
+        if self.thread is None:
+            self.start()
+        self.loop.call_soon_threadsafe(callback, *args)
+    
+    def spawn(self, coroutine):
+        """Coroutine'i döngüde başlat -> concurrent.futures.Future"""
+        if self.thread is None:
+            self.start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+    
+    async def run_blocking(self, function, *args):
+        """Bloklayan işi executor'da çalıştır ve sonucunu bekle"""
+        start = time.perf_counter()
+        try:
+            return await self.loop.run_in_executor(self.executor, function, *args)
+        finally:
+            self.blocking_calls += 1
+            self.blocking_time += time.perf_counter() - start
+    
+    async def run_engine(self, engine, step, on_exit=None, scheduler=None):
+        """Motor döngüsü: step() bloklayan adımı çalıştırıp beklenecek süreyi döndürür
+        
+        scheduler (TickScheduler) verilirse süre mutlak son tarihe göre uygulanır.
+        """
+        if scheduler is not None:
+            scheduler.start()
+        while engine.running:
+            if scheduler is not None:
+                scheduler.begin_tick()
+            delay = await self.run_blocking(step)
+            if scheduler is not None:
+                delay = scheduler.next_delay(delay)
+            await asyncio.sleep(delay)
+        if on_exit is not None:
+            await self.run_blocking(on_exit)
+    
+    def get_stats(self):
+        return {
+            'running': self.thread is not None,
+            'blocking_calls': self.blocking_calls,
+            'avg_blocking_ms': self.blocking_time / self.blocking_calls * 1000 if self.blocking_calls else 0.0
+        }
+
+def wait_for_task(task, timeout=2.0):
+    """spawn() ile başlatılan motor görevinin bitmesini bekle (thread join karşılığı)"""
+    try:
+        task.result(timeout=timeout)
+    except Exception:
+        pass
@@ -0,0 +1,176 @@
+"""Analiz algoritmalarının ekran olmadan (headless) hız ölçümü
+
+Kullanım:
+    python benchmark.py                          # sentetik karelerle
+    python benchmark.py --hp kayit/hp --minimap kayit/minimap --frames 2000
+"""
+import argparse
+import time
+import numpy as np
+from mss.screenshot import ScreenShot
+from PIL import Image
+from bot_engine import DiabloImmortalBotEngine
+from farming_engine import FarmingEngine
+from frame_source import ReplayFrameSource, bgra_view
+
+def make_synthetic_hp_frames(count=64, width=171, height=26, seed=0):
+    """Soldan dolan kırmızı can barı kareleri üret"""
+    rng = np.random.default_rng(seed)
+    frames = np.empty((count, height, width, 3), dtype=np.uint8)
+    for i in range(count):
+        hp_end = int(width * (i + 1) / count)
+        frame = np.full((height, width, 3), (25, 20, 20), dtype=np.uint8)
+        frame[:, :hp_end] = (150, 20, 25)
+        noise = rng.integers(-8, 9, size=frame.shape)
+        frames[i] = np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+    return frames
+
+def make_synthetic_minimap_frames(count=64, size=200, seed=0):
+    """Gürültülü mini harita üzerinde hareket eden beyaz işaretçi kareleri üret"""
+    rng = np.random.default_rng(seed)
+    frames = rng.integers(0, 120, size=(count, size, size, 3), dtype=np.uint8)
+    for i in range(count):
+        angle = 2 * np.pi * i / count
+        cx = int(size / 2 + size / 4 * np.cos(angle))
+        cy = int(size / 2 + size / 4 * np.sin(angle))
+        frames[i, cy - 2:cy + 3, cx - 2:cx + 3] = 245
+        frames[i, cy - 4:cy - 2, cx] = 245
+    return frames
+
+def run_benchmark(name, source, analyze, region, frame_count):
+    """frame_count kare için kaynak + analiz süresini ölç"""
+    # Isınma
+    analyze(source.grab(region))
+    
+    latencies = np.empty(frame_count, dtype=np.float64)
+    start = time.perf_counter()
+    for i in range(frame_count):
+        t0 = time.perf_counter_ns()
+        analyze(source.grab(region))
+        latencies[i] = (time.perf_counter_ns() - t0) / 1e6
+    elapsed = time.perf_counter() - start
+    
+    print(f"{name}: {frame_count / elapsed:.1f} kare/s, "
+          f"ortalama {latencies.mean():.3f} ms, "
+          f"p50 {np.percentile(latencies, 50):.3f} ms, "
+          f"p99 {np.percentile(latencies, 99):.3f} ms")
+
+def run_batch_benchmark(name, analyze_batch, frames, repeat=10):
+    """Kare yığınını tek çağrıda analiz etme hızını ölç"""
+    frames = np.asarray(frames)
+    analyze_batch(frames)
+    
+    start = time.perf_counter()
+    for _ in range(repeat):
+        analyze_batch(frames)
+    elapsed = time.perf_counter() - start
+    
+    print(f"{name}: {len(frames) * repeat / elapsed:.1f} kare/s ({len(frames)} karelik yığın)")
+
+def run_probe_comparison(bot_engine, frames):
+    """Seyrek (şerit + ikili arama) tahminciyi tam estimator'la karşılaştır: doğruluk, hız, bayt"""
+    frames = np.asarray(frames)
+    height, width = frames.shape[1:3]
+    probe = bot_engine.probe
+    top = (height - probe.rows) // 2
+    strips = frames[:, top:top + probe.rows]
+    
+    mode = bot_engine.hp_estimator
+    bot_engine.hp_estimator = 'full'
+    start = time.perf_counter()
+    full = np.array([bot_engine.calculate_hp_percentage(frame) for frame in frames])
+    full_time = (time.perf_counter() - start) / len(frames)
+    
+    bot_engine.hp_estimator = 'probe'
+    start = time.perf_counter()
+    probed = np.array([bot_engine.calculate_hp_percentage(strip) for strip in strips])
+    probe_time = (time.perf_counter() - start) / len(frames)
+    bot_engine.hp_estimator = mode
+    
+    diff = np.abs(full - probed)
+    print(f"Seyrek tahminci ({probe.rows} satır, {width}x{height}): "
+          f"tam {full_time * 1e3:.3f} ms / {height * width * 4} bayt, "
+          f"şerit {probe_time * 1e3:.3f} ms / {probe.rows * width * 4} bayt, "
+          f"{probe.get_stats()['avg_probed_columns']:.1f} sütun yoklandı | "
+          f"fark: en fazla {diff.max():.2f}, ortalama {diff.mean():.3f}, "
+          f"%{np.mean(diff <= 1.0) * 100:.1f} kare 1 puan içinde")
+
+def run_capture_benchmark(width, height, repeat=2000):
+    """mss ekran görüntüsünden numpy dizisine dönüşüm: PIL yolu ve kopyasız BGRA görünümü"""
+    raw = bytearray(np.random.default_rng(0).integers(0, 256, width * height * 4, dtype=np.uint8).tobytes())
+    screenshot = ScreenShot.from_size(raw, width, height)
+    
+    # Eski yol: .bgra kopyası + PIL çözümleme (piksel başına 4 bayt) + np.array kopyası
+    bgra = screenshot.bgra
+    img = Image.frombytes("RGB", screenshot.size, bgra, "raw", "BGRX")
+    array = np.array(img)
+    pil_bytes = len(bgra) + width * height * 4 + array.nbytes
+    
+    start = time.perf_counter()
+    for _ in range(repeat):
+        np.array(Image.frombytes("RGB", screenshot.size, screenshot.bgra, "raw", "BGRX"))
+    pil_time = (time.perf_counter() - start) / repeat
+    
+    # Yeni yol: ham tampon üzerinde görünüm
+    view = bgra_view(screenshot)
+    view_bytes = 0 if np.shares_memory(view, np.frombuffer(raw, dtype=np.uint8)) else view.nbytes
+    
+    start = time.perf_counter()
+    for _ in range(repeat):
+        bgra_view(screenshot)
+    view_time = (time.perf_counter() - start) / repeat
+    
+    print(f"Yakalama dönüşümü {width}x{height}: "
+          f"PIL {pil_bytes} bayt/kare kopya, {pil_time * 1e6:.1f} µs | "
+          f"BGRA görünüm {view_bytes} bayt/kare kopya, {view_time * 1e6:.1f} µs")
+
+def main():
+    parser = argparse.ArgumentParser(description="HP ve mini harita analizi benchmark")
+    parser.add_argument("--hp", help="Can barı kareleri (klasör veya .npy)")
+    parser.add_argument("--minimap", help="Mini harita kareleri (klasör veya .npy)")
+    parser.add_argument("--frames", type=int, default=1000, help="Ölçülecek kare sayısı")
+    parser.add_argument("--config", default="config.json", help="Bot yapılandırma dosyası")
+    args = parser.parse_args()
+    
+    hp_source = ReplayFrameSource(args.hp if args.hp else make_synthetic_hp_frames())
+    minimap_source = ReplayFrameSource(args.minimap if args.minimap else make_synthetic_minimap_frames())
+    
+    bot_engine = DiabloImmortalBotEngine(config_path=args.config, frame_source=hp_source)
+    farming_engine = FarmingEngine(frame_source=minimap_source)
+    
+    run_capture_benchmark(bot_engine.hp_bar["width"], bot_engine.hp_bar["height"])
+    run_capture_benchmark(300, 300)
+    
+    # Kayıtlı kareler zaten kırpılmış, bölge sadece arayüz için
+    run_benchmark("calculate_hp_percentage", hp_source,
+                  bot_engine.calculate_hp_percentage, bot_engine.hp_bar, args.frames)
+    if isinstance(hp_source.frames, np.ndarray):
+        run_batch_benchmark("calculate_hp_percentage_batch",
+                            bot_engine.calculate_hp_percentage_batch, hp_source.frames)
+        run_probe_comparison(bot_engine, hp_source.frames)
+        run_probe_comparison(bot_engine, make_synthetic_hp_frames(width=3840 // 2, height=40))
+    
+    # Renk tablosu modu (yapılandırılmış hp_colors aralıkları)
+    bot_engine.hp_color_mode = 'lut'
+    run_benchmark("calculate_hp_percentage (lut)", hp_source,
+                  bot_engine.calculate_hp_percentage, bot_engine.hp_bar, args.frames)
+    bot_engine.hp_color_mode = bot_engine.config.get('hp_color_mode', 'edge')
+    
+    run_benchmark("detect_character_marker", minimap_source,
+                  farming_engine.detect_character_marker, {"x": 0, "y": 0, "width": 0, "height": 0},
+                  args.frames)
+    detection = farming_engine.get_detection_stats()
+    tracking = detection['tracking']
+    print(f"  takip: kare başına {tracking['pixels_per_frame']:.0f} piksel "
+          f"(+{tracking['background_pixels_per_frame']:.0f} arka plan güncellemesi), "
+          f"tam tarama {tracking['full_scans']}/{tracking['frames']}, yedeğe düşme {tracking['fallbacks']}, "
+          f"arka planla elenen aday %{detection['background']['suppressed_ratio'] * 100:.1f}")
+    
+    # Bölgesel takip kapalı (her karede tüm mini harita)
+    farming_engine.configure_tracking(marker_tracking=False)
+    run_benchmark("detect_character_marker (tam tarama)", minimap_source,
+                  farming_engine.detect_character_marker, {"x": 0, "y": 0, "width": 0, "height": 0},
+                  args.frames)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import numpy as np
+
+def find_runs(mask):
+    """Satır başına ardışık True dizileri (run) -> (satır, başlangıç, bitiş hariç) dizileri, raster sırasında"""
+    height, width = mask.shape
+    padded = np.zeros((height, width + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    edges = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    return rows, starts, ends
+
+def _run_pairs(rows, starts, ends, stride, connectivity):
+    """Ardışık satırlarda birbirine değen run çiftleri (üst, alt)
+    
+    Satır içindeki run'lar sıralı ve ayrık olduğundan alttaki bir run'a değen üst run'lar
+    bitişik bir aralıktır; aralık sınırları satır*stride+sütun anahtarlarında ikili aramayla bulunur.
+    """
+    reach = 1 if connectivity == 8 else 0
+    end_keys = rows * stride + ends
+    start_keys = rows * stride + starts
+    above = rows - 1
+    lo = np.searchsorted(end_keys, above * stride + starts - reach + 1, side='left')
+    hi = np.searchsorted(start_keys, above * stride + ends - 1 + reach, side='right')
+    counts = np.maximum(hi - lo, 0)
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    lower = np.repeat(np.arange(len(rows)), counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    upper = np.repeat(lo, counts) + offsets
+    return upper, lower
+
+def _union_find(count, upper, lower):
+    """Run çiftlerini vektörel birleştir-bul ile birleştir -> run başına kök (bileşenin ilk run'ı)
+    
+    Her turda kökler çiftteki küçük köke bağlanır, ardından yollar tamamen sıkıştırılır;
+    bağlar hep küçük indekse gittiğinden döngü oluşmaz.
+    """
+    parent = np.arange(count)
+    while len(upper):
+        root_upper = parent[upper]
+        root_lower = parent[lower]
+        differ = root_upper != root_lower
+        if not np.any(differ):
+            break
+        root_upper = root_upper[differ]
+        root_lower = root_lower[differ]
+        np.minimum.at(parent, np.maximum(root_upper, root_lower), np.minimum(root_upper, root_lower))
+        while True:
+            compressed = parent[parent]
+            if np.array_equal(compressed, parent):
+                break
+            parent = compressed
+        upper = upper[differ]
+        lower = lower[differ]
+    return parent
+
+def label_components(mask, connectivity=8):
+    """Bool maskede bağlı bileşen etiketleme (run-length + birleştir-bul), tek geçiş
+    
+    Dönüş: (etiket görüntüsü int32, 0 = arka plan, istatistikler). Etiketler bileşenin ilk
+    pikselinin raster sırasındadır; istatistik dizilerinde etiket i'nin satırı i-1'dir:
+    area, centroid_x, centroid_y, bbox (x0, y0, x1, y1 dahil) ve uç noktalar
+    left, right, top, bottom ((x, y) çiftleri). Bileşen başına tam kare maske oluşturulmaz;
+    bir bileşenin pikselleri labels[y0:y1+1, x0:x1+1] == etiket ile alınır.
+    """
+    if connectivity not in (4, 8):
+        raise ValueError(f"connectivity 4 veya 8 olmalı: {connectivity}")
+    height, width = mask.shape
+    stride = width + 2
+    rows, starts, ends = find_runs(mask)
+    upper, lower = _run_pairs(rows, starts, ends, stride, connectivity)
+    parent = _union_find(len(rows), upper, lower)
+    
+    roots, run_labels = np.unique(parent, return_inverse=True)
+    count = len(roots)
+    run_labels = run_labels.ravel() + 1
+    
+    # Etiket görüntüsü: run sınırlarına +etiket/-etiket yazılıp satır boyunca kümülatif toplam
+    delta = np.zeros((height, width + 1), dtype=np.int32)
+    delta[rows, starts] = run_labels
+    delta[rows, ends] = -run_labels
+    labels = np.cumsum(delta, axis=1, dtype=np.int32)[:, :width]
+    
+    lengths = ends - starts
+    index = run_labels - 1
+    area = np.bincount(index, weights=lengths, minlength=count)
+    sum_x = np.bincount(index, weights=lengths * (starts + ends - 1) / 2.0, minlength=count)
+    sum_y = np.bincount(index, weights=lengths * rows, minlength=count)
+    
+    x0 = np.full(count, width, dtype=np.intp)
+    x1 = np.full(count, -1, dtype=np.intp)
+    np.minimum.at(x0, index, starts)
+    np.maximum.at(x1, index, ends - 1)
+    
+    # Kök ilk run (en üst), her bileşenin son run'ı en alt satırdadır
+    runs = np.arange(len(rows))
+    first_run = roots
+    last_run = np.zeros(count, dtype=np.intp)
+    np.maximum.at(last_run, index, runs)
+    # En sol/sağ uç: o sütuna ulaşan ilk run'ın satırı
+    left_run = np.full(count, len(rows), dtype=np.intp)
+    right_run = np.full(count, len(rows), dtype=np.intp)
+    np.minimum.at(left_run, index, np.where(starts == x0[index], runs, len(rows)))
+    np.minimum.at(right_run, index, np.where(ends - 1 == x1[index], runs, len(rows)))
+    
+    stats = {
+        'count': count,
+        'area': area.astype(np.intp),
+        'centroid_x': sum_x / np.maximum(area, 1),
+        'centroid_y': sum_y / np.maximum(area, 1),
+        'bbox': np.stack([x0, rows[first_run], x1, rows[last_run]], axis=1),
+        'left': np.stack([x0, rows[left_run]], axis=1),
+        'right': np.stack([x1, rows[right_run]], axis=1),
+        'top': np.stack([starts[first_run], rows[first_run]], axis=1),
+        'bottom': np.stack([starts[last_run], rows[last_run]], axis=1)
+    }
+    return labels, stats
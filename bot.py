@@ -1,6 +1,14 @@
-from gui import DiabloImmortalBotGUI
+import argparse
 
 if __name__ == "__main__":
-    app = DiabloImmortalBotGUI()
+    parser = argparse.ArgumentParser(description="Diablo Immortal HP Bot")
+    parser.add_argument("--instances", help="Çoklu örnek profilleri (ör. instances.json): tek süreçte birden çok oyun penceresi")
+    args = parser.parse_args()
+    
+    if args.instances:
+        from multi_gui import MultiInstanceGUI
+        app = MultiInstanceGUI(args.instances)
+    else:
+        from gui import DiabloImmortalBotGUI
+        app = DiabloImmortalBotGUI()
     app.run()
-
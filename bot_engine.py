@@ -1,47 +1,157 @@
-import mss
 import numpy as np
-from PIL import Image
 import time
-import json
+import math
 import threading
-from pynput.keyboard import Key, Controller
+from frame_source import MssFrameSource, OffsetFrameSource, to_rgb
+from adaptive_sampler import AdaptiveSampler
+from hp_predictor import HpPredictor
+from frame_memo import FrameMemo
+from color_lut import build_color_lut, classify_colors
+from hp_probe import HpProbeEstimator
+from input_worker import InputWorker, is_supported_key, PRIORITY_POTION, PRIORITY_RULE
+from latency_metrics import StageMetrics
+from async_runtime import wait_for_task
+from config_store import ConfigStore
+from frame_ring import FrameRingBuffer
+from region_monitor import RegionMonitor
+from tick_scheduler import TickScheduler
 
 class DiabloImmortalBotEngine:
-    def __init__(self, config_path="config.json", on_hp_update=None, on_potion_used=None, on_debug_image=None):
+    def __init__(self, config_path="config.json", on_hp_update=None, on_potion_used=None, on_debug_image=None,
+                 frame_source=None, input_worker=None, runtime=None, analysis_process=None, config_store=None,
+                 on_region_update=None, input_group=""):
         self.config_path = config_path
         self.on_hp_update = on_hp_update
         self.on_potion_used = on_potion_used
+        # on_region_update(okumalar, tetiklenen kural adları): ek bölgeler ve kural tablosu
+        self.on_region_update = on_region_update
         self.debug_image_callback = on_debug_image
         
         self.running = False
         self.bot_thread = None
+        self.bot_task = None
         self.lock = threading.Lock()
         
-        # MSS nesnesi thread-local olacak, bot thread'inde oluşturulacak
-        self.sct = None
-        self.keyboard_controller = Controller()
-        self.last_potion_time = 0
+        # Kare kaynağı: varsayılan canlı ekran (mss), test/benchmark için kayıttan oynatma
+        self.frame_source = frame_source if frame_source is not None else MssFrameSource()
+        # İsteğe bağlı ortak olay döngüsü (AsyncRuntime); yoksa motor kendi thread'inde çalışır
+        self.runtime = runtime
+        # İsteğe bağlı ayrı süreçte can analizi (AnalysisProcess, kind='hp')
+        self.analysis_process = analysis_process
+        # Tuş basma/bırakma ayrı thread'de yapılır, yakalama döngüsü beklemez
+        if input_worker is None:
+            input_worker = runtime.input_worker if runtime is not None else InputWorker()
+        self.input_worker = input_worker
+        # Tuş grubu öneki: ortak tuş zamanlayıcısında örneklerin grupları birbirini bırakmasın
+        self.input_group = input_group
+        self.last_potion_time = -math.inf  # time.perf_counter; henüz basılmadı
         self.potion_count = 0
-        self.debug_image_callback = None
+        self.sampler = None
+        self.predictor = None
+        self.hp_memo = None
+        self.color_lut = None
+        self.probe = None
+        # Ek bölgeler (mana, kalkan, yoldaş canı) ve kural tablosu; can barıyla aynı karede yakalanır
+        self.monitor = RegionMonitor(self.calculate_hp_percentage_batch)
+        # Son N saniyenin kareleri ve okumaları (ölüm sonrası inceleme için klip olarak kaydedilir)
+        self.debug_buffer = None
+        # İsteğe bağlı oturum kaydı (SessionRecorder): kareler, okumalar ve tuş olayları diske
+        self.recorder = None
         
+        # Yakalamadan karara kadar geçen süre (üstel ortalama, saniye)
+        self.analysis_latency = 0.0
+        
+        # Döngü aşamalarının gecikme histogramları
+        self.metrics = StageMetrics(("grab", "analysis", "callback", "decision", "key_press", "tick"))
+        self.scheduler = TickScheduler("hp_bot")
+        
+        # Yapılandırma deposu: güncellemeler arka planda atomik yazılır, dış değişiklikler yeniden yüklenir
+        self.config_store = config_store if config_store is not None else ConfigStore(config_path)
         self.load_config()
+        self.config_store.subscribe(self._on_config_reloaded)
+        self.config_store.start()
     
     def load_config(self):
-        with open(self.config_path, 'r', encoding='utf-8') as f:
-            self.config = json.load(f)
-        
+        self._apply_config(self.config_store.load())
+    
+    def _apply_config(self, config):
+        """Yapılandırma sözlüğünü motora uygula (ilk yükleme ve dosya dışarıdan değiştiğinde)"""
         with self.lock:
+            self.config = config
             self.hp_bar = self.config['hp_bar'].copy()
+            # Tablo sadece renk aralıkları değiştiğinde yeniden oluşturulur
+            if self.color_lut is None or self.config['hp_colors'] != self.hp_colors:
+                self.color_lut = build_color_lut(self.config['hp_colors'])
             self.hp_colors = self.config['hp_colors'].copy()
             self.hp_threshold = self.config['hp_threshold']
             self.key_to_press = self.config['key_to_press']
             self.check_interval = self.config['check_interval_ms'] / 1000.0
             self.cooldown = self.config['cooldown_ms'] / 1000.0
             self.key_press_duration = self.config.get('key_press_duration_ms', 60) / 1000.0
+            # "edge": renkler karenin kenarlarından türetilir, "lut": hp_colors aralıklarından tablo
+            self.hp_color_mode = self.config.get('hp_color_mode', 'edge')
+            # "full": tüm bölge yakalanıp analiz edilir, "probe": orta şerit + ikili arama
+            self.hp_estimator = self.config.get('hp_estimator', 'full')
+            probe_rows = self.config.get('probe_rows', 1)
+            if self.probe is None or self.probe.rows != probe_rows:
+                self.probe = HpProbeEstimator(probe_rows)
+            self._configure_debug_buffer()
+        
+        self.monitor.configure(config.get('regions', []), config.get('rules', []))
+        self._configure_sampling()
     
-    def save_config(self):
-        with open(self.config_path, 'w', encoding='utf-8') as f:
-            json.dump(self.config, f, indent=2, ensure_ascii=False)
+    def _configure_debug_buffer(self):
+        """Halka tamponu en sık kontrol aralığına göre boyutla; 0 saniye kaydı kapatır (kilit altında)"""
+        debug_seconds = self.config.get('debug_buffer_seconds', 10)
+        fastest = max(0.01, min(self.check_interval, self.config.get('min_check_interval_ms', 30) / 1000.0))
+        capacity = int(debug_seconds / fastest) + 1 if debug_seconds > 0 else 0
+        if capacity == 0:
+            self.debug_buffer = None
+        elif self.debug_buffer is None:
+            self.debug_buffer = FrameRingBuffer(capacity, ("hp",))
+        elif self.debug_buffer.capacity != capacity:
+            # Aralık değişti: son kayıtlar korunarak yeniden boyutlanır
+            self.debug_buffer.resize(capacity)
+    
+    def _on_config_reloaded(self, config):
+        """config.json dışarıdan düzenlendi (ConfigStore izleme thread'i)"""
+        self._apply_config(config)
+        if self.analysis_process is not None:
+            self.analysis_process.reload_config(config)
+    
+    def _configure_sampling(self):
+        with self.lock:
+            check_interval = self.check_interval
+            # Uyarlamalı örnekleme: can eğimine göre kontrol aralığı min/max arasında değişir
+            adaptive = self.config.get('adaptive_sampling', False)
+            min_interval = self.config.get('min_check_interval_ms', 30) / 1000.0
+            max_interval = self.config.get('max_check_interval_ms', 300) / 1000.0
+            # Tahmine dayalı tetikleme: eşik geçişi tepki süresi içinde tahmin edilirse erken bas
+            predictive = self.config.get('predictive_trigger', False)
+            window = self.config.get('prediction_window', 6)
+            game_latency = self.config.get('potion_latency_ms', 150) / 1000.0
+            min_drop = self.config.get('prediction_min_drop_per_s', 5.0)
+            # Kare önbelleği: parmak izi değişmeyen karelerde önceki can okuması kullanılır
+            memo_enabled = self.config.get('frame_memo', True)
+            memo_tolerance = self.config.get('frame_memo_tolerance', 1.0)
+        
+        if self.sampler is None:
+            self.sampler = AdaptiveSampler(check_interval, min_interval, max_interval, enabled=adaptive)
+        else:
+            self.sampler.configure(check_interval, min_interval, max_interval, enabled=adaptive)
+        
+        if self.predictor is None:
+            self.predictor = HpPredictor(window, enabled=predictive, game_latency=game_latency,
+                                         min_drop_per_s=min_drop)
+        else:
+            self.predictor.configure(window, enabled=predictive, game_latency=game_latency,
+                                     min_drop_per_s=min_drop)
+        
+        # Renk aralıkları veya bölge değişmiş olabilir, önbellekteki okuma geçersiz
+        if self.hp_memo is None:
+            self.hp_memo = FrameMemo(memo_tolerance, enabled=memo_enabled)
+        else:
+            self.hp_memo.configure(memo_tolerance, enabled=memo_enabled)
     
     def update_config(self, **kwargs):
         with self.lock:
@@ -49,8 +159,20 @@ class DiabloImmortalBotEngine:
                 self.hp_bar = kwargs['hp_bar'].copy()
                 self.config['hp_bar'] = kwargs['hp_bar']
             if 'hp_colors' in kwargs:
+                # Tablo sadece renk aralıkları gerçekten değiştiğinde yeniden oluşturulur
+                if kwargs['hp_colors'] != self.hp_colors:
+                    self.color_lut = build_color_lut(kwargs['hp_colors'])
                 self.hp_colors = kwargs['hp_colors'].copy()
                 self.config['hp_colors'] = kwargs['hp_colors']
+            if 'hp_color_mode' in kwargs:
+                self.hp_color_mode = kwargs['hp_color_mode']
+                self.config['hp_color_mode'] = kwargs['hp_color_mode']
+            if 'hp_estimator' in kwargs:
+                self.hp_estimator = kwargs['hp_estimator']
+                self.config['hp_estimator'] = kwargs['hp_estimator']
+            if 'probe_rows' in kwargs:
+                self.probe = HpProbeEstimator(kwargs['probe_rows'])
+                self.config['probe_rows'] = kwargs['probe_rows']
             if 'hp_threshold' in kwargs:
                 self.hp_threshold = kwargs['hp_threshold']
                 self.config['hp_threshold'] = kwargs['hp_threshold']
@@ -66,38 +188,87 @@ class DiabloImmortalBotEngine:
             if 'key_press_duration_ms' in kwargs:
                 self.key_press_duration = kwargs['key_press_duration_ms'] / 1000.0
                 self.config['key_press_duration_ms'] = kwargs['key_press_duration_ms']
+            for key in ('adaptive_sampling', 'min_check_interval_ms', 'max_check_interval_ms',
+                        'predictive_trigger', 'prediction_window', 'potion_latency_ms',
+                        'prediction_min_drop_per_s', 'frame_memo', 'frame_memo_tolerance'):
+                if key in kwargs:
+                    self.config[key] = kwargs[key]
+            if 'regions' in kwargs:
+                self.config['regions'] = kwargs['regions']
+            if 'rules' in kwargs:
+                self.config['rules'] = kwargs['rules']
+            if 'debug_buffer_seconds' in kwargs:
+                self.config['debug_buffer_seconds'] = kwargs['debug_buffer_seconds']
+            self._configure_debug_buffer()
+            regions = self.config.get('regions', [])
+            rules = self.config.get('rules', [])
         
-        self.save_config()
-    
-    def capture_hp_bar(self, use_temp_mss=False):
-        # MSS nesnesi thread-safe değil, her thread'de ayrı oluşturulmalı
-        # use_temp_mss: GUI'den çağrıldığında geçici MSS kullan
-        if use_temp_mss or self.sct is None:
-            sct = mss.mss()
-        else:
-            sct = self.sct
+        if 'regions' in kwargs or 'rules' in kwargs:
+            self.monitor.configure(regions, rules)
+        self._configure_sampling()
         
+        # Sadece değişen anahtarlar depoya gider, dosya arka planda (birleştirilerek) yazılır
+        with self.lock:
+            changes = {key: self.config[key] for key in kwargs if key in self.config}
+            config = dict(self.config)
+        self.config_store.update(changes)
+        if self.analysis_process is not None:
+            self.analysis_process.reload_config(config)
+    
+    def _hp_capture_region(self):
         with self.lock:
             hp_bar = self.hp_bar.copy()
+            if self.hp_estimator == 'probe':
+                # Sadece barın ortasından geçen ince şerit yakalanır
+                hp_bar = self.probe.strip_region(hp_bar)
+        return hp_bar
+    
+    def capture_hp_bar(self, use_temp_mss=False):
+        # use_temp_mss: GUI'den çağrıldığında (bot thread'i dışında) geçici ekran nesnesiyle
+        # tüm barı yakala; motorun kare kaynağı (broker aboneliği ve periyot istatistiği) kullanılmaz
+        if use_temp_mss:
+            return self._capture_full_bar()
         
-        monitor = {
-            "top": hp_bar["y"],
-            "left": hp_bar["x"],
-            "width": hp_bar["width"],
-            "height": hp_bar["height"]
-        }
-        screenshot = sct.grab(monitor)
-        img = Image.frombytes("RGB", screenshot.size, screenshot.bgra, "raw", "BGRX")
-        img_array = np.array(img)
-        
+        img_array = self.frame_source.grab(self._hp_capture_region())
         # Debug için görüntüyü kaydet (sadece bot thread'inde)
-        if not use_temp_mss and self.debug_image_callback:
+        self._send_debug_image(img_array)
+        return img_array
+    
+    def _capture_full_bar(self):
+        """Renk algılama için tüm can barı (probe modunda da), iş bitince kapatılan mss nesnesiyle"""
+        with self.lock:
+            hp_bar = self.hp_bar.copy()
+        source = MssFrameSource()
+        if isinstance(self.frame_source, OffsetFrameSource):
+            # Çoklu örnekte bölgeler oyun penceresine göredir
+            source = OffsetFrameSource(source, self.frame_source.offset_x, self.frame_source.offset_y)
+        try:
+            return source.grab(hp_bar).copy()
+        finally:
+            source.close()
+    
+    def _send_debug_image(self, img_array):
+        if self.debug_image_callback:
             try:
-                self.debug_image_callback(img_array.copy())
+                self.debug_image_callback(np.ascontiguousarray(to_rgb(img_array)))
             except:
                 pass
+    
+    def capture_regions(self):
+        """Can barı ve ek bölgeleri aynı tick'te al -> (can barı görünümü, [(dikdörtgen, kare)])
         
-        return img_array
+        Yakın bölgeler tek dikdörtgende, uzak bölgeler ayrı yakalanır; ek bölge yoksa sadece
+        can barı yakalanır (kare listesi None).
+        """
+        if not self.monitor.enabled:
+            return self.capture_hp_bar(), None
+        
+        hp_region = self._hp_capture_region()
+        groups = self.monitor.capture_groups(hp_region)
+        frames = list(zip(groups, self.frame_source.grab_many(groups)))
+        hp_bar_image = RegionMonitor.find_view(frames, hp_region)
+        self._send_debug_image(hp_bar_image)
+        return hp_bar_image, frames
     
     def calculate_hp_percentage(self, hp_bar_image):
         height, width = hp_bar_image.shape[:2]
@@ -105,99 +276,121 @@ class DiabloImmortalBotEngine:
         if height == 0 or width == 0:
             return 0
         
-        # Tüm satırların ortalamasını al (daha stabil)
-        avg_line = np.mean(hp_bar_image, axis=0).astype(np.uint8)
+        if self.hp_estimator == 'probe':
+            return self.probe.estimate(hp_bar_image, self.color_lut if self.hp_color_mode == 'lut' else None)
+        
+        return float(self.calculate_hp_percentage_batch(hp_bar_image[np.newaxis])[0])
+    
+    def calculate_hp_percentage_batch(self, frames, color_mode=None, lut=None):
+        """N×H×W×3 kare yığını için N can yüzdesini tek vektörel çağrıda hesapla
         
-        # RGB kanalları
-        r = avg_line[:, 0]
-        g = avg_line[:, 1]
-        b = avg_line[:, 2]
+        BGRA (mss) kareler kopyalanmadan RGB görünümü üzerinden okunur.
+        color_mode/lut verilmezse motorun can barı ayarları kullanılır (ek bölgeler kendi ayarlarını verir).
+        """
+        if color_mode is None:
+            color_mode, lut = self.hp_color_mode, self.color_lut
+        frames = to_rgb(np.asarray(frames))
+        count, height, width = frames.shape[:3]
+        
+        if count == 0:
+            return np.empty(0, dtype=np.float64)
+        if height == 0 or width == 0:
+            return np.zeros(count, dtype=np.float64)
+        
+        # Tüm satırların ortalamasını al (daha stabil) -> N×W×3
+        avg_lines = np.mean(frames, axis=1).astype(np.uint8)
         
-        # Sol taraftaki ilk birkaç pikseli analiz et (can barının rengini bul)
         sample_width = min(20, width // 4)
-        sample_r = r[:sample_width]
-        sample_g = g[:sample_width]
-        sample_b = b[:sample_width]
+        # İlk 10 piksel her zaman can barı olarak kabul et (gürültü önleme)
+        start_check = max(10, sample_width)
         
-        # Can barının ortalama rengini hesapla
-        hp_color_r = np.mean(sample_r)
-        hp_color_g = np.mean(sample_g)
-        hp_color_b = np.mean(sample_b)
+        if color_mode == 'lut':
+            # Yapılandırılmış renk aralıkları: her sütun tablodan tek indekslemeyle sınıflandırılır
+            hp_mask = classify_colors(avg_lines, lut)
+            hp_end = self._find_hp_end(hp_mask, start_check)
+            return np.clip(hp_end / width * 100, 0, 100).astype(np.float64)
         
-        # Sağ taraftaki son birkaç pikseli analiz et (boş alanın rengini bul)
-        empty_sample_r = r[-sample_width:]
-        empty_sample_g = g[-sample_width:]
-        empty_sample_b = b[-sample_width:]
+        # RGB kanalları (N×W)
+        r = avg_lines[:, :, 0]
+        g = avg_lines[:, :, 1]
+        b = avg_lines[:, :, 2]
         
-        empty_color_r = np.mean(empty_sample_r)
-        empty_color_g = np.mean(empty_sample_g)
-        empty_color_b = np.mean(empty_sample_b)
+        # Sol taraftaki ilk birkaç piksel can barının, sağdaki son birkaç piksel boş alanın rengi (N×3)
+        hp_color = np.mean(avg_lines[:, :sample_width], axis=1)
+        empty_color = np.mean(avg_lines[:, -sample_width:], axis=1)
         
         # Renk farkını hesapla
-        color_diff = abs(hp_color_r - empty_color_r) + abs(hp_color_g - empty_color_g) + abs(hp_color_b - empty_color_b)
+        color_diff = np.sum(np.abs(hp_color - empty_color), axis=1)
         
-        # Eğer renk farkı çok küçükse, parlaklık farkını kullan
-        if color_diff < 30:
-            hp_brightness = (hp_color_r + hp_color_g + hp_color_b) / 3
-            empty_brightness = (empty_color_r + empty_color_g + empty_color_b) / 3
-            brightness_diff = abs(hp_brightness - empty_brightness)
-            
-            if brightness_diff > 20:
-                # Parlaklık farkı ile tespit
-                threshold = (hp_brightness + empty_brightness) / 2
-                brightness = (r + g + b) / 3
-                hp_mask = brightness > threshold
-            else:
-                # Çok küçük fark, varsayılan olarak tam dolu kabul et
-                return 100.0
-        else:
-            # Renk farkı ile tespit
-            # Her pikselin can barı rengine olan uzaklığını hesapla
-            color_distance = np.sqrt(
-                (r - hp_color_r) ** 2 + 
-                (g - hp_color_g) ** 2 + 
-                (b - hp_color_b) ** 2
-            )
-            
-            empty_distance = np.sqrt(
-                (r - empty_color_r) ** 2 + 
-                (g - empty_color_g) ** 2 + 
-                (b - empty_color_b) ** 2
-            )
-            
-            # Eşik değeri: can barı rengine daha yakın olan pikseller
-            hp_mask = color_distance < empty_distance
-            
-            # Eğer çok az eşleşme varsa, toleransı artır
-            if np.sum(hp_mask) < width * 0.1:
-                # Daha toleranslı eşik
-                threshold_distance = np.max(color_distance[:sample_width]) * 1.5
-                hp_mask = color_distance < threshold_distance
+        # Renk farkı çok küçükse parlaklık farkı kullanılır
+        use_brightness = color_diff < 30
+        hp_brightness = np.sum(hp_color, axis=1) / 3
+        empty_brightness = np.sum(empty_color, axis=1) / 3
+        brightness_diff = np.abs(hp_brightness - empty_brightness)
         
-        # Soldan sağa tarayarak can barının bittiği yeri bul
-        # Smoothing için: birkaç ardışık pikselin çoğunun boş olması gerekir
-        hp_end = width
+        # Çok küçük fark, varsayılan olarak tam dolu kabul et
+        assume_full = use_brightness & (brightness_diff <= 20)
         
-        # İlk 10 piksel her zaman can barı olarak kabul et (gürültü önleme)
-        start_check = max(10, sample_width)
+        # Parlaklık farkı ile tespit
+        threshold = (hp_brightness + empty_brightness) / 2
+        brightness = (r + g + b) / 3
+        brightness_mask = brightness > threshold[:, np.newaxis]
         
-        for i in range(start_check, width):
-            # Şu anki piksel ve sonraki birkaç pikseli kontrol et
-            check_range = min(5, width - i)
-            hp_count = np.sum(hp_mask[i:i+check_range])
-            
-            # Eğer çoğunluğu boşsa, can barı burada bitiyor
-            if hp_count < (check_range * 0.3):
-                hp_end = i
-                break
+        # Renk farkı ile tespit: can barı rengine daha yakın olan pikseller
+        color_distance = np.sqrt(
+            (r - hp_color[:, 0:1]) ** 2 +
+            (g - hp_color[:, 1:2]) ** 2 +
+            (b - hp_color[:, 2:3]) ** 2
+        )
+        empty_distance = np.sqrt(
+            (r - empty_color[:, 0:1]) ** 2 +
+            (g - empty_color[:, 1:2]) ** 2 +
+            (b - empty_color[:, 2:3]) ** 2
+        )
+        color_mask = color_distance < empty_distance
+        
+        # Eğer çok az eşleşme varsa, toleransı artır
+        too_few = np.sum(color_mask, axis=1) < width * 0.1
+        if np.any(too_few):
+            threshold_distance = np.max(color_distance[:, :sample_width], axis=1) * 1.5
+            tolerant_mask = color_distance < threshold_distance[:, np.newaxis]
+            color_mask = np.where(too_few[:, np.newaxis], tolerant_mask, color_mask)
+        
+        hp_mask = np.where(use_brightness[:, np.newaxis], brightness_mask, color_mask)
+        
+        hp_end = self._find_hp_end(hp_mask, start_check)
         
         # Can yüzdesini hesapla
-        hp_percentage = (hp_end / width) * 100
+        hp_percentage = np.where(assume_full, 100.0, (hp_end / width) * 100)
+        
+        return np.clip(hp_percentage, 0, 100)
+    
+    @staticmethod
+    def _find_hp_end(hp_mask, start_check, check_range=5):
+        """Can barının bittiği sütunu bul (her satır bir kare)
+        
+        Bir sütundan itibaren check_range piksellik pencerenin çoğunluğu (%70'ten fazlası)
+        boşsa can barı orada biter. Pencere toplamları kümülatif toplamla tek geçişte hesaplanır.
+        """
+        count, width = hp_mask.shape
+        if start_check >= width:
+            return np.full(count, width)
+        
+        cumulative = np.zeros((count, width + 1), dtype=np.int32)
+        np.cumsum(hp_mask, axis=1, out=cumulative[:, 1:])
         
-        return max(0, min(100, hp_percentage))
+        # Sona yakın sütunlarda pencere kısalır
+        starts = np.arange(start_check, width)
+        ends = np.minimum(starts + check_range, width)
+        hp_counts = cumulative[:, ends] - cumulative[:, starts]
+        
+        # Eğer çoğunluğu boşsa, can barı burada bitiyor
+        is_end = hp_counts < (ends - starts) * 0.3
+        
+        return np.where(np.any(is_end, axis=1), start_check + np.argmax(is_end, axis=1), width)
     
     def press_key(self):
-        current_time = time.time()
+        current_time = time.perf_counter()
         
         with self.lock:
             if current_time - self.last_potion_time < self.cooldown:
@@ -205,68 +398,131 @@ class DiabloImmortalBotEngine:
             key_to_press = self.key_to_press
             key_press_duration = self.key_press_duration
         
+        if is_supported_key(key_to_press):
+            # Potion önceliklidir: basılı hareket tuşları basış süresince bırakılır
+            self.input_worker.submit(key_to_press, key_press_duration, group=f"{self.input_group}potion",
+                                     on_error=self._on_key_error, priority=PRIORITY_POTION)
+            recorder = self.recorder
+            if recorder is not None:
+                recorder.record("keys", key_to_press, time.perf_counter(), key_press_duration)
+        
+        with self.lock:
+            self.last_potion_time = current_time
+            self.potion_count += 1
+        
+        if self.on_potion_used:
+            self.on_potion_used(self.potion_count, key_to_press)
+        
+        return True
+    
+    def _fire_rules(self, rules):
+        """Kural tablosundan tetiklenen tuşları öncelik sırasıyla bas"""
+        recorder = self.recorder
+        for rule in rules:
+            if not is_supported_key(rule["key"]):
+                continue
+            self.input_worker.submit(rule["key"], rule["duration"], group=f"{self.input_group}rule:{rule['name']}",
+                                     on_error=self._on_key_error, priority=PRIORITY_RULE)
+            if recorder is not None:
+                recorder.record("keys", rule["key"], time.perf_counter(), rule["duration"])
+    
+    def _on_key_error(self, error):
+        if self.on_potion_used:
+            self.on_potion_used(-1, f"Hata: {error}")
+    
+    def _bot_tick(self):
+        """Tek kontrol adımı (yakala, analiz et, karar ver) -> sonraki adıma kadar beklenecek süre (s)"""
         try:
-            if len(key_to_press) == 1:
-                self.keyboard_controller.press(key_to_press)
-                time.sleep(key_press_duration)  # Doğal tuş basma gecikmesi
-                self.keyboard_controller.release(key_to_press)
-            elif key_to_press.lower().startswith('f'):
-                f_key_map = {
-                    'f1': Key.f1, 'f2': Key.f2, 'f3': Key.f3, 'f4': Key.f4,
-                    'f5': Key.f5, 'f6': Key.f6, 'f7': Key.f7, 'f8': Key.f8,
-                    'f9': Key.f9, 'f10': Key.f10, 'f11': Key.f11, 'f12': Key.f12
-                }
-                key_obj = f_key_map.get(key_to_press.lower())
-                if key_obj:
-                    self.keyboard_controller.press(key_obj)
-                    time.sleep(key_press_duration)  # Doğal tuş basma gecikmesi
-                    self.keyboard_controller.release(key_obj)
+            tick_start = time.perf_counter_ns()
+            hp_bar_image, region_frames = self.capture_regions()
+            frame_time = self.frame_source.last_frame_time or tick_start / 1e9
+            grab_end = time.perf_counter_ns()
+            hit, hp_percentage = self.hp_memo.lookup(hp_bar_image)
+            if not hit:
+                if self.analysis_process is not None:
+                    hp_percentage = self.analysis_process.analyze(hp_bar_image)
+                else:
+                    hp_percentage = self.calculate_hp_percentage(hp_bar_image)
+                self.hp_memo.store(hp_percentage)
+            # Ek bölgeler aynı karenin görünümleri, boyutça eşleşenler tek yığında analiz edilir
+            readings = {"hp": hp_percentage}
+            if region_frames is not None:
+                readings.update(self.monitor.analyze(region_frames))
+            analysis_end = time.perf_counter_ns()
+            debug_buffer = self.debug_buffer
+            if debug_buffer is not None:
+                debug_buffer.record(hp_bar_image, frame_time, hp_percentage)
+            recorder = self.recorder
+            if recorder is not None:
+                recorder.record("hp", hp_bar_image, frame_time, hp_percentage)
+            self.sampler.record(hp_percentage, frame_time)
+            self.predictor.record(hp_percentage, frame_time)
+            
+            if self.on_hp_update:
+                self.on_hp_update(hp_percentage)
+            callback_end = time.perf_counter_ns()
             
             with self.lock:
-                self.last_potion_time = current_time
-                self.potion_count += 1
+                threshold = self.hp_threshold
             
-            if self.on_potion_used:
-                self.on_potion_used(self.potion_count, key_to_press)
+            # Ölçülen tepki süresi: kare->karar + tuş basma gecikmesi + sonraki örneğe kadar geçecek süre
+            now = time.perf_counter()
+            latency = now - frame_time
+            self.analysis_latency = latency if self.analysis_latency == 0 else self.analysis_latency * 0.8 + latency * 0.2
+            measured_latency = self.analysis_latency + self.input_worker.press_latency + self.sampler.current_interval
+            predicted, time_to_threshold = self.predictor.evaluate(threshold, measured_latency, now)
             
-            return True
+            reactive = hp_percentage <= threshold
+            predictive = not reactive and predicted and self.predictor.enabled
+            fired_rules = self.monitor.due_rules(readings, now)
+            decision_end = time.perf_counter_ns()
+            
+            if fired_rules:
+                self._fire_rules(fired_rules)
+            if self.on_region_update and (region_frames is not None or fired_rules):
+                self.on_region_update(readings, [rule["name"] for rule in fired_rules])
+            
+            self.metrics.record("grab", grab_end - tick_start)
+            self.metrics.record("analysis", analysis_end - grab_end)
+            self.metrics.record("callback", callback_end - analysis_end)
+            self.metrics.record("decision", decision_end - callback_end)
+            
+            if reactive or predictive:
+                if self.press_key():
+                    self.predictor.note_fire(predictive, now, time_to_threshold)
+                press_end = time.perf_counter_ns()
+                self.metrics.record("key_press", press_end - decision_end)
+                self.metrics.record("tick", press_end - tick_start)
+            else:
+                self.metrics.record("tick", decision_end - tick_start)
+            
+            # Bekleme süresini press_key uygular; potion sonrası da izleme normal hızda sürer
+            return self.sampler.next_interval(threshold)
+        
         except Exception as e:
-            if self.on_potion_used:
-                self.on_potion_used(-1, f"Hata: {e}")
-            return False
+            if self.on_hp_update:
+                self.on_hp_update(-1, error=str(e))
+            return 1.0
     
     def _bot_loop(self):
-        # MSS nesnesini bu thread'de oluştur (thread-safe için)
-        self.sct = mss.mss()
-        
+        self.scheduler.start()
         while self.running:
-            try:
-                hp_bar_image = self.capture_hp_bar()
-                hp_percentage = self.calculate_hp_percentage(hp_bar_image)
-                
-                if self.on_hp_update:
-                    self.on_hp_update(hp_percentage)
-                
-                with self.lock:
-                    threshold = self.hp_threshold
-                    check_interval = self.check_interval
-                
-                if hp_percentage <= threshold:
-                    self.press_key()
-                    time.sleep(self.cooldown)
-                else:
-                    time.sleep(check_interval)
-                    
-            except Exception as e:
-                if self.on_hp_update:
-                    self.on_hp_update(-1, error=str(e))
-                time.sleep(1)
+            self.scheduler.begin_tick()
+            time.sleep(self.scheduler.next_delay(self._bot_tick()))
+        
+        # Bu thread'e ait ekran nesnesini serbest bırak
+        self.frame_source.close()
     
     def start(self):
         if not self.running:
             self.running = True
-            self.bot_thread = threading.Thread(target=self._bot_loop, daemon=True)
-            self.bot_thread.start()
+            if self.runtime is not None:
+                # Tek olay döngüsü: adımlar runtime executor'ında, beklemeler coroutine'de
+                self.bot_task = self.runtime.spawn(
+                    self.runtime.run_engine(self, self._bot_tick, self.frame_source.close, self.scheduler))
+            else:
+                self.bot_thread = threading.Thread(target=self._bot_loop, daemon=True)
+                self.bot_thread.start()
             return True
         return False
     
@@ -274,12 +530,24 @@ class DiabloImmortalBotEngine:
         self.running = False
         if self.bot_thread:
             self.bot_thread.join(timeout=2.0)
+        if self.bot_task:
+            wait_for_task(self.bot_task, timeout=2.0)
+            self.bot_task = None
     
     def get_stats(self):
         with self.lock:
             return {
                 'potion_count': self.potion_count,
-                'last_potion_time': self.last_potion_time,
-                'running': self.running
+                # Duvar saati (time.time) olarak; henüz basılmadıysa None
+                'last_potion_time': (time.time() - (time.perf_counter() - self.last_potion_time)
+                                     if self.last_potion_time > -math.inf else None),
+                'running': self.running,
+                'sampling': self.sampler.get_stats(),
+                'prediction': self.predictor.get_stats(),
+                'frame_memo': self.hp_memo.get_stats(),
+                'probe': self.probe.get_stats(),
+                'regions': self.monitor.get_stats(),
+                'analysis_process': self.analysis_process.get_stats() if self.analysis_process else None,
+                'scheduler': self.scheduler.get_stats(),
+                'latency': self.metrics.snapshot()
             }
-
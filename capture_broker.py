@@ -0,0 +1,190 @@
+import time
+import threading
+from frame_source import FrameSource, MssFrameSource
+
+def region_area(region):
+    return region["width"] * region["height"]
+
+def region_union(a, b):
+    """İki bölgeyi kapsayan en küçük dikdörtgen"""
+    x1 = min(a["x"], b["x"])
+    y1 = min(a["y"], b["y"])
+    x2 = max(a["x"] + a["width"], b["x"] + b["width"])
+    y2 = max(a["y"] + a["height"], b["y"] + b["height"])
+    return {"x": x1, "y": y1, "width": x2 - x1, "height": y2 - y1}
+
+def region_contains(outer, inner):
+    return (outer["x"] <= inner["x"] and outer["y"] <= inner["y"] and
+            inner["x"] + inner["width"] <= outer["x"] + outer["width"] and
+            inner["y"] + inner["height"] <= outer["y"] + outer["height"])
+
+def merge_regions(regions, merge_ratio):
+    """Birbirine yakın bölgeleri birleşik dikdörtgenlerde topla
+    
+    İki grup, birleşik alanları kapsadıkları alanların merge_ratio katını aşmıyorsa birleşir;
+    birbirinden uzak bölgeler ayrı dikdörtgenler olarak kalır (ayrı yakalanır).
+    """
+    groups = [(region.copy(), region_area(region)) for region in regions]
+    merged = True
+    while merged and len(groups) > 1:
+        merged = False
+        for i in range(len(groups)):
+            for j in range(i + 1, len(groups)):
+                union = region_union(groups[i][0], groups[j][0])
+                covered = groups[i][1] + groups[j][1]
+                if region_area(union) <= covered * merge_ratio:
+                    groups[i] = (union, covered)
+                    del groups[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    return [group[0] for group in groups]
+
+class CaptureBroker:
+    """Tüm abonelerin bölgelerini aynı karede yakalayan aracı
+    
+    Kayıtlı bölgeler birleşik dikdörtgen(ler) halinde tek seferde yakalanır, her abone
+    kendi bölgesini bu karenin kopyasız alt görünümü olarak alır. Aynı tick'teki tüm
+    görünümler aynı zaman damgasını taşır. Yakalama, isteyen abonenin thread'inde o
+    thread'in mss nesnesiyle yapılır; tüm grab çağrıları (ve close) broker kilidi altındadır.
+    
+    Bir abone henüz almadığı bir kareyi, kare yaşı kendi istek aralığının frame_age_ratio
+    katını (en fazla max_frame_age_ms) aşmıyorsa yeniden kullanır. Böylece farklı hızlardaki
+    döngüler (ör. 50 ms farming, 100 ms can takibi) kareleri paylaşır, her döngünün gördüğü
+    kare ise kendi periyodunun yarısından eski olmaz.
+    
+    merge_ratio: iki bölge, birleşik alanları toplam alanlarının bu katını aşmıyorsa tek
+                 dikdörtgen olarak yakalanır (birbirinden uzak bölgeler ayrı yakalanır)
+    stale_after_ms: bu süre boyunca kare istemeyen abonenin bölgesi birleşimden çıkarılır
+    """
+    
+    def __init__(self, frame_source=None, frame_age_ratio=0.5, max_frame_age_ms=100, merge_ratio=4.0,
+                 stale_after_ms=1000):
+        # Kare kaynağı broker'a ait, grab çağrıları broker kilidiyle sıralanır
+        self.frame_source = frame_source if frame_source is not None else MssFrameSource()
+        self.frame_age_ratio = frame_age_ratio
+        self.max_frame_age = max_frame_age_ms / 1000.0
+        self.merge_ratio = merge_ratio
+        self.stale_after = stale_after_ms / 1000.0
+        self.lock = threading.Lock()
+        
+        # Abone adı -> {"regions": [dict], "last_request": float, "interval": float (istek aralığı
+        # üstel ortalaması, s), "last_frame_id": int}
+        self.subscribers = {}
+        
+        # Son tick: [(birleşik bölge, kare)], zaman damgası ve kimliği
+        self.frames = []
+        self.frame_time = 0
+        self.frame_id = 0
+        
+        # İstatistikler
+        self.request_count = 0
+        self.tick_count = 0
+        self.grab_count = 0
+    
+    def subscribe(self, name):
+        """Motorlara frame_source olarak verilebilecek bir abonelik oluştur"""
+        return BrokerSubscription(self, name)
+    
+    def unsubscribe(self, name):
+        """Aboneliği bırak ve çağıran thread'in ekran nesnesini kapat (motor döngüsü çıkarken)"""
+        with self.lock:
+            self.subscribers.pop(name, None)
+            self.frame_source.close()
+    
+    def _active_regions(self, now):
+        return [region for sub in self.subscribers.values()
+                if now - sub["last_request"] <= self.stale_after
+                for region in sub["regions"]]
+    
+    def _tick(self, now):
+        """Tüm aktif bölgeleri yakala (yeni tick)"""
+        frames = []
+        for union in merge_regions(self._active_regions(now), self.merge_ratio):
+            frames.append((union, self.frame_source.grab(union)))
+            self.grab_count += 1
+        self.frames = frames
+        self.frame_time = now
+        self.frame_id += 1
+        self.tick_count += 1
+    
+    def _find_view(self, region):
+        for union, frame in self.frames:
+            if region_contains(union, region):
+                x = region["x"] - union["x"]
+                y = region["y"] - union["y"]
+                return frame[y:y + region["height"], x:x + region["width"]]
+        return None
+    
+    def grab(self, name, region):
+        """Abonenin bölgesini döndür: (görünüm, kare zamanı, kare kimliği)"""
+        views, frame_time, frame_id = self.grab_many(name, [region])
+        return views[0], frame_time, frame_id
+    
+    def grab_many(self, name, regions):
+        """Abonenin tüm bölgelerini aynı tick'ten döndür: (görünümler, kare zamanı, kare kimliği)"""
+        with self.lock:
+            now = time.perf_counter()
+            self.request_count += 1
+            
+            sub = self.subscribers.get(name)
+            if sub is None:
+                sub = {"regions": [], "last_request": now, "interval": 0.0, "last_frame_id": 0}
+                self.subscribers[name] = sub
+            elapsed = now - sub["last_request"]
+            if 0 < elapsed <= self.stale_after:
+                sub["interval"] = elapsed if sub["interval"] == 0 else sub["interval"] * 0.8 + elapsed * 0.2
+            sub["regions"] = [region.copy() for region in regions]
+            sub["last_request"] = now
+            
+            views = None
+            # Abone bu kareyi henüz almadıysa ve kare kendi periyoduna göre tazeyse yeniden kullan
+            if sub["last_frame_id"] != self.frame_id and now - self.frame_time <= self._max_age(sub):
+                views = [self._find_view(region) for region in regions]
+            
+            if views is None or any(view is None for view in views):
+                self._tick(now)
+                views = [self._find_view(region) for region in regions]
+            
+            sub["last_frame_id"] = self.frame_id
+            return views, self.frame_time, self.frame_id
+    
+    def _max_age(self, sub):
+        return min(sub["interval"] * self.frame_age_ratio, self.max_frame_age)
+    
+    def get_stats(self):
+        with self.lock:
+            return {
+                'requests': self.request_count,
+                'ticks': self.tick_count,
+                'grabs': self.grab_count,
+                'shared_ratio': 1 - self.tick_count / self.request_count if self.request_count else 0.0,
+                'subscribers': list(self.subscribers.keys()),
+                'max_frame_age_ms': {name: self._max_age(sub) * 1000 for name, sub in self.subscribers.items()}
+            }
+    
+    def close(self):
+        with self.lock:
+            self.frames = []
+            self.frame_source.close()
+
+class BrokerSubscription(FrameSource):
+    """CaptureBroker üzerinden kare alan FrameSource"""
+    
+    def __init__(self, broker, name):
+        self.broker = broker
+        self.name = name
+        self.last_frame_id = 0
+    
+    def grab(self, region):
+        view, self.last_frame_time, self.last_frame_id = self.broker.grab(self.name, region)
+        return view
+    
+    def grab_many(self, regions):
+        views, self.last_frame_time, self.last_frame_id = self.broker.grab_many(self.name, regions)
+        return views
+    
+    def close(self):
+        # Kare kaynağı broker'a ait: aboneliği ve bu thread'in ekran nesnesini bırak
+        self.broker.unsubscribe(self.name)
@@ -0,0 +1,38 @@
+import numpy as np
+
+def _channel_bins(low, high, bins):
+    """Bir kanal için kutu üyeliği: kutudaki değerlerin en az yarısı [low, high] içindeyse True
+    
+    Kutudan dar aralıklar kaybolmasın diye aralığın orta noktasının kutusu her zaman dahildir.
+    """
+    values = np.arange(256)
+    inside = (values >= low) & (values <= high)
+    selected = inside.reshape(bins, 256 // bins).mean(axis=1) >= 0.5
+    if low <= high:
+        selected[(low + high) // 2 * bins // 256] = True
+    return selected
+
+def build_color_lut(hp_colors, bins=32):
+    """hp_colors aralıklarından (healthy ve low_hp) nicemlenmiş RGB sınıflandırma tablosu
+    
+    Tablo bins×bins×bins boyutlu bir bool dizisidir; bir kutu, sağlıklı veya düşük can
+    aralıklarından birinin içindeyse can barı rengidir.
+    """
+    if 256 % bins != 0:
+        raise ValueError(f"bins 256'yı tam bölmeli: {bins}")
+    
+    lut = np.zeros((bins, bins, bins), dtype=bool)
+    for prefix in ('healthy', 'low_hp'):
+        low = hp_colors.get(f'{prefix}_min')
+        high = hp_colors.get(f'{prefix}_max')
+        if low is None or high is None:
+            continue
+        r, g, b = (_channel_bins(low[i], high[i], bins) for i in range(3))
+        lut |= r[:, np.newaxis, np.newaxis] & g[np.newaxis, :, np.newaxis] & b[np.newaxis, np.newaxis, :]
+    return lut
+
+def classify_colors(rgb, lut):
+    """...×3 uint8 RGB pikselleri tablodan tek indekslemeyle sınıflandır -> bool maske"""
+    shift = 8 - int(np.log2(lut.shape[0]))
+    quantized = rgb >> shift
+    return lut[quantized[..., 0], quantized[..., 1], quantized[..., 2]]
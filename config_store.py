@@ -0,0 +1,200 @@
+import os
+import json
+import copy
+import time
+import tempfile
+import threading
+
+class ConfigStore:
+    """config.json için ortak, arka planda yazan ve dış değişiklikleri izleyen depo
+    
+    update() hemen döner; art arda gelen güncellemeler debounce süresi boyunca birleştirilip
+    tek seferde yazılır. Yazma geçici dosya + os.replace ile atomiktir (yarım yazılmış dosya
+    kalmaz). Dosyanın mtime'ı izlenir; dışarıdan düzenlenirse yeniden okunup dinleyicilere
+    (subscribe) bildirilir.
+    """
+    
+    def __init__(self, path="config.json", debounce_s=0.5, poll_interval_s=1.0, watch=True):
+        self.path = path
+        self.debounce = debounce_s
+        self.poll_interval = poll_interval_s
+        self.watch = watch
+        self.condition = threading.Condition()
+        self.data = {}
+        self.listeners = []
+        self.mtime = None
+        
+        # Bekleyen yazma: son güncellemeden debounce sonra
+        self.dirty = False
+        self.write_deadline = None
+        
+        self.running = False
+        self.thread = None
+        
+        # İstatistikler
+        self.updates = 0
+        self.writes = 0
+        self.reloads = 0
+    
+    def load(self):
+        """Dosyayı oku -> yapılandırmanın kopyası"""
+        with open(self.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        with self.condition:
+            self.data = data
+            self.mtime = self._stat_mtime()
+            return copy.deepcopy(self.data)
+    
+    def snapshot(self):
+        with self.condition:
+            return copy.deepcopy(self.data)
+    
+    def get(self, key, default=None):
+        with self.condition:
+            return copy.deepcopy(self.data.get(key, default))
+    
+    def subscribe(self, callback):
+        """callback(config): dosya dışarıdan değişip yeniden okunduğunda (izleme thread'inde)"""
+        self.listeners.append(callback)
+    
+    def start(self):
+        with self.condition:
+            if self.running:
+                return
+            # İzleme kapalıysa thread sadece bekleyen yazmalar için gerekir (ilk update()'te başlar)
+            if not self.watch and not self.dirty:
+                return
+            self.running = True
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+    
+    def update(self, changes):
+        """Anahtarları güncelle; dosya debounce süresi sonunda arka planda yazılır"""
+        with self.condition:
+            for key, value in changes.items():
+                self.data[key] = copy.deepcopy(value)
+            self.dirty = True
+            self.write_deadline = time.monotonic() + self.debounce
+            self.updates += 1
+            self.condition.notify()
+        if not self.running:
+            self.start()
+    
+    def flush(self):
+        """Bekleyen güncellemeleri hemen yaz"""
+        data = self._take_pending()
+        if data is not None:
+            self._write(data)
+    
+    def close(self):
+        self.flush()
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if self.thread:
+            self.thread.join(timeout=2.0)
+    
+    def _stat_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+    
+    def _take_pending(self):
+        """Yazılacak verinin kopyası (bekleyen değişiklik yoksa None)"""
+        with self.condition:
+            if not self.dirty:
+                return None
+            self.dirty = False
+            self.write_deadline = None
+            return copy.deepcopy(self.data)
+    
+    def _write(self, data):
+        """Geçici dosyaya yaz, diske aktar ve asıl dosyanın yerine koy (kilit dışında)"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(prefix=".config-", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            print(f"Ayar kaydetme hatası: {e}")
+            # Bir sonraki denemede tekrar yazılsın
+            with self.condition:
+                self.dirty = True
+                self.write_deadline = time.monotonic() + self.poll_interval
+            return
+        
+        with self.condition:
+            # Kendi yazdığımız değişikliği dış düzenleme sanmamak için
+            self.mtime = self._stat_mtime()
+            self.writes += 1
+    
+    def _check_external_change(self):
+        mtime = self._stat_mtime()
+        with self.condition:
+            if mtime is None or mtime == self.mtime or self.dirty:
+                return None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            # Düzenleyici dosyayı yazarken yakalandı; sonraki kontrolde tekrar denenir
+            return None
+        with self.condition:
+            self.data = data
+            self.mtime = mtime
+            self.reloads += 1
+            return copy.deepcopy(data)
+    
+    def poll(self):
+        """Dış değişikliği kontrol et ve dinleyicilere bildir (izleme thread'i yerine ortak zamanlayıcıdan)"""
+        reloaded = self._check_external_change()
+        if reloaded is not None:
+            for callback in list(self.listeners):
+                try:
+                    callback(reloaded)
+                except Exception as e:
+                    print(f"Ayar yeniden yükleme hatası: {e}")
+    
+    def _run(self):
+        next_poll = time.monotonic() + self.poll_interval
+        while True:
+            with self.condition:
+                while self.running:
+                    now = time.monotonic()
+                    if self.dirty and self.write_deadline <= now:
+                        break
+                    if self.watch and now >= next_poll:
+                        break
+                    deadline = next_poll if self.watch else None
+                    if self.dirty:
+                        deadline = min(deadline, self.write_deadline) if deadline else self.write_deadline
+                    self.condition.wait(deadline - now if deadline else None)
+                if not self.running:
+                    break
+                write_due = self.dirty and self.write_deadline <= time.monotonic()
+            
+            if write_due:
+                data = self._take_pending()
+                if data is not None:
+                    self._write(data)
+            
+            if self.watch and time.monotonic() >= next_poll:
+                next_poll = time.monotonic() + self.poll_interval
+                self.poll()
+    
+    def get_stats(self):
+        with self.condition:
+            return {
+                'updates': self.updates,
+                'writes': self.writes,
+                'reloads': self.reloads,
+                'pending': self.dirty
+            }
@@ -1,22 +1,40 @@
-import mss
 import numpy as np
-from PIL import Image
 import time
 import threading
 import math
-from pynput.keyboard import Key, Controller
+from frame_source import MssFrameSource, split_channels
+from input_worker import InputWorker, PRIORITY_MOVEMENT
+from latency_metrics import StageMetrics
+from frame_memo import FrameMemo
+from frame_ring import FrameRingBuffer
+from async_runtime import wait_for_task
+from tick_scheduler import TickScheduler
+from blob_labels import label_components
+from minimap_background import MinimapBackground
 
 class FarmingEngine:
-    def __init__(self, on_position_update=None, on_boundary_warning=None):
+    def __init__(self, on_position_update=None, on_boundary_warning=None, frame_source=None, input_worker=None,
+                 runtime=None, analysis_process=None, config_store=None, input_group=""):
         self.on_position_update = on_position_update
         self.on_boundary_warning = on_boundary_warning
         
         self.running = False
         self.farming_thread = None
+        self.farming_task = None
         self.lock = threading.Lock()
         
-        self.sct = None
-        self.keyboard_controller = Controller()
+        # Kare kaynağı: varsayılan canlı ekran (mss), test/benchmark için kayıttan oynatma
+        self.frame_source = frame_source if frame_source is not None else MssFrameSource()
+        # İsteğe bağlı ortak olay döngüsü (AsyncRuntime); yoksa motor kendi thread'inde çalışır
+        self.runtime = runtime
+        # İsteğe bağlı ayrı süreçte marker tespiti (AnalysisProcess, kind='minimap')
+        self.analysis_process = analysis_process
+        # Hareket tuşları ayrı thread'de basılı tutulur, takip döngüsü beklemez
+        if input_worker is None:
+            input_worker = runtime.input_worker if runtime is not None else InputWorker()
+        self.input_worker = input_worker
+        # Tuş grubu öneki: ortak tuş zamanlayıcısında örneklerin grupları birbirini bırakmasın
+        self.input_group = input_group
         
         # Mini harita koordinatları
         self.minimap_region = None  # {"x": int, "y": int, "width": int, "height": int}
@@ -33,6 +51,26 @@ class FarmingEngine:
         self.max_history_size = 5
         self.last_detected_position = None
         
+        # Bölgesel takip: kilitliyken son pozisyon çevresinde pencere taranır
+        self.marker_tracking = True
+        self.tracking_base_radius = 16  # piksel (marker ve ok ucu pencereye sığmalı)
+        self.tracking_velocity_gain = 3.0  # kare başına hareket (px) -> ek yarıçap
+        self.tracking_max_radius = 64
+        self.tracking_min_confidence = 0.8  # pencere skoru / kilitli skor alt sınırı
+        self.track_position = None
+        self.track_speed = 0.0  # kare başına yer değiştirme (px, üstel ortalama)
+        self.track_score = 0.0
+        # pixels: marker taraması, background_pixels: arka plan modeli güncellemesi (tüm kare kanal toplamı)
+        self.tracking_stats = {'frames': 0, 'tracked': 0, 'full_scans': 0, 'fallbacks': 0, 'pixels': 0,
+                               'background_pixels': 0, 'radius': 0}
+        
+        # Beyaz maske çekirdeğinin tamponları (mini harita boyutunda, ilk karede ayrılır)
+        self.mask_buffers = None
+        
+        # Arka plan modeli: sabit simge/yazı/arazi adayları etiketlemeden önce elenir
+        self.background = MinimapBackground()
+        self.background_update_interval = 4  # takip karelerinde modeli her N karede güncelle
+        
         # Dairesel hareket için açı takibi
         self.circle_angle = 0.0  # Radyan cinsinden açı (0-2π)
         self.circle_angle_speed = 0.1  # Her frame'de açı artışı (radyan) - daha yavaş ve smooth dairesel hareket
@@ -43,8 +81,29 @@ class FarmingEngine:
         self.movement_check_interval = 0.05  # saniye (daha sık kontrol)
         self.movement_duration = 0.15  # tuş basma süresi (saniye)
         self.boundary_threshold = 0.85  # yarıçapın %85'ine yaklaştığında uyar
-        self.last_movement_time = 0
+        self.last_movement_time = -math.inf  # time.perf_counter; henüz hareket edilmedi
         self.movement_cooldown = 0.05  # minimum hareket aralığı (daha responsive)
+        
+        # Döngü aşamalarının gecikme histogramları
+        self.metrics = StageMetrics(("grab", "detect", "callback", "movement", "tick"))
+        self.scheduler = TickScheduler("farming")
+        
+        # Son ~10 saniyenin mini harita kareleri ve tespit edilen pozisyonlar (klip kaydı için)
+        self.debug_buffer = FrameRingBuffer(int(10 / self.movement_check_interval) + 1, ("x", "y"))
+        # İsteğe bağlı oturum kaydı (SessionRecorder)
+        self.recorder = None
+        
+        # Değişmeyen mini harita karelerinde marker tespiti atlanır (ince ızgara: küçük marker hareketleri)
+        self.marker_memo = FrameMemo(tolerance=0.5, grid=(8, 8))
+        # Bekleyen tespit sıfırlaması (None: yok, sözlük: uygulanacak takip ayarları); GUI ve
+        # ConfigStore thread'leri işaretler, tespit yapan thread sonraki karenin başında uygular
+        self.pending_reset = None
+        
+        # İsteğe bağlı yapılandırma deposu: bölge ve daire config.json'da saklanır
+        self.config_store = config_store
+        if config_store is not None:
+            self._apply_settings(config_store.snapshot())
+            config_store.subscribe(self._apply_settings)
     
     def set_minimap_region(self, x, y, width, height):
         """Mini harita bölgesini ayarla"""
@@ -55,177 +114,398 @@ class FarmingEngine:
                 "width": width,
                 "height": height
             }
+        self._reset_detection()
+        self._save_settings()
     
     def set_circle(self, center_x, center_y, radius):
         """Daire parametrelerini ayarla (mini harita koordinatlarında)"""
         with self.lock:
             self.circle_center = {"x": center_x, "y": center_y}
             self.circle_radius = radius
+        self._save_settings()
+    
+    def _save_settings(self):
+        """Mini harita bölgesi ve daireyi config.json'daki "farming" bölümüne yaz (arka planda)"""
+        if self.config_store is None:
+            return
+        with self.lock:
+            settings = {
+                "minimap_region": self.minimap_region,
+                "circle_center": self.circle_center,
+                "circle_radius": self.circle_radius
+            }
+        if settings != self.config_store.get("farming"):
+            self.config_store.update({"farming": settings})
+    
+    def _apply_settings(self, config):
+        """Kayıtlı farming ayarlarını yükle (başlangıçta ve dosya dışarıdan değiştiğinde)"""
+        settings = config.get("farming") or {}
+        with self.lock:
+            region = settings.get("minimap_region")
+            region_changed = region != self.minimap_region
+            if region_changed:
+                self.minimap_region = region.copy() if region else None
+            center = settings.get("circle_center")
+            self.circle_center = center.copy() if center else None
+            self.circle_radius = settings.get("circle_radius")
+        if region_changed:
+            self._reset_detection()
     
     def capture_minimap(self):
         """Mini harita görüntüsünü yakala"""
-        if self.sct is None:
-            self.sct = mss.mss()
-        
         with self.lock:
             if self.minimap_region is None:
                 return None
             region = self.minimap_region.copy()
         
-        monitor = {
-            "top": region["y"],
-            "left": region["x"],
-            "width": region["width"],
-            "height": region["height"]
-        }
-        
-        screenshot = self.sct.grab(monitor)
-        img = Image.frombytes("RGB", screenshot.size, screenshot.bgra, "raw", "BGRX")
-        return np.array(img)
+        return self.frame_source.grab(region)
     
     def detect_character_marker(self, minimap_image):
-        """Mini haritada karakter işaretçisini (beyaz ok/nokta) tespit et - iyileştirilmiş algoritma"""
+        """Mini haritada karakter işaretçisini (beyaz ok/nokta) tespit et - iyileştirilmiş algoritma
+        
+        Marker kilitliyken sadece son pozisyon çevresindeki pencere taranır; pencere gözlenen
+        hızla büyür. Pencerede blob bulunamazsa, blob pencere kenarına değiyorsa veya skoru
+        kilitli skorun altına düşerse tüm kare taranır. Arka plan modeli hazırsa modele uyan
+        adaylar elenir; tüm karede blob kalmazsa model olmadan yeniden taranır.
+        """
         if minimap_image is None:
             return self.last_detected_position
+        self._apply_pending_reset()
         
         height, width = minimap_image.shape[:2]
+        self.tracking_stats['frames'] += 1
+        
+        use_background = self.background.ready
+        window = self._tracking_window(width, height)
+        if window is not None:
+            x0, y0, x1, y1 = window
+            position, score, bbox = self._scan_marker(minimap_image[y0:y1, x0:x1], (x0, y0), use_background)
+            self.tracking_stats['pixels'] += (x1 - x0) * (y1 - y0)
+            if self._tracking_confident(score, bbox, window, width, height):
+                self.tracking_stats['tracked'] += 1
+                position = {"x": position["x"] + x0, "y": position["y"] + y0}
+                if self.tracking_stats['tracked'] % self.background_update_interval == 0:
+                    self.tracking_stats['background_pixels'] += width * height
+                    self.background.update(self._channel_sum(minimap_image), position if use_background else None)
+                return self._accept_marker(position, score)
+            self.tracking_stats['fallbacks'] += 1
+        
+        position, score, bbox = self._scan_marker(minimap_image, (0, 0), use_background)
+        self.tracking_stats['pixels'] += width * height
+        self.tracking_stats['full_scans'] += 1
+        if score is None and use_background:
+            # Marker arka plana karışmış olabilir (ısınmadan beri duruyor): modelsiz yeniden tara
+            position, score, bbox = self._scan_marker(minimap_image)
+            self.tracking_stats['pixels'] += width * height
+            use_background = False
+        # Sadece modelle (ön planda) bulunan marker güncellemeden korunur
+        self.tracking_stats['background_pixels'] += width * height
+        self.background.update(self._channel_sum(minimap_image),
+                               position if score is not None and use_background else None)
+        if score is None:
+            # Kilit kayboldu: sonraki karelerde yeniden tüm kare taranır
+            self.track_position = None
+            if position is not None:
+                # En parlak nokta yedeği: geçmişe eklenir, kilit sayılmaz
+                self._add_to_history(position)
+                return position
+            return self.last_detected_position
+        return self._accept_marker(position, score)
+    
+    def _tracking_window(self, width, height):
+        """Son kilitli pozisyon çevresindeki arama penceresi (x0, y0, x1, y1) veya None"""
+        if not self.marker_tracking or self.track_position is None:
+            return None
+        radius = min(self.tracking_base_radius + self.tracking_velocity_gain * self.track_speed,
+                     self.tracking_max_radius)
+        radius = int(math.ceil(radius))
+        x, y = self.track_position["x"], self.track_position["y"]
+        x0, y0 = max(0, x - radius), max(0, y - radius)
+        x1, y1 = min(width, x + radius + 1), min(height, y + radius + 1)
+        if x1 <= x0 or y1 <= y0 or (x1 - x0) * (y1 - y0) >= width * height:
+            return None
+        self.tracking_stats['radius'] = radius
+        return x0, y0, x1, y1
+    
+    def _tracking_confident(self, score, bbox, window, width, height):
+        """Penceredeki sonuç güvenilir mi: blob bulundu, kesilmedi ve skor düşmedi"""
+        if score is None:
+            return False
+        if score < self.track_score * self.tracking_min_confidence:
+            return False
+        # Blob pencerenin (görüntü kenarı olmayan) sınırına değiyorsa kesilmiş olabilir
+        x0, y0, x1, y1 = window
+        bx0, by0, bx1, by1 = bbox
+        if (bx0 == 0 and x0 > 0) or (by0 == 0 and y0 > 0):
+            return False
+        if (x0 + bx1 == x1 - 1 and x1 < width) or (y0 + by1 == y1 - 1 and y1 < height):
+            return False
+        return True
+    
+    def _accept_marker(self, position, score):
+        """Blob tespitini kabul et: kilit, hız ve skor takibini güncelle"""
+        if self.track_position is not None:
+            step = math.hypot(position["x"] - self.track_position["x"], position["y"] - self.track_position["y"])
+            self.track_speed = self.track_speed * 0.7 + step * 0.3
+            self.track_score = self.track_score * 0.8 + score * 0.2
+        else:
+            self.track_speed = 0.0
+            self.track_score = score
+        self.track_position = position
+        self.last_detected_position = position
+        self._add_to_history(position)
+        return position
+    
+    def reset_tracking(self):
+        """Marker kilidini ve arka plan modelini bırak (bölge değişti); sonraki kare tümüyle taranır"""
+        self.background.reset()
+        self.track_position = None
+        self.track_speed = 0.0
+        self.track_score = 0.0
+    
+    def tracking_settings(self):
+        """Bölge ve marker takibi ayarları (analiz sürecine 'reset' mesajıyla gönderilir)"""
+        return {
+            'minimap_region': dict(self.minimap_region) if self.minimap_region else None,
+            'marker_tracking': self.marker_tracking,
+            'tracking_base_radius': self.tracking_base_radius,
+            'tracking_velocity_gain': self.tracking_velocity_gain,
+            'tracking_max_radius': self.tracking_max_radius,
+            'tracking_min_confidence': self.tracking_min_confidence,
+            'background_model': self.background.enabled
+        }
+    
+    def configure_tracking(self, **settings):
+        """Takip ayarlarını değiştir (tracking_settings anahtarları); kilit ve model sıfırlanır
         
-        # RGB kanallarını ayır
-        r, g, b = minimap_image[:, :, 0], minimap_image[:, :, 1], minimap_image[:, :, 2]
-        
-        # Parlaklık hesabı
-        brightness = (r.astype(float) + g.astype(float) + b.astype(float)) / 3
+        Değişiklik sonraki karenin başında tespit yapan thread'de uygulanır.
+        """
+        self._reset_detection(settings)
+    
+    def _set_tracking_settings(self, settings):
+        for name, value in settings.items():
+            if name == 'background_model':
+                self.background.enabled = value
+            elif name == 'minimap_region':
+                with self.lock:
+                    self.minimap_region = dict(value) if value else None
+            elif name in ('marker_tracking', 'tracking_base_radius', 'tracking_velocity_gain',
+                          'tracking_max_radius', 'tracking_min_confidence'):
+                setattr(self, name, value)
+            else:
+                raise ValueError(f"Bilinmeyen takip ayarı: {name}")
+    
+    def reset_detection(self, settings=None):
+        """Ayarları uygula; kilit, arka plan modeli ve kare önbelleğini sıfırla (analiz sürecinde de)"""
+        if settings:
+            self._set_tracking_settings(settings)
+        self.marker_memo.invalidate()
+        self.reset_tracking()
+    
+    def _reset_detection(self, settings=None):
+        # Başka thread'den çağrılır: kare ortasında takip penceresi, önbellek ve model değişmesin
+        with self.lock:
+            self.pending_reset = {**(self.pending_reset or {}), **(settings or {})}
+    
+    def _apply_pending_reset(self):
+        """Bekleyen sıfırlamayı tespit thread'inde uygula"""
+        with self.lock:
+            settings, self.pending_reset = self.pending_reset, None
+        if settings is None:
+            return
+        self.reset_detection(settings)
+        # Ayrı süreç modunda tespiti çalışan sürecin motoru yapar: sıfırlama ona da gönderilir
+        if self.analysis_process is not None:
+            self.analysis_process.reset(self.tracking_settings())
+    
+    def get_detection_stats(self):
+        """Marker takibi ve arka plan modeli istatistikleri (ayrı süreç modunda çalışan süreçten)"""
+        if self.analysis_process is not None and self.analysis_process.engine_stats is not None:
+            return self.analysis_process.engine_stats
+        return {'tracking': self.get_tracking_stats(), 'background': self.background.get_stats()}
+    
+    def get_tracking_stats(self):
+        stats = self.tracking_stats
+        frames = stats['frames']
+        return {
+            'enabled': self.marker_tracking,
+            'locked': self.track_position is not None,
+            'frames': frames,
+            'tracked_frames': stats['tracked'],
+            'full_scans': stats['full_scans'],
+            'fallbacks': stats['fallbacks'],
+            'pixels_per_frame': stats['pixels'] / frames if frames else 0.0,
+            'background_pixels_per_frame': stats['background_pixels'] / frames if frames else 0.0,
+            'window_radius': stats['radius'],
+            'speed_px': self.track_speed
+        }
+    
+    def _white_masks(self, minimap_image):
+        """Beyaz marker adayları için birleşik tamsayı çekirdeği -> (kanal toplamı, 220 maskesi, 180 maskesi)
         
-        # Beyaz/parlak renk tespiti - karakter marker için optimize edildi
-        # Karakter marker genellikle çok parlak beyaz (RGB > 220)
-        white_threshold = 220  # Daha yüksek threshold (sadece çok parlak noktalar)
-        brightness_mask = brightness > white_threshold
+        Parlaklık > T, kanal toplamı > 3T ile; |r-g|, |g-b|, |r-b| < 25 ise max - min < 25 ile
+        aynıdır. Ara sonuçlar motorun önceden ayrılmış tamponlarına yazılır (pencere taramasında
+        tamponların görünümleri kullanılır); döndürülen diziler sonraki çağrıda üzerine yazılır.
+        """
+        height, width = minimap_image.shape[:2]
+        _, spread, low, balanced, white_mask, dim_mask = (
+            buffer[:height, :width] for buffer in self._mask_buffers(height, width))
+        channel_sum = self._channel_sum(minimap_image)
+        r, g, b = split_channels(minimap_image)
+        
+        # RGB dengeli olmalı (r≈g≈b): en büyük ve en küçük kanal farkı
+        np.maximum(r, g, out=spread)
+        np.maximum(spread, b, out=spread)
+        np.minimum(r, g, out=low)
+        np.minimum(low, b, out=low)
+        np.subtract(spread, low, out=spread)
+        np.less(spread, 25, out=balanced)
+        
+        # Karakter marker genellikle çok parlak beyaz (ortalama > 220), yedek eşik 180
+        np.greater(channel_sum, 3 * 180, out=dim_mask)
+        np.logical_and(dim_mask, balanced, out=dim_mask)
+        np.greater(channel_sum, 3 * 220, out=white_mask)
+        np.logical_and(white_mask, dim_mask, out=white_mask)
+        return channel_sum, white_mask, dim_mask
+    
+    def _channel_sum(self, minimap_image):
+        """r + g + b (uint16, tampon görünümü) - parlaklığın 3 katı"""
+        height, width = minimap_image.shape[:2]
+        channel_sum = self._mask_buffers(height, width)[0][:height, :width]
+        # RGB kanallarını ayır (BGRA karelerde kopyasız görünüm)
+        r, g, b = split_channels(minimap_image)
+        np.add(r, g, out=channel_sum, dtype=np.uint16)
+        np.add(channel_sum, b, out=channel_sum)
+        return channel_sum
+    
+    def _mask_buffers(self, height, width):
+        """Mini harita boyutunda tamponlar (bölge büyürse yeniden ayrılır)"""
+        buffers = self.mask_buffers
+        if buffers is None or buffers[0].shape[0] < height or buffers[0].shape[1] < width:
+            if buffers is not None:
+                height = max(height, buffers[0].shape[0])
+                width = max(width, buffers[0].shape[1])
+            shape = (height, width)
+            buffers = self.mask_buffers = (
+                np.empty(shape, dtype=np.uint16),  # kanal toplamı
+                np.empty(shape, dtype=np.uint8),   # max - min
+                np.empty(shape, dtype=np.uint8),   # min kanal
+                np.empty(shape, dtype=bool),       # renk dengesi
+                np.empty(shape, dtype=bool),       # 220 maskesi
+                np.empty(shape, dtype=bool)        # 180 maskesi
+            )
+        return buffers
+    
+    def _scan_marker(self, minimap_image, origin=(0, 0), use_background=False):
+        """Görüntüde marker ara (yan etkisiz) -> (pozisyon, skor, blob sınır kutusu)
+        
+        Blob bulunamazsa en parlak nokta (skor ve kutu None), hiç aday yoksa (None, None, None).
+        origin: pencere taramasında görüntünün mini haritadaki sol üst köşesi (arka plan modeli için)
+        """
+        # Parlaklık (kanal toplamı) ve iki eşiğin maskeleri tek tamsayı geçişte
+        channel_sum, white_mask, dim_mask = self._white_masks(minimap_image)
+        if use_background:
+            # Modele uyan adaylar (sabit simge, yazı, parlak arazi) etiketlemeden önce elenir
+            self.background.suppress(dim_mask, channel_sum, *origin)
+            np.logical_and(white_mask, dim_mask, out=white_mask)
         
-        # RGB dengeli olmalı (r≈g≈b) - karakter marker için daha sıkı kontrol
-        color_balance_threshold = 25  # Daha sıkı (beyaz için)
-        is_balanced = (np.abs(r.astype(float) - g.astype(float)) < color_balance_threshold) & \
-                      (np.abs(g.astype(float) - b.astype(float)) < color_balance_threshold) & \
-                      (np.abs(r.astype(float) - b.astype(float)) < color_balance_threshold)
+        # Eğer çok az beyaz piksel varsa, threshold'u düşür (fallback)
+        if np.count_nonzero(white_mask) < 5:
+            white_mask = dim_mask
         
-        white_mask = brightness_mask & is_balanced
+        # Eğer beyaz bulunamazsa, en parlak noktayı al (fallback)
+        if not white_mask.any():
+            if channel_sum.size == 0:
+                return None, None, None
+            best_y, best_x = np.unravel_index(np.argmax(channel_sum), channel_sum.shape)
+            return {"x": int(best_x), "y": int(best_y)}, None, None
         
-        # Eğer çok az beyaz piksel varsa, threshold'u düşür (fallback)
-        if np.sum(white_mask) < 5:
-            white_threshold = 180  # Daha düşük threshold dene
-            brightness_mask = brightness > white_threshold
-            white_mask = brightness_mask & is_balanced
-        
-        # Eğer beyaz bulunamazsa, en parlak noktaları kontrol et
-        if not np.any(white_mask):
-            # Top 5 en parlak noktayı bul
-            flat_brightness = brightness.flatten()
-            top_indices = np.argsort(flat_brightness)[-5:]
-            top_coords = [np.unravel_index(idx, brightness.shape) for idx in top_indices]
-            
-            # En parlak noktayı al (fallback)
-            if len(top_coords) > 0:
-                best_y, best_x = top_coords[-1]
-                position = {"x": int(best_x), "y": int(best_y)}
-                self._add_to_history(position)
-                return position
-            else:
-                return self.last_detected_position
+        # Beyaz piksellerin blob'larını bul (etiket görüntüsü ve blob başına istatistikler)
+        labels, stats = self._find_blobs(white_mask)
         
-        # Beyaz piksellerin blob'larını bul (basit connected components)
-        blobs = self._find_blobs(white_mask)
+        if not stats['count']:
+            return None, None, None
         
-        if not blobs:
-            return self.last_detected_position
+        # Blob başına kanal toplamı tek geçişte
+        channel_sums = np.bincount(labels.ravel(), weights=channel_sum.ravel(), minlength=stats['count'] + 1)[1:]
         
         # Her blob'un özelliklerini hesapla
         best_blob = None
         best_score = -1
         
-        for blob_mask in blobs:
-            blob_pixels = np.sum(blob_mask)
+        for index in range(stats['count']):
+            blob_pixels = stats['area'][index]
             
             # Çok küçük veya çok büyük blob'ları filtrele
             if blob_pixels < 2 or blob_pixels > 100:
                 continue
             
             # Blob'un merkez koordinatları
-            y_coords, x_coords = np.where(blob_mask)
-            center_x = int(np.mean(x_coords))
-            center_y = int(np.mean(y_coords))
+            center_x = int(stats['centroid_x'][index])
+            center_y = int(stats['centroid_y'][index])
             
             # Blob'un ortalama parlaklığı
-            blob_brightness = np.mean(brightness[blob_mask])
+            blob_brightness = channel_sums[index] / (3 * blob_pixels)
             
             # Ok şekli skoru (merkez noktası çevresinde yoğunluk kontrolü)
-            shape_score = self._calculate_shape_score(minimap_image, center_x, center_y, blob_mask)
+            shape_score = self._calculate_shape_score(labels, index + 1, center_x, center_y)
             
             # Toplam skor
             score = blob_brightness * 0.7 + shape_score * 0.3
             
             if score > best_score:
                 best_score = score
-                best_blob = {"x": center_x, "y": center_y, "mask": blob_mask}
+                best_blob = {"x": center_x, "y": center_y, "label": index + 1, "bbox": stats['bbox'][index], "score": score}
         
         if best_blob:
             position = {"x": best_blob["x"], "y": best_blob["y"]}
             # Ok ucunu bul (ok şeklinde ise)
-            tip_position = self._find_arrow_tip(minimap_image, best_blob["mask"], best_blob["x"], best_blob["y"])
+            tip_position = self._find_arrow_tip(labels, best_blob["label"], best_blob["bbox"], best_blob["x"], best_blob["y"])
             if tip_position:
                 position = tip_position
-            
-            self.last_detected_position = position
-            self._add_to_history(position)
-            return position
+            return position, best_blob["score"], best_blob["bbox"]
         
-        return self.last_detected_position
+        return None, None, None
     
-    def _find_blobs(self, mask):
-        """Basit blob detection (connected components) - scipy olmadan"""
-        height, width = mask.shape
-        visited = np.zeros_like(mask, dtype=bool)
-        blobs = []
-        
-        def flood_fill(start_y, start_x):
-            """BFS ile connected component bul"""
-            if visited[start_y, start_x] or not mask[start_y, start_x]:
-                return None
-            
-            blob_mask = np.zeros_like(mask, dtype=bool)
-            stack = [(start_y, start_x)]
-            
-            while stack:
-                y, x = stack.pop()
-                if visited[y, x] or not mask[y, x]:
-                    continue
-                
-                visited[y, x] = True
-                blob_mask[y, x] = True
-                
-                # 8-connectivity
-                for dy in [-1, 0, 1]:
-                    for dx in [-1, 0, 1]:
-                        if dy == 0 and dx == 0:
-                            continue
-                        ny, nx = y + dy, x + dx
-                        if 0 <= ny < height and 0 <= nx < width:
-                            if not visited[ny, nx] and mask[ny, nx]:
-                                stack.append((ny, nx))
-            
-            return blob_mask if np.any(blob_mask) else None
+    def _detect_with_memo(self, minimap_image):
+        """Kare öncekiyle aynıysa tespiti atla; önceki sonucu (ve geçmişe eklenmişse onu) tekrarla"""
+        if minimap_image is None:
+            return self.last_detected_position
         
-        # Tüm blob'ları bul
-        for y in range(height):
-            for x in range(width):
-                if mask[y, x] and not visited[y, x]:
-                    blob = flood_fill(y, x)
-                    if blob is not None:
-                        blobs.append(blob)
+        hit, cached = self.marker_memo.lookup(minimap_image)
+        if hit:
+            position, added = cached
+            if added:
+                self._add_to_history(position)
+            return position
         
-        return blobs
+        last_entry = self.position_history[-1] if self.position_history else None
+        position = self.detect_character_marker(minimap_image)
+        added = bool(self.position_history) and self.position_history[-1] is not last_entry
+        self.marker_memo.store((position, added))
+        return position
     
-    def _calculate_shape_score(self, image, center_x, center_y, mask):
+    def _locate_marker(self, minimap_image):
+        """Marker pozisyonu (geçmişle stabilize edilmiş); bulunamazsa son bilinen pozisyon"""
+        position = self._detect_with_memo(minimap_image)
+        
+        # Stabilize edilmiş pozisyon kullan (gürültüyü azalt)
+        if position:
+            stabilized_position = self._get_stabilized_position()
+            if stabilized_position:
+                position = stabilized_position
+        else:
+            # Marker bulunamazsa, son bilinen pozisyonu kullan
+            position = self.last_detected_position
+        return position
+    
+    def _find_blobs(self, mask):
+        """Bağlı bileşenler (8 komşuluk) -> (etiket görüntüsü, blob başına istatistikler)"""
+        return label_components(mask, connectivity=8)
+    
+    def _calculate_shape_score(self, labels, label, center_x, center_y):
         """Ok şekli skorunu hesapla - merkez nokta çevresinde yoğunluk analizi"""
-        height, width = image.shape[:2]
+        height, width = labels.shape
         
         # Merkez nokta çevresinde küçük bir bölge kontrol et
         radius = 3
@@ -234,18 +514,22 @@ class FarmingEngine:
         y_min = max(0, center_y - radius)
         y_max = min(height, center_y + radius)
         
-        region_mask = mask[y_min:y_max, x_min:x_max]
+        region_mask = labels[y_min:y_max, x_min:x_max] == label
         density = np.sum(region_mask) / (region_mask.size + 1)
         
         return density * 100
     
-    def _find_arrow_tip(self, image, mask, center_x, center_y):
+    def _find_arrow_tip(self, labels, label, bbox, center_x, center_y):
         """Ok ucunu bul - ok şeklinde ise en uç noktayı döndür"""
-        y_coords, x_coords = np.where(mask)
+        x0, y0, x1, y1 = bbox
+        y_coords, x_coords = np.nonzero(labels[y0:y1 + 1, x0:x1 + 1] == label)
         
         if len(x_coords) < 3:
             return None
         
+        x_coords = x_coords + x0
+        y_coords = y_coords + y0
+        
         # Merkez noktadan en uzak noktayı bul (ok ucu olabilir)
         distances = np.sqrt((x_coords - center_x)**2 + (y_coords - center_y)**2)
         max_idx = np.argmax(distances)
@@ -391,143 +675,158 @@ class FarmingEngine:
         if not keys:
             return
         
+        # Tuşlar movement_duration kadar basılı tutulur, yön değişince eski yön tuşları bırakılır
+        self.input_worker.submit(keys, self.movement_duration, group=f"{self.input_group}movement", priority=PRIORITY_MOVEMENT)
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record("keys", "+".join(keys), time.perf_counter(), self.movement_duration)
+    
+    def _farming_tick(self):
+        """Tek takip adımı (yakala, marker bul, hareket et) -> sonraki adıma kadar beklenecek süre (s)"""
         try:
-            # Tuşları basılı tut
-            for key in keys:
-                self.keyboard_controller.press(key)
+            self._apply_pending_reset()
             
-            # Belirlenen süre kadar bekle
-            time.sleep(self.movement_duration)
+            # Mini harita görüntüsünü yakala
+            tick_start = time.perf_counter_ns()
+            minimap_image = self.capture_minimap()
+            grab_end = time.perf_counter_ns()
             
-            # Tuşları bırak
-            for key in keys:
-                self.keyboard_controller.release(key)
+            if minimap_image is None:
+                return 0.5
             
-        except Exception as e:
-            print(f"Tuş basma hatası: {e}")
-    
-    def _farming_loop(self):
-        """Ana farming döngüsü"""
-        # MSS nesnesini bu thread'de oluştur
-        self.sct = mss.mss()
-        
-        while self.running:
-            try:
-                # Mini harita görüntüsünü yakala
-                minimap_image = self.capture_minimap()
-                
-                if minimap_image is None:
-                    time.sleep(0.5)
-                    continue
-                
-                # Karakter pozisyonunu tespit et - mini haritadan marker takibi
-                position = self.detect_character_marker(minimap_image)
-                
-                # Stabilize edilmiş pozisyon kullan (gürültüyü azalt)
-                if position:
-                    stabilized_position = self._get_stabilized_position()
-                    if stabilized_position:
-                        position = stabilized_position
-                else:
-                    # Marker bulunamazsa, son bilinen pozisyonu kullan
-                    position = self.last_detected_position
-                
-                with self.lock:
-                    self.current_position = position
-                    circle_center = self.circle_center.copy() if self.circle_center else None
-                    circle_radius = self.circle_radius
-                
-                if position is None or circle_center is None or circle_radius is None:
-                    time.sleep(self.movement_check_interval)
-                    continue
-                
-                # Pozisyon güncellemesi - UI'ya bildir
-                if self.on_position_update and position:
-                    try:
-                        self.on_position_update(position, circle_center, circle_radius)
-                    except Exception as e:
-                        print(f"Position update callback hatası: {e}")
-                
-                # Daire içinde mi kontrol et - sürekli kontrol ve marker takibi
-                distance = self.get_distance_to_center(position, circle_center)
-                is_inside = distance <= circle_radius
-                
-                # Sınır kontrolü (yarıçapın %85'ine yaklaştı mı?)
-                boundary_distance = circle_radius * self.boundary_threshold
-                
-                current_time = time.time()
+            # Karakter pozisyonunu tespit et - mini haritadan marker takibi
+            # (ayrı süreç modunda tespit ve pozisyon geçmişi çalışan süreçtedir)
+            if self.analysis_process is not None:
+                position = self.analysis_process.analyze(minimap_image)
+            else:
+                position = self._locate_marker(minimap_image)
+            detect_end = time.perf_counter_ns()
+            frame_time = self.frame_source.last_frame_time or tick_start / 1e9
+            position_x = position["x"] if position else None
+            position_y = position["y"] if position else None
+            self.debug_buffer.record(minimap_image, frame_time, position_x, position_y)
+            recorder = self.recorder
+            if recorder is not None:
+                recorder.record("minimap", minimap_image, frame_time, position_x, position_y)
+            self.metrics.record("grab", grab_end - tick_start)
+            self.metrics.record("detect", detect_end - grab_end)
+            
+            with self.lock:
+                self.current_position = position
+                circle_center = self.circle_center.copy() if self.circle_center else None
+                circle_radius = self.circle_radius
+            
+            if position is None or circle_center is None or circle_radius is None:
+                return self.movement_check_interval
+            
+            # Pozisyon güncellemesi - UI'ya bildir
+            callback_start = time.perf_counter_ns()
+            if self.on_position_update and position:
+                try:
+                    self.on_position_update(position, circle_center, circle_radius)
+                except Exception as e:
+                    print(f"Position update callback hatası: {e}")
+            movement_start = time.perf_counter_ns()
+            self.metrics.record("callback", movement_start - callback_start)
+            
+            # Daire içinde mi kontrol et - sürekli kontrol ve marker takibi
+            distance = self.get_distance_to_center(position, circle_center)
+            is_inside = distance <= circle_radius
+            
+            # Sınır kontrolü (yarıçapın %85'ine yaklaştı mı?)
+            boundary_distance = circle_radius * self.boundary_threshold
+            
+            current_time = time.perf_counter()
+            
+            # Tuşlar bloklamadan basılı tutulur; bir sonraki hareket, önceki hareket
+            # bittikten sonra cooldown kadar beklenerek yapılır (dairesel hareket temposu)
+            movement_period = self.movement_duration + self.movement_cooldown
+            
+            if distance > circle_radius:
+                # Daire dışında, merkeze doğru yönlen - marker takibi ile
+                self.circular_movement_active = False  # Dairesel hareketi durdur
                 
-                if distance > circle_radius:
-                    # Daire dışında, merkeze doğru yönlen - marker takibi ile
-                    self.circular_movement_active = False  # Dairesel hareketi durdur
+                if current_time - self.last_movement_time >= movement_period:
+                    direction = self.calculate_direction_to_center(position, circle_center)
+                    if direction:  # Yön varsa hareket et
+                        self.press_keys(direction)
+                        self.last_movement_time = current_time
+                        
+                        # Marker takibi: pozisyon güncellendi mi kontrol et
+                    if self.on_boundary_warning:
+                        try:
+                            self.on_boundary_warning(
+                                f"Daire dışı! Mesafe: {distance:.1f}/{circle_radius}, Merkeze yönleniyor...",
+                                distance, circle_radius
+                            )
+                        except:
+                            # Callback signature uyumsuzluğu için fallback
+                            self.on_boundary_warning(distance, circle_radius, direction)
                     
-                    if current_time - self.last_movement_time >= self.movement_cooldown:
-                        direction = self.calculate_direction_to_center(position, circle_center)
-                        if direction:  # Yön varsa hareket et
-                            self.press_keys(direction)
-                            self.last_movement_time = current_time
-                            
-                            # Marker takibi: pozisyon güncellendi mi kontrol et
+                    # Açıyı merkeze göre ayarla (merkeze döndükten sonra yeniden başla)
+                    dx = circle_center["x"] - position["x"]
+                    dy = circle_center["y"] - position["y"]
+                    if dx != 0 or dy != 0:
+                        self.circle_angle = math.atan2(dy, dx)
+            
+            elif distance > boundary_distance:
+                # Sınır yakınında, merkeze doğru yönlen - marker takibi ile
+                self.circular_movement_active = False
+                
+                if current_time - self.last_movement_time >= movement_period:
+                    direction = self.calculate_direction_to_center(position, circle_center)
+                    if direction:
+                        self.press_keys(direction)
+                        self.last_movement_time = current_time
+                        
+                        # Marker takibi: sınır uyarısı
                         if self.on_boundary_warning:
                             try:
                                 self.on_boundary_warning(
-                                    f"Daire dışı! Mesafe: {distance:.1f}/{circle_radius}, Merkeze yönleniyor...",
+                                    f"Sınır yakını! Mesafe: {distance:.1f}/{boundary_distance:.1f}, Merkeze yönleniyor...",
                                     distance, circle_radius
                                 )
                             except:
                                 # Callback signature uyumsuzluğu için fallback
                                 self.on_boundary_warning(distance, circle_radius, direction)
-                        
-                        # Açıyı merkeze göre ayarla (merkeze döndükten sonra yeniden başla)
-                        dx = circle_center["x"] - position["x"]
-                        dy = circle_center["y"] - position["y"]
-                        if dx != 0 or dy != 0:
-                            self.circle_angle = math.atan2(dy, dx)
-                
-                elif distance > boundary_distance:
-                    # Sınır yakınında, merkeze doğru yönlen - marker takibi ile
-                    self.circular_movement_active = False
+            
+            else:
+                # Daire içinde, dairesel hareket - sürekli kontrol ve marker takibi
+                if current_time - self.last_movement_time >= movement_period:
+                    # Dairesel hareket için yön hesapla
+                    direction = self.calculate_circular_movement_direction(
+                        position, circle_center, circle_radius
+                    )
                     
-                    if current_time - self.last_movement_time >= self.movement_cooldown:
-                        direction = self.calculate_direction_to_center(position, circle_center)
-                        if direction:
-                            self.press_keys(direction)
-                            self.last_movement_time = current_time
-                            
-                            # Marker takibi: sınır uyarısı
-                            if self.on_boundary_warning:
-                                try:
-                                    self.on_boundary_warning(
-                                        f"Sınır yakını! Mesafe: {distance:.1f}/{boundary_distance:.1f}, Merkeze yönleniyor...",
-                                        distance, circle_radius
-                                    )
-                                except:
-                                    # Callback signature uyumsuzluğu için fallback
-                                    self.on_boundary_warning(distance, circle_radius, direction)
-                
-                else:
-                    # Daire içinde, dairesel hareket - sürekli kontrol ve marker takibi
-                    if current_time - self.last_movement_time >= self.movement_cooldown:
-                        # Dairesel hareket için yön hesapla
-                        direction = self.calculate_circular_movement_direction(
-                            position, circle_center, circle_radius
-                        )
-                        
-                        # Eğer yön varsa hareket et
-                        if direction:
-                            self.press_keys(direction)
-                            self.last_movement_time = current_time
-                        else:
-                            # Yön yoksa bile kısa bir bekleme yap (sürekli kontrol için)
-                            self.last_movement_time = current_time - (self.movement_cooldown * 0.5)
-                
-                # Sürekli kontrol için kısa bekleme
-                time.sleep(self.movement_check_interval)
-                
-            except Exception as e:
-                if self.on_boundary_warning:
-                    self.on_boundary_warning(0, 0, f"Hata: {e}")
-                time.sleep(1)
+                    # Eğer yön varsa hareket et
+                    if direction:
+                        self.press_keys(direction)
+                        self.last_movement_time = current_time
+                    else:
+                        # Yön yoksa bile kısa bir bekleme yap (sürekli kontrol için)
+                        self.last_movement_time = current_time - (self.movement_cooldown * 0.5)
+            
+            tick_end = time.perf_counter_ns()
+            self.metrics.record("movement", tick_end - movement_start)
+            self.metrics.record("tick", tick_end - tick_start)
+            
+            # Sürekli kontrol için kısa bekleme
+            return self.movement_check_interval
+            
+        except Exception as e:
+            if self.on_boundary_warning:
+                self.on_boundary_warning(0, 0, f"Hata: {e}")
+            return 1.0
+    
+    def _farming_loop(self):
+        """Ana farming döngüsü"""
+        self.scheduler.start()
+        while self.running:
+            self.scheduler.begin_tick()
+            time.sleep(self.scheduler.next_delay(self._farming_tick()))
+        
+        # Bu thread'e ait ekran nesnesini serbest bırak
+        self.frame_source.close()
     
     def start(self):
         """Farming modunu başlat"""
@@ -537,8 +836,13 @@ class FarmingEngine:
                     return False, "Mini harita bölgesi veya daire ayarlanmamış"
                 
                 self.running = True
-                self.farming_thread = threading.Thread(target=self._farming_loop, daemon=True)
-                self.farming_thread.start()
+                if self.runtime is not None:
+                    # Tek olay döngüsü: adımlar runtime executor'ında, beklemeler coroutine'de
+                    self.farming_task = self.runtime.spawn(
+                        self.runtime.run_engine(self, self._farming_tick, self.frame_source.close, self.scheduler))
+                else:
+                    self.farming_thread = threading.Thread(target=self._farming_loop, daemon=True)
+                    self.farming_thread.start()
                 return True, "Farming modu başlatıldı"
             return False, "Farming modu zaten çalışıyor"
     
@@ -547,6 +851,9 @@ class FarmingEngine:
         self.running = False
         if self.farming_thread:
             self.farming_thread.join(timeout=2.0)
+        if self.farming_task:
+            wait_for_task(self.farming_task, timeout=2.0)
+            self.farming_task = None
     
     def get_status(self):
         """Mevcut durumu döndür"""
@@ -556,6 +863,11 @@ class FarmingEngine:
                 'position': self.current_position,
                 'circle_center': self.circle_center,
                 'circle_radius': self.circle_radius,
-                'minimap_region': self.minimap_region
+                'minimap_region': self.minimap_region,
+                'latency': self.metrics.snapshot(),
+                'frame_memo': self.marker_memo.get_stats(),
+                'analysis_process': self.analysis_process.get_stats() if self.analysis_process else None,
+                'scheduler': self.scheduler.get_stats(),
+                **self.get_detection_stats()
             }
 
@@ -0,0 +1,96 @@
+from functools import lru_cache
+import numpy as np
+
+@lru_cache(maxsize=16)
+def _grid_layout(height, width, grid):
+    """Verilen kare boyutu için satır/sütun bant üyelik matrisleri ve hücre boyutları"""
+    grid_h = max(1, min(grid[0], height))
+    grid_w = max(1, min(grid[1], width))
+    row_edges = np.linspace(0, height, grid_h + 1).astype(np.intp)
+    col_edges = np.linspace(0, width, grid_w + 1).astype(np.intp)
+    
+    row_bands = np.zeros((grid_h, height), dtype=np.float32)
+    for i in range(grid_h):
+        row_bands[i, row_edges[i]:row_edges[i + 1]] = 1.0
+    col_bands = np.zeros((width, grid_w), dtype=np.float32)
+    for j in range(grid_w):
+        col_bands[col_edges[j]:col_edges[j + 1], j] = 1.0
+    
+    cell_sizes = np.outer(np.diff(row_edges), np.diff(col_edges))[:, np.newaxis, :].astype(np.float32)
+    return row_bands, col_bands, cell_sizes
+
+def frame_fingerprint(image, grid=(4, 16)):
+    """Karenin kaba ızgara hücrelerindeki piksel ortalamaları (gh×kanal×gw)
+    
+    Tüm pikseller hesaba katılır (tek sütunluk değişiklikler de yakalanır) ama sonuç
+    birkaç yüz sayıdan ibarettir; karşılaştırması analizden çok daha ucuzdur.
+    Bantlar iki float32 matris çarpımıyla toplanır.
+    """
+    height, width, channels = image.shape
+    row_bands, col_bands, cell_sizes = _grid_layout(height, width, tuple(grid))
+    
+    # gh×H @ H×(W·kanal) -> gh×W×kanal, ardından sütun bantları: gh×kanal×W @ W×gw
+    row_sums = row_bands @ image.reshape(height, width * channels).astype(np.float32)
+    sums = row_sums.reshape(len(row_bands), width, channels).transpose(0, 2, 1) @ col_bands
+    return sums / cell_sizes
+
+class FrameMemo:
+    """Değişmeyen (veya neredeyse değişmeyen) kareler için önceki analiz sonucunu yeniden kullanır
+    
+    Önbellekteki sonuç, onu üreten karenin parmak izine göre saklanır; yavaş değişimler
+    birikip tolerance'ı aşınca analiz yeniden yapılır.
+    tolerance: hücre ortalamalarında izin verilen en büyük fark (0-255 ölçeğinde)
+    """
+    
+    def __init__(self, tolerance=1.0, grid=(4, 16), enabled=True):
+        self.tolerance = tolerance
+        self.grid = grid
+        self.enabled = enabled
+        self.reference = None
+        self.pending = None
+        self.result = None
+        self.hits = 0
+        self.misses = 0
+    
+    def configure(self, tolerance=None, enabled=None):
+        if tolerance is not None:
+            self.tolerance = tolerance
+        if enabled is not None:
+            self.enabled = enabled
+        self.invalidate()
+    
+    def invalidate(self):
+        """Önbelleği boşalt (analiz ayarları değişince sonraki kare yeniden analiz edilir)"""
+        self.reference = None
+        self.pending = None
+    
+    def lookup(self, image):
+        """Kare öncekiyle aynıysa (True, önceki sonuç), değilse (False, None)"""
+        if not self.enabled:
+            return False, None
+        
+        fingerprint = frame_fingerprint(image, self.grid)
+        if (self.reference is not None and self.reference.shape == fingerprint.shape and
+                np.max(np.abs(fingerprint - self.reference)) <= self.tolerance):
+            self.hits += 1
+            return True, self.result
+        
+        self.misses += 1
+        self.pending = fingerprint
+        return False, None
+    
+    def store(self, result):
+        """lookup() ıskalandıktan sonra hesaplanan sonucu kaydet"""
+        if self.pending is not None:
+            self.reference = self.pending
+            self.pending = None
+            self.result = result
+    
+    def get_stats(self):
+        total = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0
+        }
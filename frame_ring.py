@@ -0,0 +1,150 @@
+import time
+import threading
+import numpy as np
+from frame_source import to_rgb
+
+class FrameRingBuffer:
+    """Son kareleri zaman damgası ve okumalarıyla tutan önceden ayrılmış halka tampon
+    
+    Kareler RGB olarak yerinde (np.copyto) yazılır, kare başına bellek ayrılmaz. Tampon
+    ilk karede boyutlanır; sadece bölge büyürse bir kez yeniden ayrılır. Ölüm gibi
+    olaylardan sonra son N saniye export() ile alınır; kareler kilit dışında kopyalanır,
+    kopyalanırken üzerine yazılan yuvalar yuva başına yazma sırasıyla tespit edilip atılır.
+    reading_fields: kare başına kaydedilen okuma adları (ör. ("hp",) veya ("x", "y"))
+    """
+    
+    def __init__(self, capacity, reading_fields=("value",)):
+        self.capacity = max(1, int(capacity))
+        self.reading_fields = tuple(reading_fields)
+        self.lock = threading.Lock()
+        self.frames = None  # capacity×H×W×3
+        self.shapes = np.zeros((self.capacity, 2), dtype=np.int32)
+        self.timestamps = np.zeros(self.capacity, dtype=np.float64)
+        self.readings = np.full((self.capacity, len(self.reading_fields)), np.nan, dtype=np.float64)
+        # Yuvaya son yazılan kaydın sıra numarası (export sırasında üzerine yazmayı tespit eder)
+        self.sequence = np.zeros(self.capacity, dtype=np.int64)
+        self.written = 0
+        self.index = 0
+        self.count = 0
+    
+    def _ensure_capacity(self, height, width):
+        if self.frames is not None and self.frames.shape[1] >= height and self.frames.shape[2] >= width:
+            return
+        old = self.frames
+        new_height = max(height, old.shape[1] if old is not None else 0)
+        new_width = max(width, old.shape[2] if old is not None else 0)
+        self.frames = np.zeros((self.capacity, new_height, new_width, 3), dtype=np.uint8)
+        if old is not None:
+            self.frames[:, :old.shape[1], :old.shape[2]] = old
+    
+    def record(self, image, timestamp, *readings):
+        """Kareyi ve okumalarını sıradaki yuvaya yaz (okuma yoksa NaN)"""
+        if image is None:
+            return
+        rgb = to_rgb(image)
+        height, width = rgb.shape[:2]
+        with self.lock:
+            self._ensure_capacity(height, width)
+            slot = self.index
+            np.copyto(self.frames[slot, :height, :width], rgb)
+            self.shapes[slot] = (height, width)
+            self.timestamps[slot] = timestamp
+            for i in range(len(self.reading_fields)):
+                value = readings[i] if i < len(readings) else None
+                self.readings[slot, i] = np.nan if value is None else value
+            self.written += 1
+            self.sequence[slot] = self.written
+            self.index = (slot + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+    
+    def latest(self):
+        """Son kare (kopya) veya None"""
+        with self.lock:
+            if self.count == 0:
+                return None
+            slot = (self.index - 1) % self.capacity
+            height, width = self.shapes[slot]
+            return self.frames[slot, :height, :width].copy()
+    
+    def export(self, seconds=None):
+        """Son seconds saniyedeki kayıtlar (eskiden yeniye) -> dizi sözlüğü (kopya)
+        
+        Kilit altında sadece yuva sırası ve küçük diziler kopyalanır; motor döngüsü büyük
+        kare kopyası boyunca beklemez. Kopya sırasında üzerine yazılan (en eski) kayıtlar atılır;
+        bu arada tampon yeniden boyutlandıysa (resize) yuvalar eşleşmez, boş klip döner.
+        """
+        with self.lock:
+            order = (np.arange(self.count) + self.index - self.count) % self.capacity
+            if seconds is not None and self.count:
+                newest = self.timestamps[order[-1]]
+                order = order[self.timestamps[order] >= newest - seconds]
+            capacity = self.capacity
+            frames = self.frames
+            sequence = self.sequence[order]
+            clip = {
+                'shapes': self.shapes[order],
+                'timestamps': self.timestamps[order],
+                'readings': self.readings[order]
+            }
+        
+        # Kare tamponu büyütülse bile eski dizi referansı geçerlidir
+        copied = frames[order] if frames is not None else np.zeros((0, 0, 0, 3), np.uint8)
+        with self.lock:
+            if self.capacity != capacity:
+                # resize() yuvaları yeniden sıraladı: kopyalanan kareler doğrulanamaz
+                intact = np.zeros(len(order), dtype=bool)
+            else:
+                # Bölge büyüyünce (_ensure_capacity) yuva düzeni aynı kalır, eski dizi artık yazılmaz;
+                # o andan önce ve sonra yazılan yuvalar sıra numarasından anlaşılır
+                intact = self.sequence[order] == sequence
+        frames = copied
+        if not intact.all():
+            frames = frames[intact]
+            for key in clip:
+                clip[key] = clip[key][intact]
+        clip['frames'] = frames
+        # perf_counter zamanlarını duvar saatine çevir (olay zamanıyla eşleştirmek için)
+        clip['wall_times'] = clip['timestamps'] + (time.time() - time.perf_counter())
+        clip['reading_fields'] = np.array(self.reading_fields)
+        return clip
+    
+    def resize(self, capacity):
+        """Kapasiteyi değiştir (kontrol aralığı değişti); en yeni kayıtlar korunur"""
+        capacity = max(1, int(capacity))
+        with self.lock:
+            if capacity == self.capacity:
+                return
+            keep = min(self.count, capacity)
+            order = (np.arange(keep) + self.index - keep) % self.capacity
+            if self.frames is not None:
+                frames = np.zeros((capacity,) + self.frames.shape[1:], dtype=np.uint8)
+                frames[:keep] = self.frames[order]
+                self.frames = frames
+            for name in ('shapes', 'timestamps', 'readings', 'sequence'):
+                old = getattr(self, name)
+                new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+                if name == 'readings':
+                    new[:] = np.nan
+                new[:keep] = old[order]
+                setattr(self, name, new)
+            self.capacity = capacity
+            self.count = keep
+            self.index = keep % capacity
+    
+    def clear(self):
+        with self.lock:
+            self.index = 0
+            self.count = 0
+
+def save_clip(path, buffers, seconds=None):
+    """Birden çok tamponun son seconds saniyesini sıkıştırılmış .npz dosyasına yaz
+    
+    buffers: {"hp": FrameRingBuffer, "minimap": FrameRingBuffer}; dosyada anahtarlar
+    "hp_frames", "hp_timestamps", "minimap_readings" ... şeklindedir.
+    """
+    arrays = {}
+    for name, buffer in buffers.items():
+        for key, value in buffer.export(seconds).items():
+            arrays[f"{name}_{key}"] = value
+    np.savez_compressed(path, **arrays)
+    return path
@@ -0,0 +1,211 @@
+import os
+import time
+import threading
+import mss
+import numpy as np
+from PIL import Image
+
+def bgra_view(screenshot):
+    """mss ekran görüntüsünün ham BGRA tamponunu kopyalamadan H×W×4 dizi olarak sar"""
+    return np.frombuffer(screenshot.raw, dtype=np.uint8).reshape(screenshot.height, screenshot.width, 4)
+
+def split_channels(image):
+    """(r, g, b) kanal görünümlerini döndür
+    
+    4 kanallı kareler mss'in BGRA düzenindedir, 3 kanallı kareler (PNG/kayıt) RGB.
+    Görünümler kopya oluşturmaz.
+    """
+    if image.shape[-1] == 4:
+        return image[..., 2], image[..., 1], image[..., 0]
+    return image[..., 0], image[..., 1], image[..., 2]
+
+def to_rgb(image):
+    """Kareyi RGB kanal sırasıyla döndür (BGRA için kopyasız görünüm)"""
+    if image.shape[-1] == 4:
+        return image[..., 2::-1]
+    return image
+
+class ReplayFinished(Exception):
+    """Kayıttaki kareler bitti (loop=False iken)"""
+
+class FrameSource:
+    """Kare kaynağı arayüzü - motorlar ekran görüntüsünü bu arayüz üzerinden alır"""
+    
+    # Son karenin yakalanma zamanı (time.perf_counter)
+    last_frame_time = None
+    
+    def grab(self, region):
+        """region: {"x", "y", "width", "height"} -> H×W×3 RGB veya H×W×4 BGRA numpy dizisi"""
+        raise NotImplementedError
+    
+    def grab_many(self, regions):
+        """Aynı tick'te birden çok bölge -> bölge sırasıyla kareler"""
+        return [self.grab(region) for region in regions]
+    
+    def close(self):
+        """Çağıran thread'e ait kaynakları serbest bırak"""
+        pass
+
+class OffsetFrameSource(FrameSource):
+    """Bölgeleri sabit bir ekran konumuna göre kaydıran kaynak (çoklu oyun penceresi/monitör)
+    
+    Motor bölgeleri kendi penceresine göre tanımlar; grab() sırasında offset eklenir.
+    """
+    
+    def __init__(self, source, offset_x=0, offset_y=0):
+        self.source = source
+        self.offset_x = offset_x
+        self.offset_y = offset_y
+    
+    @property
+    def last_frame_time(self):
+        return self.source.last_frame_time
+    
+    def _shift(self, region):
+        shifted = dict(region)
+        shifted["x"] = region["x"] + self.offset_x
+        shifted["y"] = region["y"] + self.offset_y
+        return shifted
+    
+    def grab(self, region):
+        return self.source.grab(self._shift(region))
+    
+    def grab_many(self, regions):
+        return self.source.grab_many([self._shift(region) for region in regions])
+    
+    def close(self):
+        self.source.close()
+
+def monitor_origin(index):
+    """mss monitör numarasının (1: birincil) sanal ekrandaki sol üst köşesi -> (x, y)"""
+    with mss.mss() as sct:
+        monitor = sct.monitors[index]
+    return monitor["left"], monitor["top"]
+
+class MssFrameSource(FrameSource):
+    """Canlı ekran yakalama (mss) - kareler ham BGRA tamponu üzerinde kopyasız görünümdür
+    
+    Her thread kendi mss nesnesini kullanır: mss nesneleri thread'ler arasında paylaşılamaz
+    (Windows'ta GDI tanıtıcıları onları oluşturan thread'e bağlıdır). close() sadece çağıran
+    thread'in nesnesini kapatır.
+    """
+    
+    def __init__(self):
+        self._local = threading.local()
+    
+    def _get_sct(self):
+        sct = getattr(self._local, 'sct', None)
+        if sct is None:
+            sct = mss.mss()
+            self._local.sct = sct
+        return sct
+    
+    def grab(self, region):
+        monitor = {
+            "top": region["y"],
+            "left": region["x"],
+            "width": region["width"],
+            "height": region["height"]
+        }
+        frame = bgra_view(self._get_sct().grab(monitor))
+        self.last_frame_time = time.perf_counter()
+        return frame
+    
+    def close(self):
+        sct = getattr(self._local, 'sct', None)
+        self._local.sct = None
+        if sct is not None:
+            try:
+                sct.close()
+            except Exception:
+                pass
+
+class ReplayFrameSource(FrameSource):
+    """Kaydedilmiş karelerden okuma - ekran olmadan çalıştırma ve benchmark için
+    
+    frames: PNG/.npy dosyaları içeren klasör, tek bir .npy dosyası (N×H×W×3),
+            numpy dizisi (N×H×W×3) veya dizi listesi
+    fps: None ise her grab() sıradaki kareyi döndürür (olabildiğince hızlı),
+         aksi halde kare geçen süreye göre seçilir (gerçek zamanlı oynatma)
+    loop: kayıt bitince başa dön; False ise ReplayFinished fırlatılır
+    crop: kareler tam ekran ise region koordinatlarına göre kırp
+    """
+    
+    def __init__(self, frames, fps=None, loop=True, crop=False):
+        self.frames = self._load_frames(frames)
+        if len(self.frames) == 0:
+            raise ValueError("Kayıtta hiç kare yok")
+        self.fps = fps
+        self.loop = loop
+        self.crop = crop
+        self.lock = threading.Lock()
+        self.index = 0
+        self.start_time = None
+    
+    @staticmethod
+    def _load_frames(frames):
+        if isinstance(frames, np.ndarray):
+            return frames if frames.ndim == 4 else frames[np.newaxis]
+        if isinstance(frames, (list, tuple)):
+            return [np.asarray(frame) for frame in frames]
+        if os.path.isdir(frames):
+            loaded = []
+            for name in sorted(os.listdir(frames)):
+                path = os.path.join(frames, name)
+                lower = name.lower()
+                if lower.endswith('.npy'):
+                    array = np.load(path)
+                    if array.ndim == 4:
+                        loaded.extend(array)
+                    else:
+                        loaded.append(array)
+                elif lower.endswith('.png'):
+                    with Image.open(path) as img:
+                        loaded.append(np.array(img.convert("RGB")))
+            return loaded
+        # Tek yığın dosyası - büyük kayıtlar için belleğe tamamen yüklenmez
+        array = np.load(frames, mmap_mode='r')
+        return array if array.ndim == 4 else array[np.newaxis]
+    
+    def __len__(self):
+        return len(self.frames)
+    
+    def reset(self):
+        with self.lock:
+            self.index = 0
+            self.start_time = None
+    
+    def _next_index(self):
+        count = len(self.frames)
+        with self.lock:
+            if self.fps:
+                now = time.perf_counter()
+                if self.start_time is None:
+                    self.start_time = now
+                index = int((now - self.start_time) * self.fps)
+            else:
+                index = self.index
+                self.index += 1
+        
+        if index >= count:
+            if not self.loop:
+                raise ReplayFinished()
+            index %= count
+        return index
+    
+    def _crop(self, frame, region):
+        if self.crop:
+            x, y = region["x"], region["y"]
+            frame = frame[y:y + region["height"], x:x + region["width"]]
+        return np.asarray(frame)
+    
+    def grab(self, region):
+        frame = self.frames[self._next_index()]
+        self.last_frame_time = time.perf_counter()
+        return self._crop(frame, region)
+    
+    def grab_many(self, regions):
+        # Tüm bölgeler aynı kayıtlı kareden
+        frame = self.frames[self._next_index()]
+        self.last_frame_time = time.perf_counter()
+        return [self._crop(frame, region) for region in regions]
@@ -7,6 +7,14 @@ from bot_engine import DiabloImmortalBotEngine
 from region_selector import RegionSelector
 from map_region_selector import MapRegionSelector
 from farming_engine import FarmingEngine
+from frame_source import to_rgb
+from capture_broker import CaptureBroker
+from input_worker import InputWorker
+from async_runtime import AsyncRuntime
+from analysis_process import AnalysisProcess
+from latency_metrics import format_stage_table
+from frame_ring import save_clip
+from session_recorder import SessionRecorder
 
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
@@ -17,21 +25,58 @@ class DiabloImmortalBotGUI:
         self.root.title("Diablo Immortal HP Bot")
         self.root.geometry("900x700")
         
+        # Her iki motor tek ekran nesnesini ve aynı tick'teki kareyi paylaşır
+        self.capture_broker = CaptureBroker()
+        
+        # İsteğe bağlı: iki motor ve tuş zamanlayıcıları tek olay döngüsünde (config: async_runtime)
+        self.runtime = AsyncRuntime() if self.read_startup_setting('async_runtime') else None
+        
+        # İsteğe bağlı: can ve marker analizi ayrı süreçlerde (config: analysis_processes)
+        if self.read_startup_setting('analysis_processes'):
+            self.hp_process = AnalysisProcess('hp')
+            self.minimap_process = AnalysisProcess('minimap')
+        else:
+            self.hp_process = self.minimap_process = None
+        
+        # Potion ve hareket tuşları aynı tuş thread'inden basılır
+        self.input_worker = self.runtime.input_worker if self.runtime else InputWorker()
+        
         self.bot_engine = DiabloImmortalBotEngine(
             on_hp_update=self.on_hp_update,
             on_potion_used=self.on_potion_used,
-            on_debug_image=self.on_debug_image
+            on_region_update=self.on_region_update,
+            frame_source=self.capture_broker.subscribe("hp"),
+            input_worker=self.input_worker,
+            runtime=self.runtime,
+            analysis_process=self.hp_process
         )
         
         self.farming_engine = FarmingEngine(
             on_position_update=self.on_farming_position_update,
-            on_boundary_warning=self.on_farming_boundary_warning
+            on_boundary_warning=self.on_farming_boundary_warning,
+            frame_source=self.capture_broker.subscribe("farming"),
+            input_worker=self.input_worker,
+            runtime=self.runtime,
+            analysis_process=self.minimap_process,
+            config_store=self.bot_engine.config_store
         )
         
         self.current_hp = 100.0
-        self.last_debug_image = None
+        self.session_recorder = None
         self.setup_ui()
         self.load_config_to_ui()
+        self.load_farming_settings_to_ui()
+        # Motorlardan sonra abone olur: bildirim geldiğinde motorlar yeni ayarları uygulamış olur
+        self.bot_engine.config_store.subscribe(self.on_config_reloaded)
+    
+    @staticmethod
+    def read_startup_setting(key, config_path="config.json"):
+        """Motorlar kurulmadan önce gereken ayar (yeniden başlatınca etkin olur)"""
+        try:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get(key, False)
+        except Exception:
+            return False
     
     def setup_ui(self):
         # Ana container
@@ -48,6 +93,9 @@ class DiabloImmortalBotGUI:
         # Farming Modu Tab
         self.farming_tab = self.tabview.add("Farming Modu")
         
+        # Tanılama Tab
+        self.diagnostics_tab = self.tabview.add("Tanılama")
+        
         # Sol panel - HP Bot Ayarları
         left_panel = ctk.CTkFrame(self.hp_bot_tab)
         left_panel.pack(side="left", fill="both", expand=True, padx=(0, 5))
@@ -174,6 +222,14 @@ class DiabloImmortalBotGUI:
         self.h_low_max_b = ctk.CTkEntry(low_row2, width=50)
         self.h_low_max_b.pack(side="left", padx=2)
         
+        # Can barı rengi bu aralıklardan derlenen tabloyla sınıflandırılır (kapalıyken kenarlardan türetilir)
+        self.color_lut_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(colors_frame, text="Renk Aralıklarıyla Algıla", variable=self.color_lut_var).pack(anchor="w", pady=(10, 5))
+        
+        # Sadece barın ortasından ince bir şerit yakalanır, bitiş sütunu ikili aramayla bulunur
+        self.probe_estimator_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(colors_frame, text="Seyrek Şerit Tahmini", variable=self.probe_estimator_var).pack(anchor="w", pady=(5, 5))
+        
         # Diğer Ayarlar
         other_frame = ctk.CTkFrame(left_panel)
         other_frame.pack(fill="x", padx=10, pady=5)
@@ -191,6 +247,29 @@ class DiabloImmortalBotGUI:
         self.key_press_duration_entry.pack(pady=2)
         ctk.CTkLabel(other_frame, text="(Tuş basılı kalma süresi, önerilen: 60ms)", font=ctk.CTkFont(size=10)).pack(anchor="w", pady=(0, 5))
         
+        # Uyarlamalı örnekleme (can eğimine göre kontrol aralığı)
+        self.adaptive_sampling_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(other_frame, text="Uyarlamalı Kontrol Aralığı", variable=self.adaptive_sampling_var).pack(anchor="w", pady=(10, 5))
+        
+        sampling_row = ctk.CTkFrame(other_frame)
+        sampling_row.pack(fill="x", pady=2)
+        ctk.CTkLabel(sampling_row, text="Min (ms):", width=60).pack(side="left", padx=5)
+        self.min_interval_entry = ctk.CTkEntry(sampling_row, width=60)
+        self.min_interval_entry.pack(side="left", padx=2)
+        ctk.CTkLabel(sampling_row, text="Max (ms):", width=60).pack(side="left", padx=5)
+        self.max_interval_entry = ctk.CTkEntry(sampling_row, width=60)
+        self.max_interval_entry.pack(side="left", padx=2)
+        
+        # Tahmine dayalı potion (eşik geçişi tepki süresi içinde tahmin edilirse erken bas)
+        self.predictive_trigger_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(other_frame, text="Tahmine Dayalı Potion", variable=self.predictive_trigger_var).pack(anchor="w", pady=(10, 5))
+        
+        prediction_row = ctk.CTkFrame(other_frame)
+        prediction_row.pack(fill="x", pady=2)
+        ctk.CTkLabel(prediction_row, text="Potion Gecikmesi (ms):", width=140).pack(side="left", padx=5)
+        self.potion_latency_entry = ctk.CTkEntry(prediction_row, width=60)
+        self.potion_latency_entry.pack(side="left", padx=2)
+        
         # Sağ panel - Durum (HP Bot için)
         right_panel = ctk.CTkFrame(self.hp_bot_tab)
         right_panel.pack(side="right", fill="both", expand=True, padx=(5, 0))
@@ -221,6 +300,16 @@ class DiabloImmortalBotGUI:
         self.stats_label = ctk.CTkLabel(bot_status_frame, text="Potion Sayısı: 0", font=ctk.CTkFont(size=12))
         self.stats_label.pack(pady=5)
         
+        self.sampling_label = ctk.CTkLabel(bot_status_frame, text="Örnekleme: -", font=ctk.CTkFont(size=12))
+        self.sampling_label.pack(pady=5)
+        
+        self.prediction_label = ctk.CTkLabel(bot_status_frame, text="Tahmin: -", font=ctk.CTkFont(size=12))
+        self.prediction_label.pack(pady=5)
+        
+        # Ek bölge okumaları (config: regions / rules)
+        self.regions_label = ctk.CTkLabel(bot_status_frame, text="Bölgeler: -", font=ctk.CTkFont(size=12))
+        self.regions_label.pack(pady=5)
+        
         # Log Alanı
         log_frame = ctk.CTkFrame(right_panel)
         log_frame.pack(fill="both", expand=True, padx=10, pady=10)
@@ -246,6 +335,9 @@ class DiabloImmortalBotGUI:
         # Farming Modu UI
         self.setup_farming_ui()
         
+        # Tanılama UI
+        self.setup_diagnostics_ui()
+        
         self.update_stats_loop()
     
     def on_threshold_change(self, value):
@@ -310,6 +402,16 @@ class DiabloImmortalBotGUI:
         self.cooldown_entry.insert(0, str(config['cooldown_ms']))
         self.key_press_duration_entry.delete(0, "end")
         self.key_press_duration_entry.insert(0, str(config.get('key_press_duration_ms', 60)))
+        self.adaptive_sampling_var.set(config.get('adaptive_sampling', False))
+        self.min_interval_entry.delete(0, "end")
+        self.min_interval_entry.insert(0, str(config.get('min_check_interval_ms', 30)))
+        self.max_interval_entry.delete(0, "end")
+        self.max_interval_entry.insert(0, str(config.get('max_check_interval_ms', 300)))
+        self.predictive_trigger_var.set(config.get('predictive_trigger', False))
+        self.color_lut_var.set(config.get('hp_color_mode', 'edge') == 'lut')
+        self.probe_estimator_var.set(config.get('hp_estimator', 'full') == 'probe')
+        self.potion_latency_entry.delete(0, "end")
+        self.potion_latency_entry.insert(0, str(config.get('potion_latency_ms', 150)))
     
     def save_settings(self):
         try:
@@ -346,11 +448,18 @@ class DiabloImmortalBotGUI:
             self.bot_engine.update_config(
                 hp_bar=hp_bar,
                 hp_colors=hp_colors,
+                hp_color_mode='lut' if self.color_lut_var.get() else 'edge',
+                hp_estimator='probe' if self.probe_estimator_var.get() else 'full',
                 hp_threshold=int(self.threshold_slider.get()),
                 key_to_press=self.key_var.get(),
                 check_interval_ms=int(self.interval_entry.get()),
                 cooldown_ms=int(self.cooldown_entry.get()),
-                key_press_duration_ms=int(self.key_press_duration_entry.get())
+                key_press_duration_ms=int(self.key_press_duration_entry.get()),
+                adaptive_sampling=self.adaptive_sampling_var.get(),
+                min_check_interval_ms=int(self.min_interval_entry.get()),
+                max_check_interval_ms=int(self.max_interval_entry.get()),
+                predictive_trigger=self.predictive_trigger_var.get(),
+                potion_latency_ms=int(self.potion_latency_entry.get())
             )
             
             self.add_log("Ayarlar kaydedildi!")
@@ -404,6 +513,12 @@ class DiabloImmortalBotGUI:
         
         self.hp_percentage_label.configure(text_color=color)
     
+    def on_region_update(self, readings, fired_rules):
+        text = "Bölgeler: " + " | ".join(f"{name} %{value:.0f}" for name, value in readings.items() if name != "hp")
+        for name in fired_rules:
+            self.add_log(f"Kural tetiklendi: {name}")
+        self.root.after(0, lambda: self.regions_label.configure(text=text))
+    
     def on_potion_used(self, count, key_or_error):
         if count == -1:
             self.add_log(f"Potion hatası: {key_or_error}")
@@ -414,11 +529,154 @@ class DiabloImmortalBotGUI:
             self.root.after(0, update_stats)
     
     def update_stats_loop(self):
+        self.update_diagnostics()
         if self.bot_engine.running:
             stats = self.bot_engine.get_stats()
-            # Stats güncellenebilir
+            sampling = stats['sampling']
+            self.sampling_label.configure(
+                text=f"Örnekleme: {sampling['effective_rate_hz']:.1f} Hz ({sampling['current_interval_ms']:.0f} ms), "
+                     f"önbellek isabeti %{stats['frame_memo']['hit_rate'] * 100:.0f}"
+            )
+            prediction = stats['prediction']
+            self.prediction_label.configure(
+                text=f"Tahmin: {prediction['would_fire_earlier_count']} kez erken "
+                     f"(ort. {prediction['avg_lead_ms']:.0f} ms, tepki {prediction['reaction_latency_ms']:.0f} ms)"
+            )
         self.root.after(1000, self.update_stats_loop)
     
+    def setup_diagnostics_ui(self):
+        """Tanılama sekmesi - döngü aşamalarının gecikme histogramları"""
+        ctk.CTkLabel(self.diagnostics_tab, text="Döngü Gecikmeleri", font=ctk.CTkFont(size=20, weight="bold")).pack(pady=(10, 10))
+        
+        self.diagnostics_textbox = ctk.CTkTextbox(self.diagnostics_tab, font=ctk.CTkFont(family="Courier", size=12))
+        self.diagnostics_textbox.pack(fill="both", expand=True, padx=10, pady=5)
+        
+        diagnostics_control_panel = ctk.CTkFrame(self.diagnostics_tab)
+        diagnostics_control_panel.pack(fill="x", pady=(10, 0))
+        
+        ctk.CTkButton(diagnostics_control_panel, text="Sıfırla", command=self.reset_diagnostics, width=120, height=40).pack(side="left", padx=10, pady=10)
+        ctk.CTkButton(diagnostics_control_panel, text="JSON Olarak Kaydet", command=self.save_diagnostics, width=150, height=40).pack(side="left", padx=10, pady=10)
+        
+        # Son N saniyenin can barı ve mini harita kareleri (okumalarıyla) tek .npz klibi olarak
+        ctk.CTkLabel(diagnostics_control_panel, text="Son (sn):", width=60).pack(side="left", padx=(20, 5))
+        self.clip_seconds_entry = ctk.CTkEntry(diagnostics_control_panel, width=50)
+        self.clip_seconds_entry.insert(0, "10")
+        self.clip_seconds_entry.pack(side="left", padx=2)
+        ctk.CTkButton(diagnostics_control_panel, text="Klibi Kaydet (.npz)", command=self.save_debug_clip, width=150, height=40).pack(side="left", padx=10, pady=10)
+        
+        # Uzun oturum kaydı: kareler, okumalar ve tuş olayları parçalı mmap dosyasına
+        self.recording_button = ctk.CTkButton(diagnostics_control_panel, text="Oturum Kaydını Başlat", command=self.toggle_session_recording, width=170, height=40)
+        self.recording_button.pack(side="left", padx=10, pady=10)
+    
+    def update_diagnostics(self):
+        text = "HP Bot\n" + format_stage_table(self.bot_engine.metrics.snapshot())
+        text += "\n\nFarming\n" + format_stage_table(self.farming_engine.metrics.snapshot())
+        input_stats = self.input_worker.get_stats()
+        text += (f"\n\nTuş Kuyruğu (öncelik başına bekleme) - birleştirilen {input_stats['coalesced']}, "
+                 f"öncelikle kesilen {input_stats['preemptions']}\n" + format_stage_table(input_stats['queue_latency']))
+        for title, scheduler in (("HP Bot", self.bot_engine.scheduler), ("Farming", self.farming_engine.scheduler)):
+            stats = scheduler.get_stats()
+            text += (f"\n\n{title} zamanlayıcı: {stats['achieved_rate_hz']:.1f}/{stats['target_rate_hz']:.1f} Hz, "
+                     f"kaçırılan son tarih {stats['missed_deadlines']} ({stats['skipped_periods']} periyot), "
+                     f"taşma {stats['overruns']}, uyanma gecikmesi p99 {stats['lateness_p99_ms']:.2f} ms")
+        hp_memo = self.bot_engine.hp_memo.get_stats()
+        marker_memo = self.farming_engine.marker_memo.get_stats()
+        text += (f"\n\nKare önbelleği isabeti: can barı %{hp_memo['hit_rate'] * 100:.1f} ({hp_memo['hits']}/"
+                 f"{hp_memo['hits'] + hp_memo['misses']}), mini harita %{marker_memo['hit_rate'] * 100:.1f} "
+                 f"({marker_memo['hits']}/{marker_memo['hits'] + marker_memo['misses']})")
+        detection = self.farming_engine.get_detection_stats()
+        tracking = detection['tracking']
+        text += (f"\nMarker takibi: {'kilitli' if tracking['locked'] else 'kilit yok'}, kare başına "
+                 f"{tracking['pixels_per_frame']:.0f} piksel (+{tracking['background_pixels_per_frame']:.0f} arka plan), "
+                 f"tam tarama {tracking['full_scans']}/{tracking['frames']}, "
+                 f"yedeğe düşme {tracking['fallbacks']}")
+        background = detection['background']
+        text += (f"\nArka plan modeli: {'hazır' if background['ready'] else 'ısınıyor'} ({background['frames']} kare), "
+                 f"elenen aday piksel %{background['suppressed_ratio'] * 100:.1f}")
+        self.diagnostics_textbox.delete("1.0", "end")
+        self.diagnostics_textbox.insert("1.0", text)
+    
+    def reset_diagnostics(self):
+        self.bot_engine.metrics.reset()
+        self.farming_engine.metrics.reset()
+        self.input_worker.metrics.reset()
+        self.bot_engine.scheduler.reset()
+        self.farming_engine.scheduler.reset()
+        self.add_log("Gecikme istatistikleri sıfırlandı")
+    
+    def save_diagnostics(self):
+        """Gecikme histogramlarını JSON dosyasına kaydet"""
+        try:
+            filename = f"latency_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'hp_bot': self.bot_engine.metrics.snapshot(),
+                    'farming': self.farming_engine.metrics.snapshot(),
+                    'input_queue': self.input_worker.metrics.snapshot(),
+                    'scheduler': {
+                        'hp_bot': self.bot_engine.scheduler.get_stats(),
+                        'farming': self.farming_engine.scheduler.get_stats()
+                    }
+                }, f, indent=2, ensure_ascii=False)
+            self.add_log(f"Gecikme istatistikleri kaydedildi: {filename}")
+        except Exception as e:
+            self.add_log(f"İstatistik kaydetme hatası: {e}")
+    
+    def save_debug_clip(self):
+        """Son N saniyenin karelerini sıkıştırılmış .npz klibi olarak kaydet"""
+        try:
+            seconds = float(self.clip_seconds_entry.get())
+            buffers = {"minimap": self.farming_engine.debug_buffer}
+            if self.bot_engine.debug_buffer is not None:
+                buffers["hp"] = self.bot_engine.debug_buffer
+            filename = f"clip_{datetime.now().strftime('%Y%m%d_%H%M%S')}.npz"
+            # Sıkıştırma GUI'yi bekletmesin
+            threading.Thread(target=self._write_clip, args=(filename, buffers, seconds), daemon=True).start()
+        except ValueError as e:
+            self.add_log(f"Hata: Geçersiz değer - {e}")
+    
+    def _write_clip(self, filename, buffers, seconds):
+        try:
+            save_clip(filename, buffers, seconds)
+            self.add_log(f"Son {seconds:g} saniyelik klip kaydedildi: {filename}")
+        except Exception as e:
+            self.add_log(f"Klip kaydetme hatası: {e}")
+    
+    def toggle_session_recording(self):
+        """Oturum kaydını başlat/durdur"""
+        if self.session_recorder is None:
+            try:
+                filename = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}.dses"
+                config = self.bot_engine.config
+                self.session_recorder = SessionRecorder(
+                    filename,
+                    chunk_frames=config.get('recording_chunk_frames', 64),
+                    compression=config.get('recording_compression', 'zlib')
+                )
+            except Exception as e:
+                self.add_log(f"Oturum kaydı başlatılamadı: {e}")
+                return
+            self.bot_engine.recorder = self.session_recorder
+            self.farming_engine.recorder = self.session_recorder
+            self.recording_button.configure(text="Oturum Kaydını Durdur")
+            self.add_log(f"Oturum kaydı başladı: {filename}")
+        else:
+            recorder, self.session_recorder = self.session_recorder, None
+            self.bot_engine.recorder = None
+            self.farming_engine.recorder = None
+            self.recording_button.configure(text="Oturum Kaydını Başlat")
+            # Kalan parçaların yazılması GUI'yi bekletmesin
+            threading.Thread(target=self._close_recorder, args=(recorder,), daemon=True).start()
+    
+    def _close_recorder(self, recorder):
+        try:
+            recorder.close()
+            stats = recorder.get_stats()
+            self.add_log(f"Oturum kaydı kaydedildi: {stats['path']} ({stats['frames']} kayıt, "
+                         f"sıkıştırma {stats['compression_ratio']:.1f}x, atlanan {stats['dropped_frames']})")
+        except Exception as e:
+            self.add_log(f"Oturum kaydı kapatma hatası: {e}")
+    
     def select_region(self):
         """Can barı bölgesini seçmek için region selector'ı aç"""
         def show_gui():
@@ -462,8 +720,10 @@ class DiabloImmortalBotGUI:
     def auto_detect_colors(self):
         """Can barı görüntüsünden renkleri otomatik algıla"""
         try:
-            # Can barı görüntüsünü al (GUI thread'inden çağrıldığı için use_temp_mss=True)
+            # Can barının tamamını geçici ekran nesnesiyle al (GUI thread'inden çağrıldığı için use_temp_mss=True)
             hp_bar_image = self.bot_engine.capture_hp_bar(use_temp_mss=True)
+            if hp_bar_image is not None:
+                hp_bar_image = to_rgb(hp_bar_image)
             
             if hp_bar_image is None or hp_bar_image.size == 0:
                 self.add_log("Can barı görüntüsü alınamadı. Koordinatları kontrol edin.")
@@ -522,19 +782,16 @@ class DiabloImmortalBotGUI:
             import traceback
             self.add_log(f"Detay: {traceback.format_exc()}")
     
-    def on_debug_image(self, image_array):
-        """Can barı görüntüsünü kaydet (debug için)"""
-        self.last_debug_image = image_array
-    
     def save_debug_image(self):
-        """Can barı görüntüsünü dosyaya kaydet"""
-        if self.last_debug_image is None:
+        """Can barı görüntüsünü dosyaya kaydet (halka tampondaki son kare)"""
+        image = self.bot_engine.debug_buffer.latest() if self.bot_engine.debug_buffer else None
+        if image is None:
             self.add_log("Henüz görüntü yakalanmadı. Botu başlatın veya bir süre bekleyin.")
             return
         
         try:
             from PIL import Image
-            img = Image.fromarray(self.last_debug_image)
+            img = Image.fromarray(image)
             filename = f"hp_bar_debug_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
             img.save(filename)
             self.add_log(f"Can barı görüntüsü kaydedildi: {filename}")
@@ -652,23 +909,7 @@ class DiabloImmortalBotGUI:
         def on_region_selected(region, circle_center, radius):
             def update_ui():
                 try:
-                    self.minimap_x_entry.delete(0, "end")
-                    self.minimap_x_entry.insert(0, str(region['x']))
-                    self.minimap_y_entry.delete(0, "end")
-                    self.minimap_y_entry.insert(0, str(region['y']))
-                    self.minimap_w_entry.delete(0, "end")
-                    self.minimap_w_entry.insert(0, str(region['width']))
-                    self.minimap_h_entry.delete(0, "end")
-                    self.minimap_h_entry.insert(0, str(region['height']))
-                    
-                    self.circle_center_x_entry.delete(0, "end")
-                    self.circle_center_x_entry.insert(0, str(circle_center['x']))
-                    self.circle_center_y_entry.delete(0, "end")
-                    self.circle_center_y_entry.insert(0, str(circle_center['y']))
-                    
-                    self.circle_radius_entry.delete(0, "end")
-                    self.circle_radius_entry.insert(0, str(radius))
-                    
+                    self.fill_farming_entries(region, circle_center, radius)
                     self.add_log(f"Mini harita bölgesi ve daire seçildi!")
                     show_gui()
                 except Exception as e:
@@ -698,6 +939,41 @@ class DiabloImmortalBotGUI:
             self.add_log(f"Detay: {traceback.format_exc()}")
             show_gui()
     
+    def fill_farming_entries(self, region, circle_center, radius):
+        """Mini harita bölgesi ve daire alanlarını doldur (eksik olanlar atlanır)"""
+        if region:
+            self.minimap_x_entry.delete(0, "end")
+            self.minimap_x_entry.insert(0, str(region['x']))
+            self.minimap_y_entry.delete(0, "end")
+            self.minimap_y_entry.insert(0, str(region['y']))
+            self.minimap_w_entry.delete(0, "end")
+            self.minimap_w_entry.insert(0, str(region['width']))
+            self.minimap_h_entry.delete(0, "end")
+            self.minimap_h_entry.insert(0, str(region['height']))
+        
+        if circle_center:
+            self.circle_center_x_entry.delete(0, "end")
+            self.circle_center_x_entry.insert(0, str(circle_center['x']))
+            self.circle_center_y_entry.delete(0, "end")
+            self.circle_center_y_entry.insert(0, str(circle_center['y']))
+        
+        if radius is not None:
+            self.circle_radius_entry.delete(0, "end")
+            self.circle_radius_entry.insert(0, str(radius))
+    
+    def load_farming_settings_to_ui(self):
+        """config.json'da kayıtlı farming ayarlarını arayüze yükle"""
+        status = self.farming_engine.get_status()
+        self.fill_farming_entries(status['minimap_region'], status['circle_center'], status['circle_radius'])
+    
+    def on_config_reloaded(self, config):
+        """config.json dışarıdan değişti - motorlar yeniden yükledi, arayüzü güncelle"""
+        def update_ui():
+            self.load_config_to_ui()
+            self.load_farming_settings_to_ui()
+            self.add_log("config.json değişti, ayarlar yeniden yüklendi")
+        self.root.after(0, update_ui)
+    
     def save_farming_settings(self):
         """Farming ayarlarını kaydet"""
         try:
@@ -773,6 +1049,17 @@ class DiabloImmortalBotGUI:
         self.root.mainloop()
         self.bot_engine.stop()
         self.farming_engine.stop()
+        if self.session_recorder:
+            self.session_recorder.close()
+        self.capture_broker.close()
+        self.bot_engine.config_store.close()
+        if self.runtime:
+            self.runtime.stop()
+        else:
+            self.input_worker.stop()
+        for process in (self.hp_process, self.minimap_process):
+            if process:
+                process.close()
 
 if __name__ == "__main__":
     app = DiabloImmortalBotGUI()
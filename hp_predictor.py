@@ -0,0 +1,115 @@
+import threading
+from collections import deque
+
+def fit_line(samples):
+    """(zaman, değer) örneklerine en küçük kareler doğrusu: (eğim, ortalama zaman, ortalama değer)"""
+    n = len(samples)
+    if n < 2:
+        return 0.0, (samples[0][0] if samples else 0.0), (samples[0][1] if samples else 0.0)
+    t0 = samples[0][0]
+    mean_t = sum(t - t0 for t, _ in samples) / n
+    mean_v = sum(v for _, v in samples) / n
+    var_t = sum((t - t0 - mean_t) ** 2 for t, _ in samples)
+    if var_t <= 0:
+        return 0.0, t0 + mean_t, mean_v
+    cov = sum((t - t0 - mean_t) * (v - mean_v) for t, v in samples)
+    return cov / var_t, t0 + mean_t, mean_v
+
+class HpPredictor:
+    """Son can okumalarına doğru uydurarak eşiğe kalan süreyi tahmin eder
+    
+    Tahmini eşik geçişi ölçülen tepki süresinin (analiz + tuş gecikmesi + örnekleme
+    aralığı + oyunun potion gecikmesi) içine düşerse potion erken basılabilir. Tahmin
+    kapalıyken de hesaplanır; normal tetikleme anında tahminin ne kadar önce tetikleyeceği
+    ("N ms erken") istatistiklerde tutulur.
+    """
+    
+    def __init__(self, window=6, enabled=False, game_latency=0.15, min_drop_per_s=5.0):
+        self.lock = threading.Lock()
+        self.enabled = enabled
+        self.game_latency = game_latency
+        self.min_drop_per_s = min_drop_per_s
+        self.history = deque(maxlen=window)
+        
+        # Tahmin koşulunun ilk sağlandığı an (normal tetiklemeyle karşılaştırmak için)
+        self.first_prediction_time = None
+        self.last_time_to_threshold = None
+        self.last_reaction_latency = 0.0
+        
+        # İstatistikler
+        self.predictive_fires = 0
+        self.reactive_fires = 0
+        self.earlier_count = 0
+        self.total_lead = 0.0
+        self.last_lead = 0.0
+    
+    def configure(self, window=None, enabled=None, game_latency=None, min_drop_per_s=None):
+        with self.lock:
+            if window is not None and window != self.history.maxlen:
+                self.history = deque(self.history, maxlen=window)
+            if enabled is not None:
+                self.enabled = enabled
+            if game_latency is not None:
+                self.game_latency = game_latency
+            if min_drop_per_s is not None:
+                self.min_drop_per_s = min_drop_per_s
+    
+    def record(self, hp_percentage, now):
+        with self.lock:
+            self.history.append((now, hp_percentage))
+    
+    def _time_to_threshold(self, hp_threshold, now):
+        """Eşiğe kalan tahmini süre (s); can yeterince hızlı düşmüyorsa None"""
+        if len(self.history) < 3:
+            return None
+        slope, mean_t, mean_hp = fit_line(self.history)
+        if slope > -self.min_drop_per_s:
+            return None
+        projected_hp = mean_hp + slope * (now - mean_t)
+        return max(0.0, (projected_hp - hp_threshold) / -slope)
+    
+    def evaluate(self, hp_threshold, measured_latency, now):
+        """Tahmini geçiş tepki süresi içinde mi? -> (bool, eşiğe kalan süre)"""
+        with self.lock:
+            reaction_latency = measured_latency + self.game_latency
+            time_to_threshold = self._time_to_threshold(hp_threshold, now)
+            predicted = time_to_threshold is not None and time_to_threshold <= reaction_latency
+            
+            if predicted and self.first_prediction_time is None:
+                self.first_prediction_time = now
+            elif not predicted:
+                self.first_prediction_time = None
+            
+            self.last_time_to_threshold = time_to_threshold
+            self.last_reaction_latency = reaction_latency
+            return predicted, time_to_threshold
+    
+    def note_fire(self, predictive, now, time_to_threshold=None):
+        """Potion basıldı - erken tetikleme istatistiklerini güncelle"""
+        with self.lock:
+            if predictive:
+                self.predictive_fires += 1
+                lead = time_to_threshold
+            else:
+                self.reactive_fires += 1
+                lead = now - self.first_prediction_time if self.first_prediction_time is not None else None
+            
+            if lead is not None and lead > 0:
+                self.earlier_count += 1
+                self.total_lead += lead
+                self.last_lead = lead
+            self.first_prediction_time = None
+    
+    def get_stats(self):
+        with self.lock:
+            return {
+                'enabled': self.enabled,
+                'predictive_fires': self.predictive_fires,
+                'reactive_fires': self.reactive_fires,
+                'would_fire_earlier_count': self.earlier_count,
+                'avg_lead_ms': self.total_lead / self.earlier_count * 1000 if self.earlier_count else 0.0,
+                'last_lead_ms': self.last_lead * 1000,
+                'reaction_latency_ms': self.last_reaction_latency * 1000,
+                'time_to_threshold_ms': (self.last_time_to_threshold * 1000
+                                         if self.last_time_to_threshold is not None else None)
+            }
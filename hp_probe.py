@@ -0,0 +1,121 @@
+import numpy as np
+from frame_source import to_rgb
+from color_lut import classify_colors
+
+class HpProbeEstimator:
+    """Can barının dolu kısmının bittiği sütunu ikili aramayla bulan seyrek tahminci
+    
+    Can barı soldan sağa tek yönlü dolduğu için sütun sınıflandırması "can / boş"
+    dizisinde tek bir geçiş noktası vardır. Bu noktayı bulmak için barın dikey
+    ortasından geçen 1-3 satırlık şerit yeterlidir: O(log genişlik) sütun yoklanır,
+    ardından geçiş çevresindeki birkaç sütun tam estimator'la aynı pencere kuralıyla
+    (check_range pikselin %70'ten fazlası boşsa bar biter) yeniden incelenir.
+    """
+    
+    def __init__(self, rows=1, refine=4, check_range=5):
+        self.rows = max(1, min(3, rows))
+        self.refine = refine
+        self.check_range = check_range
+        
+        # İstatistikler
+        self.estimates = 0
+        self.probed_columns = 0
+    
+    def strip_region(self, hp_bar):
+        """Can barı bölgesinin dikey ortasından geçen şerit bölgesi"""
+        rows = min(self.rows, hp_bar["height"])
+        return {
+            "x": hp_bar["x"],
+            "y": hp_bar["y"] + (hp_bar["height"] - rows) // 2,
+            "width": hp_bar["width"],
+            "height": rows
+        }
+    
+    def _column_classifier(self, strip, sample_width, lut):
+        """Tek sütun rengini ((r, g, b) tam sayı) can/boş olarak ayıran fonksiyon (None: bar tam dolu)
+        
+        Yoklama başına numpy çağrısı yapılmaz; tek sütunluk karşılaştırmalar Python'da daha ucuzdur.
+        """
+        if lut is not None:
+            shift = 8 - int(np.log2(lut.shape[0]))
+            return lambda color: bool(lut[color[0] >> shift, color[1] >> shift, color[2] >> shift])
+        
+        # Kenarlardan can ve boş alan rengi (tam estimator ile aynı kural)
+        hp_color = strip[:, :sample_width].mean(axis=(0, 1)).astype(np.uint8).tolist()
+        empty_color = strip[:, -sample_width:].mean(axis=(0, 1)).astype(np.uint8).tolist()
+        if sum(abs(h - e) for h, e in zip(hp_color, empty_color)) >= 30:
+            def classify(color):
+                hp_distance = sum((c - h) ** 2 for c, h in zip(color, hp_color))
+                empty_distance = sum((c - e) ** 2 for c, e in zip(color, empty_color))
+                return hp_distance < empty_distance
+            return classify
+        
+        hp_brightness = sum(hp_color) / 3
+        empty_brightness = sum(empty_color) / 3
+        if abs(hp_brightness - empty_brightness) <= 20:
+            return None
+        threshold = (hp_brightness + empty_brightness) / 2
+        return lambda color: sum(color) / 3 > threshold
+    
+    def estimate(self, image, lut=None):
+        """Can yüzdesi; lut verilirse sütunlar yapılandırılmış renk tablosuyla sınıflandırılır"""
+        rgb = to_rgb(image)
+        height, width = rgb.shape[:2]
+        if height == 0 or width == 0:
+            return 0.0
+        
+        # Tam kare verilirse (ör. kayıttan oynatma) ortadaki satırlar kullanılır
+        rows = min(self.rows, height)
+        top = (height - rows) // 2
+        strip = rgb[top:top + rows]
+        
+        sample_width = min(20, width // 4)
+        start_check = max(10, sample_width)
+        self.estimates += 1
+        if start_check >= width:
+            return 100.0
+        
+        classify = self._column_classifier(strip, sample_width, lut)
+        if classify is None:
+            return 100.0
+        
+        def column_color(x):
+            # Şerit satırlarının ortalaması (tam estimator'daki uint8 satır ortalaması gibi kesilir)
+            pixels = strip[:, x].tolist()
+            return [int(sum(channel) / rows) for channel in zip(*pixels)]
+        
+        # İkili arama: can olarak sınıflanmayan ilk sütun
+        low, high = start_check, width
+        while low < high:
+            middle = (low + high) // 2
+            self.probed_columns += 1
+            if classify(column_color(middle)):
+                low = middle + 1
+            else:
+                high = middle
+        
+        # Yerel inceleme: geçiş çevresinde pencere kuralını uygula (gürültülü tek sütunlara karşı)
+        window_start = max(start_check, low - self.refine)
+        window_end = min(width, low + self.refine + self.check_range)
+        colors = strip[:, window_start:window_end].mean(axis=0).astype(np.uint8).tolist()
+        hp_mask = [classify(color) for color in colors]
+        self.probed_columns += len(colors)
+        
+        hp_end = window_end
+        for offset in range(len(hp_mask)):
+            window = hp_mask[offset:offset + self.check_range]
+            if window_end < width and len(window) < self.check_range:
+                # Pencerenin sonuna yakın kısa pencereler tam estimator'da bulunmaz
+                break
+            if sum(window) < len(window) * 0.3:
+                hp_end = window_start + offset
+                break
+        
+        return float(min(max(hp_end / width * 100, 0.0), 100.0))
+    
+    def get_stats(self):
+        return {
+            'rows': self.rows,
+            'estimates': self.estimates,
+            'avg_probed_columns': self.probed_columns / self.estimates if self.estimates else 0.0
+        }
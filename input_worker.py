@@ -0,0 +1,316 @@
+import time
+import heapq
+import threading
+from collections import deque
+from latency_metrics import StageMetrics
+
+F_KEY_NAMES = tuple(f"f{i}" for i in range(1, 13))
+
+# pynput içe aktarılırken klavye arka ucuna (Linux'ta X sunucusu) bağlanır; ekransız
+# çalışmada (benchmark, kayıttan oynatma, analiz süreci, testler) hiç içe aktarılmaz
+_f_key_map = None
+
+def _pynput_keyboard():
+    from pynput import keyboard
+    return keyboard
+
+def is_supported_key(key_name):
+    """Tuş adı basılabilir mi (tek karakter veya f1-f12); pynput gerektirmez"""
+    return len(key_name) == 1 or key_name.lower() in F_KEY_NAMES
+
+def resolve_key(key_name):
+    """Tuş adını pynput tuşuna çevir (tek karakter veya f1-f12), bilinmiyorsa None"""
+    global _f_key_map
+    if len(key_name) == 1:
+        return key_name
+    if key_name.lower() not in F_KEY_NAMES:
+        return None
+    if _f_key_map is None:
+        key = _pynput_keyboard().Key
+        _f_key_map = {name: getattr(key, name) for name in F_KEY_NAMES}
+    return _f_key_map[key_name.lower()]
+
+# Öncelik seviyeleri: yüksek öncelikli istek düşük öncelikli basılı tuşları geçici bırakır
+PRIORITY_MOVEMENT = 0
+PRIORITY_RULE = 1
+PRIORITY_POTION = 2
+PRIORITY_NAMES = {PRIORITY_MOVEMENT: "movement", PRIORITY_RULE: "rule", PRIORITY_POTION: "potion"}
+
+class InputWorker:
+    """Tuş basma/bırakma işlemlerini ayrı thread'de yürüten öncelikli tuş zamanlayıcısı
+    
+    Motorlar "X tuşuna N ms bas" isteğini submit() ile bırakır ve hemen devam eder;
+    basma anında, bırakma süre dolunca worker thread'inde yapılır. Basılı bir tuş için
+    gelen yeni istek bırakma zamanını uzatır (gereksiz bırak/bas çifti yapılmaz). Aynı
+    gruptaki yeni istek, grubun yeni istekte olmayan tuşlarını bırakır (ör. hareket yönü
+    değişince eski yön tuşu); kuyrukta bekleyen aynı grup istekleri tek isteğe indirgenir.
+    
+    Öncelik: potion > kural > hareket. Yüksek öncelikli istek gelince düşük öncelikli basılı
+    tuşlar bırakılıp askıya alınır; yüksek öncelikli tuşlar bırakılınca süresi dolmamış
+    askıdaki tuşlar yeniden basılır. Yüksek öncelikli tuş basılıyken gelen düşük öncelikli
+    istek de askıda bekler. Hiçbir tuş basıldığı andan itibaren max_hold_s saniyeden uzun
+    basılı kalmaz: uzatmalar bu sınırı aşamaz, sürekli yenilenen tuş sınırda bir kez bırakılır
+    ve sonraki istekte yeniden basılır.
+    """
+    
+    def __init__(self, controller=None, max_hold_s=2.0):
+        # Verilmezse pynput denetleyicisi ilk tuş basılırken oluşturulur (ekransız motorlar için)
+        self._controller = controller
+        self.max_hold = max_hold_s
+        self.condition = threading.Condition()
+        self.running = False
+        self.worker_thread = None
+        
+        # Bekleyen istekler: (tuşlar, süre, grup, hata callback'i, gönderilme zamanı, öncelik)
+        self.pending = deque()
+        
+        # İstek gönderilmesinden tuşa basılmasına kadar geçen süre (üstel ortalama, saniye)
+        self.press_latency = 0.0
+        # Öncelik başına kuyrukta bekleme (gönderilme -> basma) histogramları
+        self.metrics = StageMetrics(PRIORITY_NAMES.values())
+        
+        # Sadece worker thread'i erişir
+        self.releases = []  # heap: (bırakma zamanı, sıra, tuş adı)
+        self.held = {}  # basılı tuş adı -> (bırakma zamanı, grup, öncelik, basılma zamanı)
+        self.suspended = {}  # askıdaki tuş adı -> (bırakma zamanı, grup, öncelik, hata callback'i)
+        self.sequence = 0
+        # Diğer thread'lerin okuduğu değişmez kopyalar: worker her işlemden sonra kilit altında yayınlar
+        self.held_keys = ()
+        self.suspended_keys = ()
+        
+        # İstatistikler
+        self.coalesced = 0
+        self.preemptions = 0
+    
+    @property
+    def controller(self):
+        if self._controller is None:
+            self._controller = _pynput_keyboard().Controller()
+        return self._controller
+    
+    @controller.setter
+    def controller(self, controller):
+        self._controller = controller
+    
+    def start(self):
+        with self.condition:
+            if self.running:
+                return
+            previous = self.worker_thread
+        # Durdurulan thread release_all() ile çıkmadan yenisi başlamasın (tuş durumu tek thread'de)
+        if previous is not None and previous is not threading.current_thread():
+            previous.join()
+        with self.condition:
+            if self.running:
+                return
+            self.running = True
+            self.worker_thread = threading.Thread(target=self._worker_loop, daemon=True)
+            self.worker_thread.start()
+    
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if self.worker_thread:
+            self.worker_thread.join(timeout=2.0)
+    
+    def submit(self, keys, duration, group=None, on_error=None, priority=PRIORITY_MOVEMENT):
+        """keys tuşlarını duration saniye basılı tut (bloklamaz)"""
+        if isinstance(keys, str):
+            keys = [keys]
+        if not self.running:
+            self.start()
+        with self.condition:
+            self.pending.append((list(keys), duration, group, on_error, time.perf_counter(), priority))
+            self.condition.notify()
+    
+    def _press(self, key_name, on_error=None):
+        if not is_supported_key(key_name):
+            return False
+        try:
+            self.controller.press(resolve_key(key_name))
+            return True
+        except Exception as e:
+            if on_error:
+                # Motorun callback'indeki hata worker thread'ini durdurmamalı
+                try:
+                    on_error(e)
+                except Exception as callback_error:
+                    print(f"Tuş hatası callback'i başarısız: {callback_error}")
+            else:
+                print(f"Tuş basma hatası: {e}")
+            return False
+    
+    def _release(self, key_name):
+        self.held.pop(key_name, None)
+        try:
+            self.controller.release(resolve_key(key_name))
+        except Exception as e:
+            print(f"Tuş bırakma hatası: {e}")
+    
+    def _drop(self, key_name):
+        """Tuşu basılıysa bırak, askıdaysa unut"""
+        if key_name in self.held:
+            self._release(key_name)
+        self.suspended.pop(key_name, None)
+    
+    def _schedule(self, key_name, deadline):
+        self.sequence += 1
+        heapq.heappush(self.releases, (deadline, self.sequence, key_name))
+    
+    def _top_priority(self):
+        return max((held[2] for held in self.held.values()), default=None)
+    
+    def _extend(self, key_name, deadline, group, priority):
+        """Basılı tuşun bırakma zamanını uzat (basılma anından en fazla max_hold)"""
+        held_deadline, _, held_priority, pressed_at = self.held[key_name]
+        key_deadline = min(max(deadline, held_deadline), pressed_at + self.max_hold)
+        self.held[key_name] = (key_deadline, group, max(priority, held_priority), pressed_at)
+        if key_deadline != held_deadline:
+            self._schedule(key_name, key_deadline)
+    
+    def _handle_request(self, keys, duration, group, on_error, now, priority=PRIORITY_MOVEMENT):
+        deadline = now + min(duration, self.max_hold)
+        
+        # Aynı gruptaki, yeni istekte olmayan tuşları bırak
+        if group is not None:
+            for key_name, state in list(self.held.items()) + list(self.suspended.items()):
+                if state[1] == group and key_name not in keys:
+                    self._drop(key_name)
+        
+        top = self._top_priority()
+        if top is not None and top > priority:
+            # Daha öncelikli tuş basılı: istek askıda bekler, o tuş bırakılınca basılır
+            for key_name in keys:
+                if key_name in self.held:
+                    _, held_group, held_priority, _ = self.held[key_name]
+                    self._extend(key_name, deadline, held_group, held_priority)
+                    continue
+                previous = self.suspended.get(key_name)
+                key_deadline = max(deadline, previous[0]) if previous else deadline
+                self.suspended[key_name] = (key_deadline, group, priority, on_error)
+                self._schedule(key_name, key_deadline)
+            return False
+        
+        # Düşük öncelikli basılı tuşları askıya al (ör. potion hareketin ortasında)
+        for key_name, (held_deadline, held_group, held_priority, _) in list(self.held.items()):
+            if held_priority < priority and key_name not in keys:
+                self._release(key_name)
+                self.suspended[key_name] = (held_deadline, held_group, held_priority, None)
+                self.preemptions += 1
+        
+        for key_name in keys:
+            self.suspended.pop(key_name, None)
+            if key_name in self.held:
+                # Zaten basılı: sadece bırakma zamanını uzat
+                self._extend(key_name, deadline, group, priority)
+            elif self._press(key_name, on_error):
+                self.held[key_name] = (deadline, group, priority, now)
+                self._schedule(key_name, deadline)
+        return True
+    
+    def _release_due(self, now):
+        released = expired = False
+        while self.releases and self.releases[0][0] <= now:
+            deadline, _, key_name = heapq.heappop(self.releases)
+            held = self.held.get(key_name)
+            # Süresi uzatılmış tuşların eski kayıtlarını atla
+            if held is not None and held[0] == deadline:
+                self._release(key_name)
+                released = True
+            suspended = self.suspended.get(key_name)
+            if suspended is not None and suspended[0] == deadline:
+                del self.suspended[key_name]
+                expired = True
+        if released:
+            self._resume(now)
+        if released or expired:
+            self._publish()
+    
+    def _resume(self, now):
+        """Öncelikli tuşlar bırakıldı: süresi dolmamış askıdaki tuşları yeniden bas"""
+        top = self._top_priority()
+        for key_name, (deadline, group, priority, on_error) in list(self.suspended.items()):
+            if top is not None and priority < top:
+                continue
+            del self.suspended[key_name]
+            if deadline > now and self._press(key_name, on_error):
+                key_deadline = min(deadline, now + self.max_hold)
+                self.held[key_name] = (key_deadline, group, priority, now)
+                if key_deadline != deadline:
+                    self._schedule(key_name, key_deadline)
+    
+    def _process_requests(self, requests, now):
+        """Bir grup isteği işle: aynı grubun eski istekleri atlanır, yüksek öncelik önce basılır"""
+        latest = {}
+        for index, request in enumerate(requests):
+            if request[2] is not None:
+                latest[request[2]] = index
+        selected = [request for index, request in enumerate(requests)
+                    if request[2] is None or latest[request[2]] == index]
+        self.coalesced += len(requests) - len(selected)
+        selected.sort(key=lambda request: -request[5])
+        
+        for keys, duration, group, on_error, submit_time, priority in selected:
+            pressed = self._handle_request(keys, duration, group, on_error, now, priority)
+            latency = time.perf_counter() - submit_time
+            self.metrics.record(PRIORITY_NAMES.get(priority, str(priority)), int(latency * 1e9))
+            if pressed:
+                self.press_latency = latency if self.press_latency == 0 else self.press_latency * 0.8 + latency * 0.2
+        self._publish()
+    
+    def _publish(self):
+        """Basılı/askıdaki tuş listelerinin kopyasını yayınla (get_stats başka thread'den okur)"""
+        held_keys = tuple(sorted(self.held))
+        suspended_keys = tuple(sorted(self.suspended))
+        with self.condition:
+            self.held_keys = held_keys
+            self.suspended_keys = suspended_keys
+    
+    def release_all(self):
+        """Basılı ve askıdaki tüm tuşları bırak (worker thread'inde veya durdurulurken)"""
+        for key_name in list(self.held):
+            self._release(key_name)
+        self.suspended.clear()
+        self.releases = []
+        self._publish()
+    
+    def _worker_loop(self):
+        try:
+            while True:
+                with self.condition:
+                    while self.running and not self.pending:
+                        now = time.perf_counter()
+                        if self.releases and self.releases[0][0] <= now:
+                            break
+                        timeout = self.releases[0][0] - now if self.releases else None
+                        self.condition.wait(timeout)
+                    if not self.running:
+                        break
+                    requests = list(self.pending)
+                    self.pending.clear()
+                
+                # Tuş işlemleri kilit dışında yapılır, submit() beklemez
+                self._process_requests(requests, time.perf_counter())
+                self._release_due(time.perf_counter())
+        finally:
+            # Durdurulurken (veya beklenmeyen hatada) basılı kalan tuşları bırak;
+            # thread hatayla çıktıysa sonraki submit() yenisini başlatır
+            self.release_all()
+            with self.condition:
+                # Bu arada başlatılmış yeni worker'ı durdurma
+                if self.worker_thread is threading.current_thread():
+                    self.running = False
+    
+    def get_stats(self):
+        with self.condition:
+            held_keys = self.held_keys
+            suspended_keys = self.suspended_keys
+        return {
+            'held': list(held_keys),
+            'suspended': list(suspended_keys),
+            'coalesced': self.coalesced,
+            'preemptions': self.preemptions,
+            'press_latency_ms': self.press_latency * 1000,
+            'queue_latency': self.metrics.snapshot()
+        }
@@ -0,0 +1,168 @@
+import json
+import asyncio
+import threading
+from frame_source import OffsetFrameSource, monitor_origin
+from capture_broker import CaptureBroker
+from async_runtime import AsyncRuntime, wait_for_task
+from config_store import ConfigStore
+from bot_engine import DiabloImmortalBotEngine
+from farming_engine import FarmingEngine
+
+def load_instance_profiles(path="instances.json"):
+    """Örnek profilleri: [{"name", "config", "monitor", "offset": {"x", "y"}, "farming"}]"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return data["instances"] if isinstance(data, dict) else data
+
+class EngineInstance:
+    """Tek oyun penceresi: kendi yapılandırma profili, bölge kayması ve motorları"""
+    
+    def __init__(self, name, bot_engine, farming_engine=None):
+        self.name = name
+        self.bot_engine = bot_engine
+        self.farming_engine = farming_engine
+        self.lock = threading.Lock()
+        self.hp = None
+        self.potion_count = 0
+        self.last_error = None
+    
+    def on_hp_update(self, hp_percentage, error=None):
+        with self.lock:
+            if error:
+                self.last_error = error
+            elif hp_percentage >= 0:
+                self.hp = hp_percentage
+                self.last_error = None
+    
+    def on_potion_used(self, count, key_or_error):
+        with self.lock:
+            if count == -1:
+                self.last_error = key_or_error
+            else:
+                self.potion_count = count
+    
+    def start(self):
+        self.bot_engine.start()
+        if self.farming_engine is not None:
+            self.farming_engine.start()
+    
+    def stop(self):
+        self.bot_engine.stop()
+        if self.farming_engine is not None:
+            self.farming_engine.stop()
+    
+    def get_status(self):
+        with self.lock:
+            status = {
+                'name': self.name,
+                'running': self.bot_engine.running,
+                'hp': self.hp,
+                'potion_count': self.potion_count,
+                'error': self.last_error,
+                'farming': None
+            }
+        if self.farming_engine is not None:
+            status['farming'] = {
+                'running': self.farming_engine.running,
+                'position': self.farming_engine.current_position
+            }
+        return status
+
+class InstanceHost:
+    """Tek süreçte birden çok oyun penceresinin motorlarını barındıran ana bilgisayar
+    
+    Tüm örnekler tek ekran nesnesini (CaptureBroker), tek olay döngüsünü ve executor'ı
+    (AsyncRuntime) ve tek tuş zamanlayıcısını paylaşır. Örnek sayısı arttıkça sadece
+    motor nesneleri çoğalır, thread sayısı, ekran tutamacı ve NumPy/Tk maliyeti sabit kalır.
+    Her örneğin bölgeleri kendi penceresine göredir; monitör kökeni ve offset yakalamada eklenir.
+    Tuş grupları örnek adıyla öneklenir, bir örneğin isteği diğerininkini bırakmaz. Ancak pynput
+    tuşları global gönderir (odaktaki pencereye), belirli bir oyun penceresini hedefleyemez:
+    aynı anda birden çok örnek çalışırsa tuşları aynı klavyede çakışır.
+    """
+    
+    def __init__(self, profiles, runtime=None, capture_broker=None, input_worker=None):
+        self.capture_broker = capture_broker if capture_broker is not None else CaptureBroker()
+        self.runtime = runtime if runtime is not None else AsyncRuntime()
+        self.input_worker = input_worker if input_worker is not None else self.runtime.input_worker
+        # Aynı profili kullanan örnekler tek yapılandırma deposunu paylaşır
+        self.config_stores = {}
+        self.instances = []
+        for profile in profiles:
+            self.instances.append(self._create_instance(profile))
+        
+        # Profil dosyaları örnek başına thread yerine olay döngüsündeki tek görevle izlenir
+        self.watching = True
+        self.watch_task = self.runtime.spawn(self._watch_configs())
+    
+    def _frame_source(self, name, profile):
+        offset = profile.get("offset", {})
+        x, y = offset.get("x", 0), offset.get("y", 0)
+        monitor = profile.get("monitor")
+        if monitor is not None:
+            monitor_x, monitor_y = monitor_origin(monitor)
+            x += monitor_x
+            y += monitor_y
+        return OffsetFrameSource(self.capture_broker.subscribe(name), x, y)
+    
+    def _create_instance(self, profile):
+        name = profile["name"]
+        config_path = profile.get("config", "config.json")
+        if config_path not in self.config_stores:
+            self.config_stores[config_path] = ConfigStore(config_path, watch=False)
+        instance = EngineInstance(name, None)
+        instance.bot_engine = DiabloImmortalBotEngine(
+            config_path=config_path,
+            on_hp_update=instance.on_hp_update,
+            on_potion_used=instance.on_potion_used,
+            frame_source=self._frame_source(f"{name}/hp", profile),
+            input_worker=self.input_worker,
+            runtime=self.runtime,
+            config_store=self.config_stores[config_path],
+            input_group=f"{name}/"
+        )
+        if profile.get("farming", False):
+            # Bölge ve daire ayarları örneğin kendi profilinde saklanır
+            instance.farming_engine = FarmingEngine(
+                frame_source=self._frame_source(f"{name}/farming", profile),
+                input_worker=self.input_worker,
+                runtime=self.runtime,
+                config_store=instance.bot_engine.config_store,
+                input_group=f"{name}/"
+            )
+        return instance
+    
+    async def _watch_configs(self, interval=1.0):
+        while self.watching:
+            for config_store in list(self.config_stores.values()):
+                await self.runtime.run_blocking(config_store.poll)
+            await asyncio.sleep(interval)
+    
+    def get(self, name):
+        for instance in self.instances:
+            if instance.name == name:
+                return instance
+        return None
+    
+    def start_all(self):
+        """Tüm örnekleri başlat -> kullanıcıya gösterilecek uyarı metni veya None"""
+        for instance in self.instances:
+            instance.start()
+        if len(self.instances) > 1:
+            return "Uyarı: tuşlar odaktaki pencereye gider; birden çok örnek aynı klavyeyi paylaşır"
+        return None
+    
+    def stop_all(self):
+        for instance in self.instances:
+            instance.stop()
+    
+    def get_status(self):
+        return [instance.get_status() for instance in self.instances]
+    
+    def close(self):
+        self.stop_all()
+        self.watching = False
+        wait_for_task(self.watch_task, timeout=2.0)
+        for config_store in self.config_stores.values():
+            config_store.close()
+        self.capture_broker.close()
+        self.runtime.stop()
@@ -0,0 +1,84 @@
+import json
+import bisect
+import threading
+
+# Kova sınırları (ns): 1 µs'den ~16 s'ye, her 2 katında 4 kova (~%19 çözünürlük)
+BUCKET_BOUNDS_NS = [int(1000 * 2 ** (i / 4)) for i in range(97)]
+
+class LatencyHistogram:
+    """Sabit log ölçekli kovalarda gecikme histogramı - kayıt O(log kova), bellek sabit"""
+    
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS_NS) + 1)
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+    
+    def record(self, duration_ns):
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS_NS, duration_ns)] += 1
+        self.count += 1
+        self.total_ns += duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+    
+    def percentile(self, p):
+        """p. yüzdelik (ns) - değerin düştüğü kovanın üst sınırı, en fazla gözlenen maksimum"""
+        if self.count == 0:
+            return 0
+        target = self.count * p / 100.0
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= target and bucket_count:
+                if i >= len(BUCKET_BOUNDS_NS):
+                    return self.max_ns
+                return min(BUCKET_BOUNDS_NS[i], self.max_ns)
+        return self.max_ns
+    
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'mean_ms': self.total_ns / self.count / 1e6 if self.count else 0.0,
+            'p50_ms': self.percentile(50) / 1e6,
+            'p95_ms': self.percentile(95) / 1e6,
+            'p99_ms': self.percentile(99) / 1e6,
+            'max_ms': self.max_ns / 1e6
+        }
+
+class StageMetrics:
+    """Döngü aşamaları (yakalama, analiz, callback, tuş...) için gecikme histogramları
+    
+    Aşama süreleri time.perf_counter_ns farkları olarak record() ile eklenir.
+    """
+    
+    def __init__(self, stages=()):
+        self.lock = threading.Lock()
+        self.histograms = {stage: LatencyHistogram() for stage in stages}
+    
+    def record(self, stage, duration_ns):
+        with self.lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = LatencyHistogram()
+            histogram.record(duration_ns)
+    
+    def reset(self):
+        with self.lock:
+            for stage in self.histograms:
+                self.histograms[stage] = LatencyHistogram()
+    
+    def snapshot(self):
+        with self.lock:
+            return {stage: histogram.snapshot() for stage, histogram in self.histograms.items()}
+    
+    def dump_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2, ensure_ascii=False)
+
+def format_stage_table(snapshot):
+    """Aşama istatistiklerini metin tablo olarak biçimlendir"""
+    lines = [f"{'Aşama':<14}{'Adet':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  (ms)"]
+    for stage, stats in snapshot.items():
+        lines.append(f"{stage:<14}{stats['count']:>8}{stats['p50_ms']:>9.3f}{stats['p95_ms']:>9.3f}"
+                     f"{stats['p99_ms']:>9.3f}{stats['max_ms']:>9.3f}")
+    return "\n".join(lines)
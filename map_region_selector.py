@@ -34,7 +34,8 @@ class MapRegionSelector:
         self.sct = mss.mss()
         monitor = self.sct.monitors[1]  # Primary monitor
         screenshot = self.sct.grab(monitor)
-        self.original_img = Image.frombytes("RGB", screenshot.size, screenshot.bgra, "raw", "BGRX")
+        # Ham tampon doğrudan çözülür (.bgra ara kopyası oluşturulmaz)
+        self.original_img = Image.frombuffer("RGB", screenshot.size, screenshot.raw, "raw", "BGRX", 0, 1)
         
         # Screen dimensions
         screen_width = self.root.winfo_screenwidth()
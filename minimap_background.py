@@ -0,0 +1,87 @@
+import numpy as np
+
+class MinimapBackground:
+    """Mini harita için çevrimiçi arka plan modeli (kanal toplamının üstel ortalaması)
+    
+    Sabit simgeler, yazılar ve parlak arazi zamanla modele karışır; beyaz aday piksellerden
+    modelden margin kadar farklı olmayanlar blob etiketlemeden önce elenir. Modelle bulunan
+    (ön plandaki) marker çevresi güncellemeye katılmaz, böylece duran karakter arka plana
+    karışmaz; ısınma sırasında her şey öğrenilir ki yanlış kilit (simge) korunmasın.
+    Model ve ara diziler mini harita boyutunda önceden ayrılmış float32 tamponlardadır.
+    alpha: kare başına öğrenme oranı, margin: kanal toplamı (0-765) farkı eşiği
+    """
+    
+    def __init__(self, alpha=0.05, margin=60, warmup_frames=20, exclude_radius=12, enabled=True):
+        self.alpha = alpha
+        self.margin = margin
+        self.warmup_frames = warmup_frames
+        self.exclude_radius = exclude_radius
+        self.enabled = enabled
+        self.model = None
+        self.difference = None
+        self.foreground_mask = None
+        self.reset()
+    
+    def reset(self):
+        self.frames = 0
+        self.candidates = 0
+        self.suppressed = 0
+    
+    @property
+    def ready(self):
+        return self.enabled and self.model is not None and self.frames >= self.warmup_frames
+    
+    def _allocate(self, shape):
+        if self.model is None or self.model.shape != shape:
+            self.model = np.empty(shape, dtype=np.float32)
+            self.difference = np.empty(shape, dtype=np.float32)
+            self.foreground_mask = np.empty(shape, dtype=bool)
+            self.frames = 0
+    
+    def update(self, channel_sum, exclude=None):
+        """Tüm karenin kanal toplamıyla modeli güncelle; exclude: {"x", "y"} marker pozisyonu"""
+        if not self.enabled:
+            return
+        self._allocate(channel_sum.shape)
+        excluded = (slice(0, 0), slice(0, 0))
+        if exclude is not None:
+            radius = self.exclude_radius
+            x, y = exclude["x"], exclude["y"]
+            excluded = (slice(max(0, y - radius), y + radius + 1), slice(max(0, x - radius), x + radius + 1))
+        if self.frames == 0:
+            np.copyto(self.model, channel_sum)
+        else:
+            np.subtract(channel_sum, self.model, out=self.difference)
+            self.difference *= self.alpha
+            self.difference[excluded] = 0
+            self.model += self.difference
+        self.frames += 1
+    
+    def foreground(self, channel_sum, x=0, y=0):
+        """Modelden belirgin farklı pikseller (kanal toplamı görünümü (x, y) kökenli olabilir)"""
+        height, width = channel_sum.shape
+        model = self.model[y:y + height, x:x + width]
+        difference = self.difference[:height, :width]
+        mask = self.foreground_mask[:height, :width]
+        np.subtract(channel_sum, model, out=difference)
+        np.abs(difference, out=difference)
+        np.greater(difference, self.margin, out=mask)
+        return mask
+    
+    def suppress(self, candidates, channel_sum, x=0, y=0):
+        """Aday maskesinden arka plan piksellerini yerinde ele -> kalan aday sayısı"""
+        before = int(np.count_nonzero(candidates))
+        np.logical_and(candidates, self.foreground(channel_sum, x, y), out=candidates)
+        after = int(np.count_nonzero(candidates))
+        self.candidates += before
+        self.suppressed += before - after
+        return after
+    
+    def get_stats(self):
+        return {
+            'enabled': self.enabled,
+            'ready': self.ready,
+            'frames': self.frames,
+            'suppressed_ratio': self.suppressed / self.candidates if self.candidates else 0.0,
+            'suppressed_pixels': self.suppressed
+        }
@@ -0,0 +1,77 @@
+import customtkinter as ctk
+from instance_host import InstanceHost, load_instance_profiles
+
+class MultiInstanceGUI:
+    """Çoklu örnek modu için kompakt durum penceresi (örnek başına tek satır)"""
+    
+    def __init__(self, profiles_path="instances.json"):
+        self.host = InstanceHost(load_instance_profiles(profiles_path))
+        
+        self.root = ctk.CTk()
+        self.root.title(f"Diablo Immortal HP Bot - {len(self.host.instances)} örnek")
+        self.root.geometry("720x120")
+        
+        header = ctk.CTkFrame(self.root)
+        header.pack(fill="x", padx=10, pady=(10, 5))
+        ctk.CTkButton(header, text="Tümünü Başlat", command=self.start_all, width=130).pack(side="left", padx=5, pady=5)
+        ctk.CTkButton(header, text="Tümünü Durdur", command=self.host.stop_all, width=130).pack(side="left", padx=5, pady=5)
+        self.status_label = ctk.CTkLabel(header, text="", text_color="orange")
+        self.status_label.pack(side="left", padx=10, pady=5)
+        
+        self.rows = {}
+        table = ctk.CTkScrollableFrame(self.root)
+        table.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        for column, title in enumerate(("Örnek", "Durum", "Can", "Potion", "Farming", "")):
+            ctk.CTkLabel(table, text=title, font=ctk.CTkFont(weight="bold")).grid(row=0, column=column, padx=8, sticky="w")
+        for row, instance in enumerate(self.host.instances, start=1):
+            ctk.CTkLabel(table, text=instance.name).grid(row=row, column=0, padx=8, sticky="w")
+            labels = [ctk.CTkLabel(table, text="-") for _ in range(4)]
+            for column, label in enumerate(labels, start=1):
+                label.grid(row=row, column=column, padx=8, sticky="w")
+            button = ctk.CTkButton(table, text="Başlat", width=80,
+                                   command=lambda name=instance.name: self.toggle_instance(name))
+            button.grid(row=row, column=5, padx=8, pady=2)
+            self.rows[instance.name] = (labels, button)
+        
+        self.root.geometry(f"720x{min(120 + 36 * len(self.host.instances), 700)}")
+        self.update_loop()
+    
+    def start_all(self):
+        warning = self.host.start_all()
+        self.status_label.configure(text=warning or "")
+    
+    def toggle_instance(self, name):
+        instance = self.host.get(name)
+        if instance.bot_engine.running:
+            instance.stop()
+        else:
+            instance.start()
+    
+    def update_loop(self):
+        for status in self.host.get_status():
+            (state_label, hp_label, potion_label, farming_label), button = self.rows[status['name']]
+            if status['error']:
+                state_label.configure(text="Hata", text_color="orange")
+            elif status['running']:
+                state_label.configure(text="Çalışıyor", text_color="green")
+            else:
+                state_label.configure(text="Durduruldu", text_color="gray")
+            hp_label.configure(text=f"{status['hp']:.1f}%" if status['hp'] is not None else "-")
+            potion_label.configure(text=str(status['potion_count']))
+            farming = status['farming']
+            if farming is None:
+                farming_label.configure(text="-")
+            else:
+                position = farming['position']
+                text = f"({position['x']}, {position['y']})" if position else "pozisyon yok"
+                farming_label.configure(text=text if farming['running'] else "kapalı")
+            button.configure(text="Durdur" if status['running'] else "Başlat")
+        self.root.after(500, self.update_loop)
+    
+    def run(self):
+        self.root.mainloop()
+        self.host.close()
+
+if __name__ == "__main__":
+    app = MultiInstanceGUI()
+    app.run()
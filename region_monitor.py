@@ -0,0 +1,159 @@
+import time
+import threading
+import numpy as np
+from capture_broker import merge_regions, region_contains
+from color_lut import build_color_lut
+
+class RegionMonitor:
+    """Can barı dışındaki adlandırılmış bölgeler (mana küresi, kalkan, yoldaş canı) ve kural tablosu
+    
+    Bölgeler can barıyla aynı tick'te yakalanır: birbirine yakın bölgeler CaptureBroker ile aynı
+    merge_ratio testiyle tek dikdörtgende, uzak bölgeler (ör. ekranın iki ucu) ayrı yakalanır.
+    Aynı boyut ve renk ayarına sahip bölgeler tek yığında, tek vektörel çağrıyla analiz edilir.
+    Bölge: {"name", "region", "estimator": "bar" (soldan dolar) | "orb" (alttan dolar),
+            "color_mode": "edge" | "lut", "colors": hp_colors biçiminde aralıklar}
+    Kural: {"region", "condition": "below" | "above", "threshold", "key", "cooldown_ms",
+            "duration_ms", "priority"}; aynı tick'te birden çok kural tetiklenirse yüksek
+            öncelikli önce basılır, aynı tuşu paylaşan kurallardan sadece ilki basılır.
+    analyze_batch: (N×H×W×C kareler, color_mode, lut) -> N doluluk yüzdesi
+    """
+    
+    def __init__(self, analyze_batch, merge_ratio=4.0):
+        self.analyze_batch = analyze_batch
+        self.merge_ratio = merge_ratio
+        self.lock = threading.Lock()
+        self.regions = []
+        self.rules = []
+        self.luts = {}  # renk aralıkları (json anahtarı) -> tablo
+        
+        # Son okumalar ve kural istatistikleri
+        self.readings = {}
+        self.last_fire = {}  # kural adı -> son tetiklenme (time.perf_counter)
+        self.fire_counts = {}
+    
+    @property
+    def enabled(self):
+        return bool(self.regions)
+    
+    def configure(self, regions, rules):
+        """Bölge ve kural tablosunu uygula (tetiklenme geçmişi aynı adlı kurallar için korunur)"""
+        prepared = []
+        luts = {}
+        for region in regions:
+            color_mode = region.get("color_mode", "edge")
+            lut = None
+            if color_mode == "lut" and region.get("colors"):
+                key = repr(sorted(region["colors"].items()))
+                lut = self.luts.get(key) or build_color_lut(region["colors"])
+                luts[key] = lut
+            else:
+                color_mode = "edge"
+            prepared.append({
+                "name": region["name"],
+                "region": dict(region["region"]),
+                "estimator": region.get("estimator", "bar"),
+                "color_mode": color_mode,
+                "lut": lut
+            })
+        
+        prepared_rules = []
+        for index, rule in enumerate(rules):
+            prepared_rules.append({
+                "name": rule.get("name", f"{rule['region']}:{rule['key']}"),
+                "region": rule["region"],
+                "below": rule.get("condition", "below") == "below",
+                "threshold": rule["threshold"],
+                "key": rule["key"],
+                "cooldown": rule.get("cooldown_ms", 1000) / 1000.0,
+                "duration": rule.get("duration_ms", 60) / 1000.0,
+                "priority": rule.get("priority", 0),
+                "order": index
+            })
+        # Yüksek öncelik önce, eşitlikte tablodaki sıra
+        prepared_rules.sort(key=lambda rule: (-rule["priority"], rule["order"]))
+        
+        with self.lock:
+            self.regions = prepared
+            self.rules = prepared_rules
+            self.luts = luts
+            names = {region["name"] for region in prepared}
+            self.readings = {name: value for name, value in self.readings.items() if name in names}
+    
+    def capture_groups(self, base_region):
+        """Can barı ve tüm bölgeler için yakalama dikdörtgenleri (yakın olanlar birleşik)"""
+        with self.lock:
+            regions = [region["region"] for region in self.regions]
+        return merge_regions([base_region] + regions, self.merge_ratio)
+    
+    @staticmethod
+    def crop(frame, origin, region):
+        """Birleşik karedeki bölgenin kopyasız görünümü"""
+        x = region["x"] - origin["x"]
+        y = region["y"] - origin["y"]
+        return frame[y:y + region["height"], x:x + region["width"]]
+    
+    @staticmethod
+    def find_view(frames, region):
+        """[(yakalama dikdörtgeni, kare)] içinden bölgeyi kapsayan karenin görünümü"""
+        for origin, frame in frames:
+            if region_contains(origin, region):
+                return RegionMonitor.crop(frame, origin, region)
+        return None
+    
+    def analyze(self, frames):
+        """Yakalanan karelerden [(dikdörtgen, kare)] tüm bölgelerin okumaları -> ad -> yüzde"""
+        with self.lock:
+            regions = list(self.regions)
+        
+        # Aynı boyut ve renk ayarındaki bölgeler tek yığın
+        groups = {}
+        for region in regions:
+            view = self.find_view(frames, region["region"])
+            if region["estimator"] == "orb":
+                # Alttan dolan küre: saat yönünde döndürülünce alt kenar sola gelir
+                view = np.rot90(view, -1)
+            key = (view.shape, region["color_mode"], id(region["lut"]))
+            groups.setdefault(key, (region["color_mode"], region["lut"], [], []))
+            groups[key][2].append(region["name"])
+            groups[key][3].append(view)
+        
+        readings = {}
+        for color_mode, lut, names, views in groups.values():
+            values = self.analyze_batch(np.stack(views), color_mode, lut)
+            for name, value in zip(names, values):
+                readings[name] = float(value)
+        
+        with self.lock:
+            self.readings.update(readings)
+        return readings
+    
+    def due_rules(self, readings, now=None):
+        """Koşulu sağlanan ve bekleme süresi dolan kurallar (öncelik sırasıyla); tetiklenmiş sayılır"""
+        now = time.perf_counter() if now is None else now
+        fired = []
+        keys = set()
+        with self.lock:
+            for rule in self.rules:
+                value = readings.get(rule["region"])
+                if value is None or rule["key"] in keys:
+                    continue
+                if rule["below"] and value > rule["threshold"]:
+                    continue
+                if not rule["below"] and value < rule["threshold"]:
+                    continue
+                last_fire = self.last_fire.get(rule["name"])
+                if last_fire is not None and now - last_fire < rule["cooldown"]:
+                    continue
+                self.last_fire[rule["name"]] = now
+                self.fire_counts[rule["name"]] = self.fire_counts.get(rule["name"], 0) + 1
+                keys.add(rule["key"])
+                fired.append(rule)
+        return fired
+    
+    def get_stats(self):
+        with self.lock:
+            return {
+                'regions': [region["name"] for region in self.regions],
+                'readings': dict(self.readings),
+                'rule_fires': dict(self.fire_counts)
+            }
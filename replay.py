@@ -0,0 +1,255 @@
+"""Kaydedilmiş oturumları ekran ve klavye olmadan analiz algoritmalarından geçiren regresyon aracı
+
+Kullanım:
+    python replay.py run oturum.dses --save temel.npz          # okumaları kaydet
+    python replay.py run oturum.dses --baseline temel.npz      # temel sonuçlarla karşılaştır
+    python replay.py run --hp kayit/hp --minimap kayit/minimap --csv okumalar.csv
+    python replay.py diff eski.npz yeni.npz                     # iki sürümün sonuçları
+    python replay.py diff config.json deneme.json oturum.dses   # iki yapılandırma aynı kayıtta
+
+Can barı kareleri DiabloImmortalBotEngine.calculate_hp_percentage, mini harita kareleri
+FarmingEngine.detect_character_marker ile analiz edilir. Temel sonuçlarla uyuşmazlık
+varsa çıkış kodu 1'dir.
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+import numpy as np
+from analysis_process import create_headless_engine
+from frame_source import ReplayFrameSource
+from session_recorder import SessionReader
+
+STREAMS = ("hp", "minimap")
+
+def iter_frames(stream, session=None, frames_path=None, start=None, end=None, limit=None):
+    """(zaman, kare) çiftleri: oturum kaydından veya kare klasörü/.npy dosyasından"""
+    count = 0
+    if session is not None:
+        for timestamp, frame, _ in session.iter_records(stream, start, end):
+            if limit is not None and count >= limit:
+                return
+            count += 1
+            yield timestamp, frame
+    elif frames_path is not None:
+        for index, frame in enumerate(ReplayFrameSource._load_frames(frames_path)):
+            if limit is not None and count >= limit:
+                return
+            count += 1
+            yield float(index), np.asarray(frame)
+
+def replay_stream(stream, frames, config_path="config.json"):
+    """Kareleri yeni (durumsuz başlayan) motordan geçir -> zamanlar, okumalar, gecikmeler (ms)"""
+    if stream == "hp":
+        engine = create_headless_engine('hp', config_path)
+        analyze = engine.calculate_hp_percentage
+    else:
+        engine = create_headless_engine('minimap', config_path)
+        analyze = engine.detect_character_marker
+    
+    timestamps, values, latencies = [], [], []
+    for timestamp, frame in frames:
+        start = time.perf_counter_ns()
+        result = analyze(frame)
+        latencies.append((time.perf_counter_ns() - start) / 1e6)
+        timestamps.append(timestamp)
+        if stream == "hp":
+            values.append(result)
+        else:
+            values.append((result["x"], result["y"]) if result else (np.nan, np.nan))
+    
+    if stream == "hp":
+        engine.config_store.close()
+        values = np.array(values, dtype=np.float64)
+    else:
+        values = np.array(values, dtype=np.float64).reshape(-1, 2)
+    return {
+        'timestamps': np.array(timestamps, dtype=np.float64),
+        'values': values,
+        'latency_ms': np.array(latencies, dtype=np.float64)
+    }
+
+def run_replay(session_path=None, hp_path=None, minimap_path=None, config_path="config.json",
+               start=None, end=None, limit=None):
+    """Tüm akışları oynat -> akış adı -> sonuç sözlüğü"""
+    session = SessionReader(session_path) if session_path else None
+    paths = {"hp": hp_path, "minimap": minimap_path}
+    results = {}
+    try:
+        for stream in STREAMS:
+            if session is None and paths[stream] is None:
+                continue
+            if session is not None and stream not in session.streams:
+                continue
+            frames = iter_frames(stream, session, paths[stream], start, end, limit)
+            results[stream] = replay_stream(stream, frames, config_path)
+    finally:
+        if session is not None:
+            session.close()
+    return results
+
+def save_results(path, results, metadata=None):
+    arrays = {}
+    for stream, result in results.items():
+        for key, value in result.items():
+            arrays[f"{stream}_{key}"] = value
+    arrays['metadata'] = np.array(json.dumps(metadata or {}))
+    np.savez_compressed(path, **arrays)
+
+def load_results(path):
+    with np.load(path) as data:
+        results = {}
+        for stream in STREAMS:
+            if f"{stream}_values" in data.files:
+                results[stream] = {key: data[f"{stream}_{key}"] for key in ('timestamps', 'values', 'latency_ms')}
+        return results
+
+def write_csv(path, results):
+    """Kare başına okumalar: akış, sıra, zaman, değer(ler), gecikme"""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(["stream", "index", "timestamp", "value", "x", "y", "latency_ms"])
+        for stream, result in results.items():
+            for i, (timestamp, value, latency) in enumerate(zip(result['timestamps'], result['values'],
+                                                                 result['latency_ms'])):
+                if stream == "hp":
+                    writer.writerow([stream, i, f"{timestamp:.6f}", f"{value:.3f}", "", "", f"{latency:.4f}"])
+                else:
+                    writer.writerow([stream, i, f"{timestamp:.6f}", "", value[0], value[1], f"{latency:.4f}"])
+
+def summarize_timing(result):
+    latencies = result['latency_ms']
+    if len(latencies) == 0:
+        return {'frames': 0, 'fps': 0.0, 'p50_ms': 0.0, 'p95_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0}
+    return {
+        'frames': len(latencies),
+        'fps': len(latencies) / (latencies.sum() / 1000) if latencies.sum() else 0.0,
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'max_ms': float(latencies.max())
+    }
+
+def compare_stream(stream, reference, current, tolerance):
+    """İki sonucun kare kare uyuşması (hp: puan farkı, minimap: piksel uzaklığı)"""
+    count = min(len(reference['values']), len(current['values']))
+    if count != len(reference['values']) or count != len(current['values']):
+        print(f"  Uyarı: {stream} kare sayıları farklı ({len(reference['values'])} / {len(current['values'])}),"
+              f" ilk {count} kare karşılaştırılıyor")
+    a = reference['values'][:count]
+    b = current['values'][:count]
+    if stream == "hp":
+        error = np.abs(a - b)
+    else:
+        error = np.hypot(a[:, 0] - b[:, 0], a[:, 1] - b[:, 1])
+        # İkisi de bulamadıysa uyuşur, sadece biri bulduysa uyuşmaz
+        both_missing = np.isnan(a[:, 0]) & np.isnan(b[:, 0])
+        error = np.where(both_missing, 0.0, np.where(np.isnan(error), np.inf, error))
+    mismatches = np.flatnonzero(error > tolerance)
+    return {
+        'frames': count,
+        'agreement': 1.0 - len(mismatches) / count if count else 1.0,
+        'max_error': float(error.max()) if count else 0.0,
+        'mean_error': float(error[np.isfinite(error)].mean()) if np.any(np.isfinite(error)) else 0.0,
+        'mismatches': mismatches,
+        'error': error
+    }
+
+def format_value(stream, value):
+    if stream == "hp":
+        return f"{value:.2f}"
+    return "yok" if np.isnan(value[0]) else f"({value[0]:.0f}, {value[1]:.0f})"
+
+def print_timing(name, timing):
+    print(f"  {name}: {timing['frames']} kare, {timing['fps']:.1f} kare/s, p50 {timing['p50_ms']:.3f} ms, "
+          f"p95 {timing['p95_ms']:.3f} ms, p99 {timing['p99_ms']:.3f} ms, max {timing['max_ms']:.3f} ms")
+
+def report_comparison(reference, current, tolerances, names=("temel", "şimdiki"), show=5):
+    """Akış başına uyuşma ve hız karşılaştırmasını yazdır -> tüm kareler uyuşuyorsa True"""
+    passed = True
+    for stream in STREAMS:
+        if stream not in reference or stream not in current:
+            continue
+        comparison = compare_stream(stream, reference[stream], current[stream], tolerances[stream])
+        unit = "puan" if stream == "hp" else "piksel"
+        print(f"{stream}: uyuşma %{comparison['agreement'] * 100:.2f} (tolerans {tolerances[stream]:g} {unit}), "
+              f"en büyük fark {comparison['max_error']:.3f}, ortalama {comparison['mean_error']:.3f}")
+        reference_timing = summarize_timing(reference[stream])
+        current_timing = summarize_timing(current[stream])
+        print_timing(names[0], reference_timing)
+        print_timing(names[1], current_timing)
+        if reference_timing['fps'] and current_timing['fps']:
+            print(f"  hız oranı: {current_timing['fps'] / reference_timing['fps']:.2f}x, "
+                  f"p99 {reference_timing['p99_ms']:.3f} -> {current_timing['p99_ms']:.3f} ms")
+        for index in comparison['mismatches'][:show]:
+            timestamp = current[stream]['timestamps'][index]
+            print(f"    kare {index} (t={timestamp:.3f}): {names[0]} "
+                  f"{format_value(stream, reference[stream]['values'][index])}, {names[1]} "
+                  f"{format_value(stream, current[stream]['values'][index])}")
+        if len(comparison['mismatches']):
+            passed = False
+    return passed
+
+def add_source_arguments(parser):
+    parser.add_argument("--hp", help="Can barı kareleri (klasör veya .npy); oturum kaydı yerine")
+    parser.add_argument("--minimap", help="Mini harita kareleri (klasör veya .npy); oturum kaydı yerine")
+    parser.add_argument("--start", type=float, help="Oturumda başlangıç zamanı (kayıt saati, sn)")
+    parser.add_argument("--end", type=float, help="Oturumda bitiş zamanı (kayıt saati, sn)")
+    parser.add_argument("--limit", type=int, help="Akış başına en fazla kare")
+    parser.add_argument("--hp-tolerance", type=float, default=0.5, help="Can okumasında izin verilen fark (puan)")
+    parser.add_argument("--position-tolerance", type=float, default=0.0,
+                        help="Marker pozisyonunda izin verilen fark (piksel)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kayıttan oynatma regresyon aracı")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    run_parser = commands.add_parser("run", help="Kaydı oynat, okumaları ve hızı raporla")
+    run_parser.add_argument("session", nargs="?", help="Oturum kaydı (.dses)")
+    run_parser.add_argument("--config", default="config.json", help="Bot yapılandırma dosyası")
+    run_parser.add_argument("--baseline", help="Karşılaştırılacak temel sonuçlar (.npz)")
+    run_parser.add_argument("--save", help="Sonuçları temel olarak kaydet (.npz)")
+    run_parser.add_argument("--csv", help="Kare başına okumaları CSV olarak yaz")
+    add_source_arguments(run_parser)
+    
+    diff_parser = commands.add_parser("diff", help="İki sürümü karşılaştır (.npz sonuçlar veya .json yapılandırmalar)")
+    diff_parser.add_argument("a", help="Eski sürüm: sonuç dosyası (.npz) veya yapılandırma (.json)")
+    diff_parser.add_argument("b", help="Yeni sürüm: sonuç dosyası (.npz) veya yapılandırma (.json)")
+    diff_parser.add_argument("session", nargs="?", help="Yapılandırmalar karşılaştırılırken oturum kaydı (.dses)")
+    add_source_arguments(diff_parser)
+    
+    args = parser.parse_args(argv)
+    tolerances = {"hp": args.hp_tolerance, "minimap": args.position_tolerance}
+    source = dict(session_path=args.session, hp_path=args.hp, minimap_path=args.minimap,
+                  start=args.start, end=args.end, limit=args.limit)
+    
+    if args.command == "run":
+        if not (args.session or args.hp or args.minimap):
+            parser.error("oturum kaydı veya --hp/--minimap gerekli")
+        results = run_replay(config_path=args.config, **source)
+        for stream, result in results.items():
+            print(f"{stream}:")
+            print_timing("süre", summarize_timing(result))
+        if args.csv:
+            write_csv(args.csv, results)
+            print(f"Okumalar yazıldı: {args.csv}")
+        if args.save:
+            save_results(args.save, results, {'config': args.config, 'session': args.session})
+            print(f"Sonuçlar kaydedildi: {args.save}")
+        if args.baseline:
+            return 0 if report_comparison(load_results(args.baseline), results, tolerances) else 1
+        return 0
+    
+    versions = []
+    for path in (args.a, args.b):
+        if path.endswith(".npz"):
+            versions.append(load_results(path))
+        else:
+            if not (args.session or args.hp or args.minimap):
+                parser.error("yapılandırma karşılaştırması için oturum kaydı veya --hp/--minimap gerekli")
+            versions.append(run_replay(config_path=path, **source))
+    return 0 if report_comparison(versions[0], versions[1], tolerances, names=(args.a, args.b)) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
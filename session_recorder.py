@@ -0,0 +1,376 @@
+import json
+import mmap
+import time
+import zlib
+import queue
+import struct
+import bisect
+import threading
+import numpy as np
+from frame_source import to_rgb
+
+# Dosya düzeni:
+#   başlık (HEADER_SIZE bayt): sabit alanlar + JSON meta veri (akışlar, sıkıştırma, saat farkı)
+#   parçalar: parça başlığı + kayıt tablosu + kare yuvaları (ham veya sıkıştırılmış)
+#   dizin (kapatılınca): parça başına (konum, akış, kayıt sayısı, ilk/son zaman)
+# Kapatılmamış (ör. çöken) kayıtlarda dizin yoktur; okuyucu parça başlıklarını tarar.
+MAGIC = b"DISESS01"
+VERSION = 1
+HEADER_SIZE = 4096
+_HEADER = struct.Struct("<8sIIQQdI")  # magic, sürüm, parça sayısı, dizin konumu, veri sonu, saat farkı, meta uzunluğu
+_CHUNK = struct.Struct("<4sHHIII")  # magic, akış, sıkıştırma, kayıt sayısı, yuva boyutu, yük boyutu
+CHUNK_MAGIC = b"CHNK"
+COMPRESSION = {"none": 0, "zlib": 1, "delta": 2}
+_INDEX_DTYPE = np.dtype([("offset", "<u8"), ("stream", "<u2"), ("count", "<u4"),
+                         ("first", "<f8"), ("last", "<f8")])
+
+def _record_dtype(reading_count):
+    """Parçadaki kayıt tablosunun satır tipi (shape[2] == 0: kare değil bayt dizisi)"""
+    return np.dtype([("timestamp", "<f8"), ("shape", "<u2", (3,)), ("nbytes", "<u4"),
+                     ("readings", "<f8", (reading_count,))])
+
+class _ChunkBuilder:
+    """Tek akışın doldurulmakta olan parçası: sabit boyutlu yuvalar ve kayıt tablosu"""
+    
+    def __init__(self, stream_id, reading_count, chunk_frames, slot_bytes):
+        self.stream_id = stream_id
+        self.slot_bytes = slot_bytes
+        # Sıfırlı ayrılır: yuvadan kısa karelerin dolgu baytları dosyaya belirli (sıfır) yazılır
+        self.slots = np.zeros((chunk_frames, slot_bytes), dtype=np.uint8)
+        self.table = np.zeros(chunk_frames, dtype=_record_dtype(reading_count))
+        self.count = 0
+    
+    @property
+    def full(self):
+        return self.count == len(self.table)
+
+class SessionRecorder:
+    """Oturum kaydı: motor döngülerindeki kareleri, okumaları ve tuş olaylarını bellek
+    eşlemeli (mmap) parçalı dosyaya ekler
+    
+    record() sadece kareyi parçanın önceden ayrılmış yuvasına kopyalar; dolan parça
+    arka plandaki yazıcı thread'inde sıkıştırılıp dosyaya yazılır. Yazıcı geride
+    kalırsa motor döngüsü beklemez, parça atlanır (dropped_frames).
+    streams: akış adı -> kayıt başına okuma adları (ör. {"hp": ("hp",)})
+    compression: "none" (yuvalar mmap'ten kopyasız okunur), "zlib" veya "delta"
+                 (parçadaki ardışık kareler arası fark + zlib; durağan kareler için)
+    """
+    
+    DEFAULT_STREAMS = {"hp": ("hp",), "minimap": ("x", "y"), "keys": ("duration",)}
+    
+    def __init__(self, path, streams=None, chunk_frames=64, compression="zlib", compression_level=1,
+                 grow_bytes=64 << 20, max_pending_chunks=8):
+        if compression not in COMPRESSION:
+            raise ValueError(f"Bilinmeyen sıkıştırma: {compression}")
+        self.path = path
+        self.streams = {name: tuple(fields) for name, fields in (streams or self.DEFAULT_STREAMS).items()}
+        self.stream_ids = {name: i for i, name in enumerate(self.streams)}
+        self.chunk_frames = chunk_frames
+        self.compression = compression
+        self.compression_level = compression_level
+        self.grow_bytes = grow_bytes
+        self.wall_offset = time.time() - time.perf_counter()
+        
+        # Akış başına doldurulan parça ve kilidi (akışlar birbirini beklemez)
+        self.builders = {name: None for name in self.streams}
+        self.locks = {name: threading.Lock() for name in self.streams}
+        
+        # Sadece yazıcı thread'i erişir
+        self.file = open(path, 'w+b')
+        self.file.truncate(HEADER_SIZE + grow_bytes)
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        self.data_end = HEADER_SIZE
+        self.index = []
+        self._write_header(index_offset=0)
+        
+        self.chunks = queue.Queue(maxsize=max_pending_chunks)
+        self.writer_thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self.writer_thread.start()
+        self.closed = False
+        
+        # İstatistikler
+        self.recorded_frames = 0
+        self.dropped_frames = 0
+        self.raw_bytes = 0
+        self.written_bytes = 0
+    
+    def record(self, stream, data, timestamp, *readings):
+        """Kareyi (veya bayt dizisi/metni) zaman damgası ve okumalarıyla akışa ekle (bloklamaz)"""
+        if data is None or self.closed:
+            return
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        if isinstance(data, (bytes, bytearray)):
+            payload = np.frombuffer(data, dtype=np.uint8)
+            shape = (1, len(data), 0)
+        else:
+            payload = to_rgb(data)
+            shape = payload.shape if payload.ndim == 3 else payload.shape[:2] + (1,)
+        nbytes = payload.size
+        
+        fields = self.streams[stream]
+        with self.locks[stream]:
+            builder = self.builders[stream]
+            if builder is None or nbytes > builder.slot_bytes:
+                # Kare büyüdü (ör. bölge değişti): mevcut parçayı bitir, daha büyük yuvalarla devam et
+                if builder is not None and builder.count:
+                    self._submit(builder)
+                builder = _ChunkBuilder(self.stream_ids[stream], len(fields), self.chunk_frames,
+                                        max(nbytes, builder.slot_bytes if builder else 0))
+                self.builders[stream] = builder
+            
+            row = builder.count
+            # Kanal sırası görünümünden (BGRA -> RGB) doğrudan yuvaya kopyala
+            np.copyto(builder.slots[row, :nbytes].reshape(payload.shape), payload)
+            values = [readings[i] if i < len(readings) else None for i in range(len(fields))]
+            builder.table[row] = (timestamp, shape, nbytes, [np.nan if v is None else v for v in values])
+            builder.count += 1
+            self.recorded_frames += 1
+            self.raw_bytes += nbytes
+            
+            if builder.full:
+                self._submit(builder)
+                self.builders[stream] = _ChunkBuilder(builder.stream_id, len(fields), self.chunk_frames,
+                                                      builder.slot_bytes)
+    
+    def _submit(self, builder, block=False):
+        try:
+            self.chunks.put(builder, block=block)
+        except queue.Full:
+            self.dropped_frames += builder.count
+    
+    def flush(self, block=False):
+        """Yarım parçaları yazıcıya gönder"""
+        for stream in self.streams:
+            with self.locks[stream]:
+                builder = self.builders[stream]
+                if builder is not None and builder.count:
+                    self._submit(builder, block)
+                self.builders[stream] = None
+    
+    def close(self):
+        """Kalan parçaları yaz, dizini ekle ve dosyayı gerçek boyutuna kısalt"""
+        if self.closed:
+            return
+        self.closed = True
+        self.flush(block=True)
+        self.chunks.put(None)
+        self.writer_thread.join()
+        
+        index = np.array(self.index, dtype=_INDEX_DTYPE)
+        index_offset = self.data_end
+        self._write_bytes(index.tobytes())
+        self._write_header(index_offset)
+        self.map.flush()
+        self.map.close()
+        self.file.truncate(self.data_end)
+        self.file.close()
+    
+    def _metadata(self):
+        return json.dumps({
+            "streams": [{"name": name, "readings": list(fields)} for name, fields in self.streams.items()],
+            "compression": self.compression
+        }).encode('utf-8')
+    
+    def _write_header(self, index_offset):
+        metadata = self._metadata()
+        header = _HEADER.pack(MAGIC, VERSION, len(self.index), index_offset, self.data_end,
+                              self.wall_offset, len(metadata))
+        if len(header) + len(metadata) > HEADER_SIZE:
+            raise ValueError("Oturum meta verisi başlığa sığmıyor")
+        self.map[:len(header) + len(metadata)] = header + metadata
+    
+    def _write_bytes(self, data):
+        end = self.data_end + len(data)
+        if end > len(self.map):
+            # Dosyayı büyüt ve yeniden eşle (Windows'ta eşlenmiş dosya kısaltılamaz/büyütülemez)
+            size = max(end, len(self.map) + self.grow_bytes)
+            self.map.close()
+            self.file.truncate(size)
+            self.map = mmap.mmap(self.file.fileno(), 0)
+        self.map[self.data_end:end] = data
+        self.data_end = end
+    
+    def _encode(self, builder):
+        used = builder.slots[:builder.count]
+        if self.compression == "none":
+            return used.tobytes()
+        if self.compression == "delta":
+            # uint8 taşması kasıtlı: okuyucu mod 256 kümülatif toplamla geri alır
+            delta = used.copy()
+            delta[1:] -= used[:-1]
+            used = delta
+        return zlib.compress(used, self.compression_level)
+    
+    def _writer_loop(self):
+        while True:
+            builder = self.chunks.get()
+            if builder is None:
+                break
+            try:
+                payload = self._encode(builder)
+                table = builder.table[:builder.count]
+                offset = self.data_end
+                header = _CHUNK.pack(CHUNK_MAGIC, builder.stream_id, COMPRESSION[self.compression],
+                                     builder.count, builder.slot_bytes, len(payload))
+                self._write_bytes(header + table.tobytes() + payload)
+                self.index.append((offset, builder.stream_id, builder.count,
+                                   table["timestamp"][0], table["timestamp"][-1]))
+                # Çökmede dosya taranarak okunabilsin diye veri sonu başlıkta güncel tutulur
+                self._write_header(index_offset=0)
+                self.written_bytes += self.data_end - offset
+            except Exception as e:
+                print(f"Oturum kaydı yazma hatası: {e}")
+                self.dropped_frames += builder.count
+    
+    def get_stats(self):
+        return {
+            'path': self.path,
+            'frames': self.recorded_frames,
+            'dropped_frames': self.dropped_frames,
+            'chunks': len(self.index),
+            'raw_bytes': self.raw_bytes,
+            'written_bytes': self.written_bytes,
+            'compression_ratio': self.raw_bytes / self.written_bytes if self.written_bytes else 0.0
+        }
+
+class SessionReader:
+    """SessionRecorder dosyasını okur: zaman damgasıyla rastgele erişim ve aralık taraması
+    
+    Sıkıştırılmamış parçalardaki kareler mmap üzerinde kopyasız (salt okunur) görünümdür;
+    sıkıştırılmış parçalar açıldıktan sonra küçük bir önbellekte tutulur.
+    """
+    
+    def __init__(self, path, cache_chunks=4):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, chunk_count, index_offset, data_end, wall_offset, metadata_length = \
+            _HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Oturum kaydı değil: {path}")
+        if version != VERSION:
+            raise ValueError(f"Desteklenmeyen oturum kaydı sürümü: {version}")
+        metadata = json.loads(bytes(self.map[_HEADER.size:_HEADER.size + metadata_length]))
+        self.streams = {stream["name"]: tuple(stream["readings"]) for stream in metadata["streams"]}
+        self.stream_ids = {name: i for i, name in enumerate(self.streams)}
+        self.compression = metadata["compression"]
+        self.wall_offset = wall_offset
+        
+        if index_offset:
+            index = np.frombuffer(self.map, dtype=_INDEX_DTYPE, count=chunk_count, offset=index_offset)
+        else:
+            index = self._scan_chunks(data_end)
+        
+        # Akış başına zaman sıralı parça listesi
+        self.chunk_index = {}
+        for name, stream_id in self.stream_ids.items():
+            self.chunk_index[name] = np.sort(index[index["stream"] == stream_id], order="first")
+        
+        self.cache_chunks = cache_chunks
+        self.cache = {}
+    
+    def _scan_chunks(self, data_end):
+        """Dizini olmayan (kapatılmamış) kayıtta parça başlıklarını sırayla oku"""
+        entries = []
+        offset = HEADER_SIZE
+        while offset + _CHUNK.size <= data_end:
+            magic, stream_id, _, count, slot_bytes, payload_bytes = _CHUNK.unpack_from(self.map, offset)
+            if magic != CHUNK_MAGIC:
+                break
+            table = self._table(offset, stream_id, count)
+            entries.append((offset, stream_id, count, table["timestamp"][0], table["timestamp"][-1]))
+            offset += _CHUNK.size + table.nbytes + payload_bytes
+        return np.array(entries, dtype=_INDEX_DTYPE)
+    
+    def _table(self, offset, stream_id, count):
+        dtype = _record_dtype(len(list(self.streams.values())[stream_id]))
+        return np.frombuffer(self.map, dtype=dtype, count=count, offset=offset + _CHUNK.size)
+    
+    def _load_chunk(self, offset):
+        """Parçanın (kayıt tablosu, kayıt×yuva bayt matrisi) ikilisi"""
+        chunk = self.cache.get(offset)
+        if chunk is not None:
+            return chunk
+        
+        _, stream_id, compression, count, slot_bytes, payload_bytes = _CHUNK.unpack_from(self.map, offset)
+        table = self._table(offset, stream_id, count)
+        payload_offset = offset + _CHUNK.size + table.nbytes
+        if compression == COMPRESSION["none"]:
+            slots = np.frombuffer(self.map, dtype=np.uint8, count=count * slot_bytes, offset=payload_offset)
+        else:
+            data = zlib.decompress(self.map[payload_offset:payload_offset + payload_bytes])
+            slots = np.frombuffer(data, dtype=np.uint8)
+            if compression == COMPRESSION["delta"]:
+                slots = np.cumsum(slots.reshape(count, slot_bytes), axis=0, dtype=np.uint8)
+        chunk = (table, slots.reshape(count, slot_bytes))
+        
+        if len(self.cache) >= self.cache_chunks:
+            self.cache.pop(next(iter(self.cache)))
+        self.cache[offset] = chunk
+        return chunk
+    
+    @staticmethod
+    def _decode(table, slots, row):
+        height, width, channels = (int(v) for v in table["shape"][row])
+        data = slots[row, :table["nbytes"][row]]
+        if channels == 0:
+            return data.tobytes()
+        frame = data.reshape(height, width, channels)
+        return frame[..., 0] if channels == 1 else frame
+    
+    def count(self, stream):
+        return int(self.chunk_index[stream]["count"].sum())
+    
+    def time_range(self, stream):
+        """Akıştaki ilk ve son kayıt zamanı (kayıt yoksa None)"""
+        entries = self.chunk_index[stream]
+        if len(entries) == 0:
+            return None
+        return float(entries["first"][0]), float(entries["last"].max())
+    
+    def timestamps(self, stream):
+        """Akıştaki tüm kayıt zamanları (kareler açılmadan)"""
+        entries = self.chunk_index[stream]
+        tables = [self._table(int(offset), self.stream_ids[stream], int(count))["timestamp"]
+                  for offset, count in zip(entries["offset"], entries["count"])]
+        return np.concatenate(tables) if tables else np.zeros(0)
+    
+    def read_at(self, stream, timestamp):
+        """timestamp anında geçerli olan (o ana kadarki son) kayıt -> (zaman, kare, okumalar) veya None"""
+        entries = self.chunk_index[stream]
+        if len(entries) == 0:
+            return None
+        position = bisect.bisect_right(entries["first"], timestamp) - 1
+        if position < 0:
+            return None
+        table, slots = self._load_chunk(int(entries["offset"][position]))
+        row = int(np.searchsorted(table["timestamp"], timestamp, side="right")) - 1
+        return float(table["timestamp"][row]), self._decode(table, slots, row), table["readings"][row]
+    
+    def iter_records(self, stream, start=None, end=None):
+        """[start, end] aralığındaki kayıtlar, eskiden yeniye -> (zaman, kare, okumalar)"""
+        entries = self.chunk_index[stream]
+        for offset, first, last in zip(entries["offset"], entries["first"], entries["last"]):
+            if (end is not None and first > end) or (start is not None and last < start):
+                continue
+            table, slots = self._load_chunk(int(offset))
+            for row in range(len(table)):
+                timestamp = table["timestamp"][row]
+                if (start is not None and timestamp < start) or (end is not None and timestamp > end):
+                    continue
+                yield float(timestamp), self._decode(table, slots, row), table["readings"][row]
+    
+    def wall_time(self, timestamp):
+        """Kayıt zamanını (time.perf_counter) duvar saatine çevir"""
+        return timestamp + self.wall_offset
+    
+    def close(self):
+        self.cache.clear()
+        self.chunk_index = {}
+        try:
+            self.map.close()
+        except BufferError:
+            # Kopyasız kare görünümleri hâlâ kullanımda; eşleme çöp toplayıcıyla kapanır
+            pass
+        self.file.close()
@@ -0,0 +1,148 @@
+from collections import deque
+import numpy as np
+import pytest
+from blob_labels import find_runs, label_components
+
+def flood_fill_labels(mask, connectivity):
+    """Referans: raster sırasında taşma doldurma (BFS) ile etiketleme"""
+    height, width = mask.shape
+    labels = np.zeros((height, width), dtype=np.int32)
+    if connectivity == 8:
+        steps = [(dy, dx) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dy or dx]
+    else:
+        steps = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+    count = 0
+    for y in range(height):
+        for x in range(width):
+            if not mask[y, x] or labels[y, x]:
+                continue
+            count += 1
+            labels[y, x] = count
+            queue = deque([(y, x)])
+            while queue:
+                cy, cx = queue.popleft()
+                for dy, dx in steps:
+                    ny, nx = cy + dy, cx + dx
+                    if 0 <= ny < height and 0 <= nx < width and mask[ny, nx] and not labels[ny, nx]:
+                        labels[ny, nx] = count
+                        queue.append((ny, nx))
+    return labels, count
+
+def reference_stats(labels, count):
+    """Bileşen başına beklenen istatistikler ve uç noktalar (belgelenen eşitlik kurallarıyla)"""
+    stats = []
+    for label in range(1, count + 1):
+        ys, xs = np.nonzero(labels == label)
+        x0, x1, y0, y1 = xs.min(), xs.max(), ys.min(), ys.max()
+        top_row = np.sort(xs[ys == y0])
+        bottom_row = np.sort(xs[ys == y1])
+        # Alt uç: en alt satırdaki son (en sağdaki) run'ın başlangıcı
+        bottom_x = bottom_row[-1]
+        while bottom_x - 1 in bottom_row:
+            bottom_x -= 1
+        stats.append({
+            'area': len(xs),
+            'centroid': (xs.mean(), ys.mean()),
+            'bbox': (x0, y0, x1, y1),
+            # Sol/sağ uç: o sütundaki en üst piksel; üst uç: en üst satırın ilk pikseli
+            'left': (x0, ys[xs == x0].min()),
+            'right': (x1, ys[xs == x1].min()),
+            'top': (top_row[0], y0),
+            'bottom': (bottom_x, y1)
+        })
+    return stats
+
+def assert_matches_reference(mask, connectivity):
+    labels, stats = label_components(mask, connectivity)
+    expected_labels, expected_count = flood_fill_labels(mask, connectivity)
+    assert labels.dtype == np.int32
+    assert stats['count'] == expected_count
+    np.testing.assert_array_equal(labels, expected_labels)
+    for i, expected in enumerate(reference_stats(expected_labels, expected_count)):
+        assert stats['area'][i] == expected['area']
+        assert stats['centroid_x'][i] == pytest.approx(expected['centroid'][0])
+        assert stats['centroid_y'][i] == pytest.approx(expected['centroid'][1])
+        for key in ('bbox', 'left', 'right', 'top', 'bottom'):
+            assert tuple(stats[key][i]) == expected[key], (key, i)
+
+@pytest.mark.parametrize("connectivity", [4, 8])
+@pytest.mark.parametrize("seed", range(20))
+def test_random_masks_match_flood_fill(seed, connectivity):
+    rng = np.random.default_rng(seed)
+    height, width = rng.integers(1, 24, size=2)
+    mask = rng.random((height, width)) < rng.uniform(0.2, 0.7)
+    assert_matches_reference(mask, connectivity)
+
+@pytest.mark.parametrize("connectivity", [4, 8])
+@pytest.mark.parametrize("shape", [(0, 0), (0, 5), (5, 0), (1, 1), (6, 9)])
+def test_empty_masks(shape, connectivity):
+    labels, stats = label_components(np.zeros(shape, dtype=bool), connectivity)
+    assert labels.shape == shape
+    assert not labels.any()
+    assert stats['count'] == 0
+    assert stats['bbox'].shape == (0, 4)
+    assert stats['left'].shape == (0, 2)
+
+@pytest.mark.parametrize("connectivity", [4, 8])
+def test_single_row_and_column(connectivity):
+    row = np.array([[1, 1, 0, 1, 0, 0, 1, 1, 1]], dtype=bool)
+    assert_matches_reference(row, connectivity)
+    assert_matches_reference(row.T.copy(), connectivity)
+    assert label_components(row, connectivity)[1]['count'] == 3
+    assert label_components(row.T.copy(), connectivity)[1]['count'] == 3
+
+@pytest.mark.parametrize("connectivity", [4, 8])
+def test_full_mask_is_one_component(connectivity):
+    mask = np.ones((7, 5), dtype=bool)
+    labels, stats = label_components(mask, connectivity)
+    assert stats['count'] == 1
+    assert (labels == 1).all()
+    assert tuple(stats['bbox'][0]) == (0, 0, 4, 6)
+
+def test_diagonal_connectivity():
+    mask = np.eye(5, dtype=bool) | np.eye(5, dtype=bool)[::-1]
+    assert label_components(mask, 8)[1]['count'] == 1
+    assert label_components(mask, 4)[1]['count'] == 9
+    assert_matches_reference(mask, 4)
+    assert_matches_reference(mask, 8)
+
+def test_u_shape_merges_late():
+    # İki kol ancak en alt satırda birleşir: birleştir-bul ilk run'ı kök seçmeli
+    mask = np.array([
+        [1, 0, 0, 0, 1],
+        [1, 0, 0, 0, 1],
+        [1, 0, 1, 0, 1],
+        [1, 1, 1, 1, 1],
+    ], dtype=bool)
+    for connectivity in (4, 8):
+        labels, stats = label_components(mask, connectivity)
+        assert stats['count'] == 1
+        assert_matches_reference(mask, connectivity)
+
+def test_extreme_point_tie_breaks():
+    mask = np.array([
+        [0, 1, 1, 0, 0, 1],
+        [1, 1, 1, 1, 1, 1],
+        [1, 0, 0, 0, 0, 1],
+        [1, 1, 0, 1, 1, 1],
+    ], dtype=bool)
+    labels, stats = label_components(mask, 8)
+    assert stats['count'] == 1
+    # Sol/sağ: uç sütundaki en üst piksel; üst: en üst satırın ilk pikseli
+    assert tuple(stats['left'][0]) == (0, 1)
+    assert tuple(stats['right'][0]) == (5, 0)
+    assert tuple(stats['top'][0]) == (1, 0)
+    # Alt: en alt satırdaki son run'ın başlangıcı
+    assert tuple(stats['bottom'][0]) == (3, 3)
+    assert_matches_reference(mask, 8)
+
+def test_find_runs_raster_order():
+    mask = np.array([[1, 1, 0, 1], [0, 0, 0, 0], [0, 1, 1, 1]], dtype=bool)
+    rows, starts, ends = find_runs(mask)
+    assert rows.tolist() == [0, 0, 2]
+    assert starts.tolist() == [0, 3, 1]
+    assert ends.tolist() == [2, 4, 4]
+
+def test_invalid_connectivity():
+    with pytest.raises(ValueError):
+        label_components(np.zeros((3, 3), dtype=bool), 6)
@@ -0,0 +1,152 @@
+import time
+import threading
+from input_worker import InputWorker, PRIORITY_MOVEMENT, PRIORITY_RULE, PRIORITY_POTION
+
+class FakeController:
+    """Basma/bırakma olaylarını kaydeden sahte pynput kontrolcüsü"""
+    
+    def __init__(self):
+        self.events = []
+        self.down = set()
+    
+    def press(self, key):
+        self.events.append(('+', key))
+        self.down.add(key)
+    
+    def release(self, key):
+        self.events.append(('-', key))
+        self.down.discard(key)
+
+def make_worker(max_hold_s=2.0):
+    # Thread başlatılmaz: istekler ve bırakmalar verilen zamanlarla doğrudan işlenir
+    return InputWorker(controller=FakeController(), max_hold_s=max_hold_s)
+
+def submit(worker, keys, duration, now, group=None, priority=PRIORITY_MOVEMENT):
+    worker._process_requests([(keys, duration, group, None, now, priority)], now)
+
+def test_press_and_expiry():
+    worker = make_worker()
+    submit(worker, ['w', 'a'], 0.1, now=0.0, group='movement')
+    assert worker.controller.down == {'w', 'a'}
+    worker._release_due(0.05)
+    assert worker.controller.down == {'w', 'a'}
+    worker._release_due(0.1)
+    assert worker.controller.down == set()
+    assert worker.get_stats()['held'] == []
+
+def test_extension_does_not_repress():
+    worker = make_worker()
+    submit(worker, ['w'], 0.1, now=0.0, group='movement')
+    submit(worker, ['w'], 0.1, now=0.08, group='movement')
+    worker._release_due(0.1)
+    assert worker.controller.down == {'w'}
+    worker._release_due(0.18)
+    assert worker.controller.events == [('+', 'w'), ('-', 'w')]
+
+def test_group_releases_previous_direction():
+    worker = make_worker()
+    submit(worker, ['w'], 0.5, now=0.0, group='movement')
+    submit(worker, ['d'], 0.5, now=0.1, group='movement')
+    assert worker.controller.events == [('+', 'w'), ('-', 'w'), ('+', 'd')]
+
+def test_coalesce_same_group():
+    worker = make_worker()
+    requests = [(['s'], 0.05, 'movement', None, 0.0, PRIORITY_MOVEMENT) for _ in range(10)]
+    requests.append((['d'], 0.05, 'movement', None, 0.0, PRIORITY_MOVEMENT))
+    worker._process_requests(requests, 0.0)
+    assert worker.controller.events == [('+', 'd')]
+    assert worker.get_stats()['coalesced'] == 10
+
+def test_preempt_and_resume():
+    worker = make_worker()
+    submit(worker, ['w', 'a'], 0.3, now=0.0, group='movement')
+    submit(worker, ['q'], 0.05, now=0.1, group='potion', priority=PRIORITY_POTION)
+    assert worker.controller.down == {'q'}
+    assert worker.get_stats()['suspended'] == ['a', 'w']
+    assert worker.get_stats()['preemptions'] == 2
+    
+    # Potion bırakılınca süresi dolmamış hareket tuşları yeniden basılır
+    worker._release_due(0.2)
+    assert worker.controller.down == {'w', 'a'}
+    assert worker.get_stats()['suspended'] == []
+    worker._release_due(0.3)
+    assert worker.controller.down == set()
+
+def test_lower_priority_waits_while_higher_held():
+    worker = make_worker()
+    submit(worker, ['q'], 0.1, now=0.0, group='potion', priority=PRIORITY_POTION)
+    submit(worker, ['1'], 0.2, now=0.02, group='rule:skill', priority=PRIORITY_RULE)
+    assert worker.controller.down == {'q'}
+    assert worker.get_stats()['suspended'] == ['1']
+    worker._release_due(0.1)
+    assert worker.controller.down == {'1'}
+    worker._release_due(0.22)
+    assert worker.controller.down == set()
+
+def test_suspended_key_expires_without_press():
+    worker = make_worker()
+    submit(worker, ['w'], 0.1, now=0.0, group='movement')
+    submit(worker, ['q'], 0.3, now=0.02, group='potion', priority=PRIORITY_POTION)
+    worker._release_due(0.1)
+    assert worker.get_stats()['suspended'] == []
+    worker._release_due(0.32)
+    assert worker.controller.events == [('+', 'w'), ('-', 'w'), ('+', 'q'), ('-', 'q')]
+
+def test_max_hold_caps_total_hold_since_press():
+    worker = make_worker(max_hold_s=1.0)
+    for step in range(20):
+        submit(worker, ['w'], 0.5, now=step * 0.1, group='movement')
+        worker._release_due(step * 0.1)
+    # Sürekli uzatılan tuş basıldıktan max_hold sonra bırakılmış ve yeniden basılmış olmalı
+    assert worker.controller.events[:3] == [('+', 'w'), ('-', 'w'), ('+', 'w')]
+    pressed_at = worker.held['w'][3]
+    assert 0.99 < pressed_at < 1.11
+    assert worker.held['w'][0] <= pressed_at + 1.0
+
+def test_failing_error_callback_does_not_stop_worker():
+    class BrokenController(FakeController):
+        def press(self, key):
+            raise OSError("erişim reddedildi")
+    
+    def on_error(error):
+        raise RuntimeError("callback hatası")
+    
+    worker = InputWorker(controller=BrokenController())
+    worker._process_requests([(['q'], 0.1, 'potion', on_error, 0.0, PRIORITY_POTION)], 0.0)
+    assert worker.get_stats()['held'] == []
+
+def test_stop_releases_held_keys():
+    worker = make_worker()
+    worker.start()
+    worker.submit(['w'], 1.0, group='movement')
+    worker.stop()
+    assert worker.controller.down == set()
+    assert not worker.running
+
+def test_submit_after_stop_restarts_worker():
+    releasing = threading.Event()
+    
+    class SlowReleaseController(FakeController):
+        def release(self, key):
+            releasing.set()
+            time.sleep(0.05)
+            super().release(key)
+    
+    worker = InputWorker(controller=SlowReleaseController())
+    worker.submit(['w'], 1.0, group='movement')
+    deadline = time.perf_counter() + 1.0
+    while 'w' not in worker.controller.down and time.perf_counter() < deadline:
+        time.sleep(0.001)
+    # Eski thread durdurulurken release_all() sürerken gelen istek yeni worker'da işlenmeli
+    with worker.condition:
+        worker.running = False
+        worker.condition.notify()
+    assert releasing.wait(1.0)
+    worker.submit(['d'], 1.0, group='movement')
+    deadline = time.perf_counter() + 1.0
+    while 'd' not in worker.controller.down and time.perf_counter() < deadline:
+        time.sleep(0.001)
+    assert worker.running
+    assert worker.controller.down == {'d'}
+    worker.stop()
+    assert worker.controller.down == set()
@@ -0,0 +1,44 @@
+import os
+import shutil
+import subprocess
+import sys
+import numpy as np
+from benchmark import make_synthetic_hp_frames, make_synthetic_minimap_frames
+from replay import load_results
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+def run_replay_cli(*args, cwd):
+    # Ekran ve klavye arka ucu olmadan: DISPLAY kaldırılır, pynput içe aktarılamaz olmalı
+    env = {key: value for key, value in os.environ.items() if key not in ("DISPLAY", "WAYLAND_DISPLAY")}
+    env["PYTHONPATH"] = ROOT
+    return subprocess.run([sys.executable, os.path.join(ROOT, "replay.py"), *args], cwd=cwd, env=env,
+                          capture_output=True, text=True, timeout=120)
+
+def test_replay_runs_without_display(tmp_path):
+    np.save(tmp_path / "hp.npy", make_synthetic_hp_frames(16))
+    np.save(tmp_path / "minimap.npy", make_synthetic_minimap_frames(16))
+    shutil.copy(os.path.join(ROOT, "config.json"), tmp_path / "config.json")
+    
+    result = run_replay_cli("run", "--hp", "hp.npy", "--minimap", "minimap.npy", "--config", "config.json",
+                            "--save", "baseline.npz", cwd=tmp_path)
+    assert result.returncode == 0, result.stderr
+    results = load_results(tmp_path / "baseline.npz")
+    assert len(results["hp"]["values"]) == 16
+    assert ((results["hp"]["values"] >= 0) & (results["hp"]["values"] <= 100)).all()
+    assert np.isfinite(results["minimap"]["values"]).all()
+    
+    # Aynı kayıt temel sonuçlarla birebir uyuşmalı
+    result = run_replay_cli("run", "--hp", "hp.npy", "--minimap", "minimap.npy", "--config", "config.json",
+                            "--baseline", "baseline.npz", cwd=tmp_path)
+    assert result.returncode == 0, result.stdout + result.stderr
+
+def test_headless_engines_do_not_import_pynput():
+    code = ("import sys, replay, benchmark, analysis_process; "
+            "analysis_process.create_headless_engine('minimap'); "
+            "sys.exit('pynput' in sys.modules)")
+    env = {key: value for key, value in os.environ.items() if key not in ("DISPLAY", "WAYLAND_DISPLAY")}
+    env["PYTHONPATH"] = ROOT
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True,
+                            timeout=60)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,97 @@
+import pytest
+from tick_scheduler import TickScheduler
+
+class FakeClock:
+    """Elle ilerletilen monotonik saat"""
+    
+    def __init__(self, now=100.0):
+        self.now = now
+    
+    def __call__(self):
+        return self.now
+    
+    def advance(self, seconds):
+        self.now += seconds
+
+def run_tick(scheduler, clock, work, interval):
+    """Bir tick: işi yap, sonraki son tarihe kadar uyu -> bekleme süresi"""
+    scheduler.begin_tick()
+    clock.advance(work)
+    delay = scheduler.next_delay(interval)
+    clock.advance(delay)
+    return delay
+
+def test_no_drift_with_variable_work():
+    clock = FakeClock()
+    scheduler = TickScheduler("test", clock=clock)
+    scheduler.start()
+    start = clock.now
+    for work in [0.01, 0.03, 0.0, 0.045, 0.02] * 20:
+        run_tick(scheduler, clock, work, 0.05)
+    # Son tarihler mutlak: işlem süresi periyoda eklenmez
+    assert clock.now - start == pytest.approx(100 * 0.05)
+    stats = scheduler.get_stats()
+    assert stats['ticks'] == 100
+    assert stats['missed_deadlines'] == 0
+    assert stats['overruns'] == 0
+    assert stats['achieved_rate_hz'] == pytest.approx(20.0)
+    assert stats['target_rate_hz'] == pytest.approx(20.0)
+
+def test_missed_deadline_reanchors_without_catch_up():
+    clock = FakeClock()
+    scheduler = TickScheduler("test", clock=clock)
+    scheduler.start()
+    run_tick(scheduler, clock, 0.01, 0.05)
+    
+    # Tick 0.05'te başlamalıyken thread 0.17 geç uyandı (ör. GC duraklaması)
+    clock.advance(0.17)
+    scheduler.begin_tick()
+    clock.advance(0.01)
+    assert scheduler.next_delay(0.05) == 0.0
+    stats = scheduler.get_stats()
+    assert stats['missed_deadlines'] == 1
+    assert stats['skipped_periods'] == 3
+    assert stats['overruns'] == 0
+    assert stats['lateness_max_ms'] >= 160
+    
+    # Kaçırılan periyotlar art arda telafi edilmez: sonraki tick tam bir aralık sonra
+    anchor = clock.now
+    scheduler.begin_tick()
+    clock.advance(0.01)
+    assert scheduler.next_delay(0.05) == pytest.approx(0.04)
+    assert scheduler.deadline == pytest.approx(anchor + 0.05)
+
+def test_overrun_counts_work_longer_than_interval():
+    clock = FakeClock()
+    scheduler = TickScheduler("test", clock=clock)
+    scheduler.start()
+    for _ in range(5):
+        assert run_tick(scheduler, clock, 0.08, 0.05) == 0.0
+    stats = scheduler.get_stats()
+    assert stats['overruns'] == 5
+    assert stats['missed_deadlines'] == 5
+    assert stats['miss_rate'] == 1.0
+    assert stats['achieved_rate_hz'] == pytest.approx(1 / 0.08)
+
+def test_late_wakeup_is_not_an_overrun():
+    clock = FakeClock()
+    scheduler = TickScheduler("test", clock=clock)
+    scheduler.start()
+    run_tick(scheduler, clock, 0.01, 0.05)
+    clock.advance(0.02)
+    assert run_tick(scheduler, clock, 0.01, 0.05) == pytest.approx(0.02)
+    stats = scheduler.get_stats()
+    assert stats['overruns'] == 0
+    assert stats['missed_deadlines'] == 0
+    assert stats['lateness_max_ms'] >= 19
+
+def test_reset_clears_counters():
+    clock = FakeClock()
+    scheduler = TickScheduler("test", clock=clock)
+    scheduler.start()
+    run_tick(scheduler, clock, 0.08, 0.05)
+    scheduler.reset()
+    stats = scheduler.get_stats()
+    assert stats['ticks'] == 0
+    assert stats['overruns'] == 0
+    assert stats['achieved_rate_hz'] == 0.0
@@ -0,0 +1,86 @@
+import time
+import threading
+from latency_metrics import LatencyHistogram
+
+class TickScheduler:
+    """Monotonik saatle mutlak son tarihlere göre çalışan sabit hızlı tick zamanlayıcısı
+    
+    Bir sonraki tick bir önceki son tarihe aralık eklenerek planlanır (şimdiki zamana değil),
+    böylece işlem süresi periyoda eklenmez ve gecikmeler birikmez. Son tarih işlem bitmeden
+    geçmişse tick kaçırılmış sayılır; kaçırılan periyotlar art arda telafi edilmez, zamanlayıcı
+    şimdiki ana yeniden çapalanır. İşlem süresinin kendisi aralığı aşarsa taşma sayılır:
+    yapılandırılan hız bu makinede sürdürülemiyor demektir.
+    """
+    
+    def __init__(self, name, clock=time.perf_counter):
+        self.name = name
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.deadline = None
+        self.tick_start = None
+        self.reset()
+    
+    def reset(self):
+        with self.lock:
+            self.ticks = 0
+            self.missed_deadlines = 0
+            self.skipped_periods = 0
+            self.overruns = 0
+            self.requested_time = 0.0
+            self.first_tick = None
+            self.last_tick = None
+            # Uyanma gecikmesi: son tarih ile tick'in gerçekte başladığı an arasındaki fark
+            self.lateness = LatencyHistogram()
+    
+    def start(self):
+        """Döngü başlarken ilk son tarihi şimdiye çapala"""
+        with self.lock:
+            self.deadline = self.clock()
+            self.tick_start = None
+    
+    def begin_tick(self):
+        now = self.clock()
+        with self.lock:
+            if self.deadline is None:
+                self.deadline = now
+            self.ticks += 1
+            self.tick_start = now
+            if self.first_tick is None:
+                self.first_tick = now
+            self.last_tick = now
+            self.lateness.record(max(0, int((now - self.deadline) * 1e9)))
+    
+    def next_delay(self, interval):
+        """Sonraki mutlak son tarihe kadar beklenecek süre (s); kaçırılmışsa 0"""
+        now = self.clock()
+        with self.lock:
+            if self.deadline is None:
+                self.deadline = now
+            if self.tick_start is not None and now - self.tick_start > interval:
+                self.overruns += 1
+            self.requested_time += interval
+            deadline = self.deadline + interval
+            if now >= deadline:
+                self.missed_deadlines += 1
+                self.skipped_periods += int((now - deadline) / interval) + 1 if interval > 0 else 1
+                self.deadline = now
+                return 0.0
+            self.deadline = deadline
+            return deadline - now
+    
+    def get_stats(self):
+        with self.lock:
+            elapsed = self.last_tick - self.first_tick if self.ticks >= 2 else 0.0
+            lateness = self.lateness.snapshot()
+            return {
+                'ticks': self.ticks,
+                'missed_deadlines': self.missed_deadlines,
+                'skipped_periods': self.skipped_periods,
+                'overruns': self.overruns,
+                'miss_rate': self.missed_deadlines / self.ticks if self.ticks else 0.0,
+                'target_rate_hz': self.ticks / self.requested_time if self.requested_time > 0 else 0.0,
+                'achieved_rate_hz': (self.ticks - 1) / elapsed if elapsed > 0 else 0.0,
+                'lateness_p50_ms': lateness['p50_ms'],
+                'lateness_p99_ms': lateness['p99_ms'],
+                'lateness_max_ms': lateness['max_ms']
+            }